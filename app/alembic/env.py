@@ -28,6 +28,18 @@ target_metadata = SQLModel.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Objetos creados a mano en migraciones y que no están en los modelos
+# (p. ej. la columna generada tour.search_vector): autogenerate no los toca
+UNMAPPED_OBJECTS = {
+    ("column", "search_vector"),
+    ("index", "ix_tour_search_vector"),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and (type_, name) in UNMAPPED_OBJECTS)
+
+
 def get_url():
     return str(settings.SQLALCHEMY_DATABASE_URI)
 
@@ -49,6 +61,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -72,7 +85,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,68 @@
+"""tour full text search
+
+Revision ID: 2dd2f7f160c4
+Revises: 7f1dc976f7e2
+Create Date: 2026-10-18 08:56:28.323089
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2dd2f7f160c4'
+down_revision: Union[str, Sequence[str], None] = '7f1dc976f7e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# unaccent() es STABLE y una columna generada exige funciones IMMUTABLE: se
+# envuelve. Si el servidor no trae la extensión (contrib), se usa translate()
+# con los acentos del español, que alcanza para nombres y descripciones.
+UNACCENT_WITH_EXTENSION = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+"""
+
+UNACCENT_FALLBACK = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT translate($1, 'áéíóúüñÁÉÍÓÚÜÑàèìòùÀÈÌÒÙ', 'aeiouunAEIOUUNaeiouAEIOU') $$
+"""
+
+# Peso A: nombre y destino; B: descripción; C: itinerario e incluye (JSONB → texto)
+SEARCH_VECTOR = """
+    setweight(to_tsvector('spanish', immutable_unaccent(coalesce(nombre, '') || ' ' || coalesce(destino, ''))), 'A')
+    || setweight(to_tsvector('spanish', immutable_unaccent(coalesce(descripcion, ''))), 'B')
+    || setweight(to_tsvector('spanish', immutable_unaccent(
+        coalesce(itinerario::text, '') || ' ' || coalesce(incluye::text, '')
+    )), 'C')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    has_unaccent = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent'")
+    ).scalar()
+    if has_unaccent:
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute(UNACCENT_WITH_EXTENSION)
+    else:
+        op.execute(UNACCENT_FALLBACK)
+
+    # Columna generada: Postgres la recalcula en cada INSERT/UPDATE del tour
+    op.execute(f"ALTER TABLE tour ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+    op.execute("CREATE INDEX ix_tour_search_vector ON tour USING gin (search_vector) WHERE is_active")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_tour_search_vector")
+    op.execute("ALTER TABLE tour DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
@@ -5,7 +5,8 @@ from app.api.routes import (
     zarpe, checkout,
     stripe_payments,      # ← NUEVO
     stripe_webhook,
-    reservas_public
+    reservas_public,
+    stats
 )
 
 api_router = APIRouter()
@@ -27,3 +28,6 @@ api_router.include_router(checkout.router)
 # Stripe
 api_router.include_router(stripe_payments.router)   # ← NECESARIO
 api_router.include_router(stripe_webhook.router)
+
+# Métricas internas (superuser)
+api_router.include_router(stats.router)
@@ -1,14 +1,19 @@
 import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func
 from sqlmodel import select
 
-from app.auth.deps import SessionDep
+from app.auth.deps import SessionDep, AsyncSessionDep, AsyncReadSessionDep
 from app.auth.deps import get_current_active_superuser
+from app.core.http_cache import PRIVATE_CACHE_CONTROL, conditional, make_etag
+from app.core.pagination import Keyset, set_next_cursor
 from app.models import Guia, GuiaCreate, User, GuiaWithUser, GuiaUpdate
+from app.tours.service import ToursService
 
 router = APIRouter(tags=["guia"], dependencies=[Depends(get_current_active_superuser)])
 
@@ -26,22 +31,47 @@ async def add_guia(
     return guia
 
 
+GUIA_KEYSET = Keyset("guia", Guia.id)
+
+
 @router.get("/guia", response_model=list[GuiaWithUser])
 async def get_guia(
-        session: SessionDep,
+        response: Response,
+        session: AsyncReadSessionDep,
         offset: int = 0,
         limit: Annotated[int, Query(le=100)] = 100,
+        cursor: str | None = None,
 ):
-    guias = session.exec(select(Guia).offset(offset).limit(limit)).all()
+    # GuiaWithUser incluye "usuario": se carga en la misma ida (sin lazy-load por fila)
+    stmt = GUIA_KEYSET.paginate(select(Guia).options(selectinload(Guia.usuario)), offset, limit, cursor)
+    guias = (await session.exec(stmt)).all()
+    set_next_cursor(response, GUIA_KEYSET.next_cursor(guias, limit))
     return guias
 
 
 @router.get("/guia/{id}", response_model=GuiaWithUser)
 async def get_guia_by_id(
         id: int,
-        session: SessionDep,
+        request: Request,
+        response: Response,
+        session: AsyncSessionDep,
 ):
-    guia = session.get(Guia, id)
+    # GuiaWithUser incluye al usuario: la versión es la más nueva de las dos filas
+    version = (await session.exec(
+        select(func.greatest(
+            func.coalesce(Guia.updated_date, Guia.created_date),
+            func.coalesce(User.updated_date, User.created_date),
+        ))
+        .select_from(Guia)
+        .outerjoin(User, User.id == Guia.id_usuario)
+        .where(Guia.id == id)
+    )).first()
+    if version is not None:
+        not_modified = conditional(request, response, make_etag("guia", id, version), PRIVATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+
+    guia = await session.get(Guia, id, options=[selectinload(Guia.usuario)])
     if not guia:
         raise HTTPException(status_code=404, detail="Guia no encontrado")
     return guia
@@ -68,6 +98,7 @@ async def update_guia(
     session.add(guia_db)
     session.commit()
     session.refresh(guia_db)
+    ToursService.catalog_relations_changed()
     return guia_db
 
 
@@ -81,4 +112,5 @@ async def delete_guia(
         raise HTTPException(status_code=404, detail="Guia no encontrado")
     session.delete(guia)
     session.commit()
+    ToursService.catalog_relations_changed()
     return JSONResponse(content={"message": "Guia eliminado", "Guia": jsonable_encoder(guia)})
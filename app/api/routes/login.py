@@ -3,26 +3,26 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
 
 from app import crud
-from app.auth.deps import get_current_active_user
-from app.core.database import engine
-from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.models import Token, User, UserPublic
+from app.auth.deps import SessionDep, get_current_active_user, limit_login
+from app.auth.revocation import get_auth_epoch
+from app.core.security import create_access_token, principal_claims, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.models import Token, UserPrincipal, UserPublic
 from fastapi import Response
 router = APIRouter(tags=["login"])
 
 
 
 
-@router.post("/token")
+@router.post("/token", dependencies=[Depends(limit_login)])
 async def login_for_access_token(
     response: Response,
+    session: SessionDep,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
-    user = crud.authenticate(
-        session=Session(engine),
+    user = await crud.authenticate(
+        session=session,
         email=form_data.username,
         password=form_data.password
     )
@@ -34,8 +34,9 @@ async def login_for_access_token(
         )
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    auth_epoch = get_auth_epoch(session=session, user_id=user.id)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data=principal_claims(user, auth_epoch),
         expires_delta=access_token_expires
     )
 
@@ -54,6 +55,6 @@ async def login_for_access_token(
 
 @router.get("/test", response_model=UserPublic)
 async def read_users_me(
-        current_user: Annotated[User, Depends(get_current_active_user)],
+        current_user: Annotated[UserPrincipal, Depends(get_current_active_user)],
 ):
     return current_user
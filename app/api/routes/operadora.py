@@ -1,13 +1,17 @@
 import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from sqlalchemy import func
 from sqlmodel import select
 
-from app.auth.deps import get_current_active_superuser, SessionDep
+from app.auth.deps import get_current_active_superuser, SessionDep, ReadSessionDep
+from app.core.http_cache import PRIVATE_CACHE_CONTROL, conditional, make_etag
+from app.core.pagination import Keyset, set_next_cursor
 from app.models import Operadora, OperadoraCreate, User, OperadoraOut, OperadoraUpdate
+from app.tours.service import ToursService
 
 router = APIRouter(tags=["operadora"], dependencies=[Depends(get_current_active_superuser)])
 
@@ -25,18 +29,33 @@ async def add_operadora(
     return operadora
 
 
+OPERADORA_KEYSET = Keyset("operadora", Operadora.id)
+
+
 @router.get("/operadora", response_model=list[OperadoraOut])
 async def get_operadora(
-        session: SessionDep,
+        response: Response,
+        session: ReadSessionDep,
         offset: int = 0,
         limit: Annotated[int, Query(le=100)] = 100,
+        cursor: str | None = None,
 ):
-    operadoras = session.exec(select(Operadora).offset(offset).limit(limit)).all()
+    operadoras = session.exec(OPERADORA_KEYSET.paginate(select(Operadora), offset, limit, cursor)).all()
+    set_next_cursor(response, OPERADORA_KEYSET.next_cursor(operadoras, limit))
     return operadoras
 
 
 @router.get("/operadora/{operadora_id}", response_model=OperadoraOut)
-async def get_operadora_by_id(operadora_id: int, session: SessionDep):
+async def get_operadora_by_id(operadora_id: int, request: Request, response: Response, session: SessionDep):
+    version = session.exec(
+        select(func.coalesce(Operadora.updated_date, Operadora.created_date)).where(Operadora.id == operadora_id)
+    ).first()
+    if version is not None:
+        etag = make_etag("operadora", operadora_id, version)
+        not_modified = conditional(request, response, etag, PRIVATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+
     operadora = session.get(Operadora, operadora_id)
     if not operadora:
         raise HTTPException(status_code=404, detail="Operadora not encontrada")
@@ -62,6 +81,7 @@ async def update_operadora(
     session.add(operadora_db)
     session.commit()
     session.refresh(operadora_db)
+    ToursService.catalog_relations_changed()
     return operadora_db
 
 
@@ -75,4 +95,5 @@ async def delete_operadora(
         raise HTTPException(status_code=404, detail="No se encontro operadora")
     session.delete(operadora)
     session.commit()
+    ToursService.catalog_relations_changed()
     return JSONResponse(content={"message": "Operadora eliminada", "Operadora": jsonable_encoder(operadora)})
@@ -1,17 +1,23 @@
 # app/api/routes/public/auth_register.py
 
+from anyio import from_thread
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from sqlalchemy import or_
 
 from app.models import User, UserCreate, UserPublic
-from app.auth.deps import get_session
-from app.core.security import get_password_hash
+from app.auth.deps import get_session, limit_register
+from app.core.security import password_hasher
 
 router = APIRouter(tags=["auth_register"], prefix="/auth_register")
 
 
-@router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=UserPublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_register)],
+)
 def register_user(user_in: UserCreate, session: Session = Depends(get_session)):
     # 1) Verificar duplicados SOLO si vienen con valor (evita falsos positivos por NULL)
     filters = []
@@ -34,13 +40,15 @@ def register_user(user_in: UserCreate, session: Session = Depends(get_session)):
             )
 
     # 2) Crear usuario nuevo (rol/estado AUTOMÁTICOS)
+    # Ruta sync (la sesión corre en el threadpool): el hash va al pool de procesos desde el event loop
+    hashed_password = from_thread.run(password_hasher.hash, user_in.password)
     db_user = User(
         email=email,
         nombre=user_in.nombre,
         apellido=user_in.apellido,
         telefono=user_in.telefono,
         cedula=cedula,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         rol_id=2,    # usuario normal
         estado_id=1  # ACTIVO
     )
@@ -51,6 +59,7 @@ def register_user(user_in: UserCreate, session: Session = Depends(get_session)):
 
     # 3) Devolver datos públicos (sin password) — INCLUYE rol_id (porque UserPublic lo requiere)
     return UserPublic(
+        id=db_user.id,
         email=db_user.email,
         nombre=db_user.nombre,
         apellido=db_user.apellido,
@@ -1,21 +1,20 @@
 
 # LEGACY ROUTER - NO USAR (se reemplazó por app/api/routes/*_public.py)
-import glob
-import os
-
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import FileResponse
-from sqlmodel import select
 from app.auth.deps import SessionDep
+from app.core.http_cache import PUBLIC_CACHE_CONTROL
 from app.models import Tour, TourPublic
+from app.tours.cache import get_catalog_json
+from app.tours.images import image_index
 
 router = APIRouter(tags=["public_tours"])
 
 
 @router.get("/tours", response_model=list[TourPublic])
-async def get_public_tours(session: SessionDep):
-    tours = session.exec(select(Tour)).all()
-    return tours
+async def get_public_tours():
+    page = await get_catalog_json(0, None, None)
+    return Response(content=page.body, media_type="application/json")
 
 @router.get("/tours/{id}", response_model=TourPublic)
 async def get_tour_by_id(
@@ -28,13 +27,12 @@ async def get_tour_by_id(
     return tour
 
 @router.get("/images/tours/{id}")
-async def get_image_tour(
+def get_image_tour(
         id: int,
+        session: SessionDep,
 ):
-    file_path = '/home/frank/Documents/tours_proyecto/Tours_Backend/app/assets/images/tours'
-    pattern = os.path.join(file_path, f"{id}.*")
-    matches = glob.glob(pattern)
-    if not matches:
+    # URL por id (seeder / clientes viejos): cambia de contenido, así que cache corto
+    served = image_index.tour_file(session, id)
+    if served is None:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
-    image_path = matches[0]
-    return FileResponse(image_path)
+    return FileResponse(served.path, stat_result=served.stat, headers={"Cache-Control": PUBLIC_CACHE_CONTROL})
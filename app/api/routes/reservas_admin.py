@@ -1,15 +1,17 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
-from app.auth.deps import SessionDep, get_current_active_superuser
+from app.auth.deps import SessionDep, AsyncSessionDep, AsyncReadSessionDep, get_current_active_superuser
+from app.core.pagination import set_next_cursor
 from app.models import (
     ReservasCreateAdmin,
     User,
     ReservasUpdate,
     ReservasAdminRead
 )
+from app.reservas.repository import RESERVAS_KEYSET
 from app.reservas.service import ReservasService
 
 router = APIRouter(
@@ -36,10 +38,16 @@ async def create_reserva_admin(
 @router.get("/usuario/{user_id}", response_model=list[ReservasAdminRead])
 async def get_reservas_by_user(
     user_id: str,
-    session: SessionDep,
+    response: Response,
+    session: AsyncReadSessionDep,
     current_user: User = Depends(get_current_active_superuser),
+    offset: int = 0,
+    limit: Annotated[int, Query(le=100)] = 100,
+    cursor: str | None = None,
 ):
-    return ReservasService.admin_list_reservas_by_user(session, user_id)
+    reservas = await ReservasService.admin_list_reservas_by_user_async(session, user_id, offset, limit, cursor)
+    set_next_cursor(response, RESERVAS_KEYSET.next_cursor(reservas, limit))
+    return reservas
 
 
 # ============================================================
@@ -47,16 +55,23 @@ async def get_reservas_by_user(
 # ============================================================
 @router.get("", response_model=list[ReservasAdminRead])
 async def get_reservas(
-    session: SessionDep,
+    response: Response,
+    session: AsyncReadSessionDep,
     current_user: User = Depends(get_current_active_superuser),
     usuario_id: str | None = None,
     offset: int = 0,
-    limit: Annotated[int, Query(le=100)] = 100
+    limit: Annotated[int, Query(le=100)] = 100,
+    cursor: str | None = None,
 ):
     if usuario_id:
-        return ReservasService.admin_list_reservas_by_user(session, usuario_id)
+        reservas = await ReservasService.admin_list_reservas_by_user_async(
+            session, usuario_id, offset, limit, cursor
+        )
+    else:
+        reservas = await ReservasService.admin_list_reservas_async(session, offset, limit, cursor)
 
-    return ReservasService.admin_list_reservas(session, offset, limit)
+    set_next_cursor(response, RESERVAS_KEYSET.next_cursor(reservas, limit))
+    return reservas
 
 
 # ============================================================
@@ -65,10 +80,10 @@ async def get_reservas(
 @router.get("/{id}", response_model=ReservasAdminRead)
 async def get_reserva_by_id(
     id: int,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: User = Depends(get_current_active_superuser),
 ):
-    return ReservasService.admin_get_reserva_by_id(session, id)
+    return await ReservasService.admin_get_reserva_by_id_async(session, id)
 
 
 # ============================================================
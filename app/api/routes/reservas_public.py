@@ -3,7 +3,7 @@ from sqlalchemy.orm import selectinload
 from sqlalchemy import text
 from sqlmodel import select
 
-from app.auth.deps import SessionDep, get_current_active_user
+from app.auth.deps import SessionDep, get_current_active_user, limit_booking
 from app.models import (
     Reservas,
     ReservasCreatePublic,
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/reservas", tags=["Reservas Públicas"])
 # ============================================================
 # 1) Crear reserva pública (sin pago)
 # ============================================================
-@router.post("/crear")
+@router.post("/crear", dependencies=[Depends(limit_booking)])
 def crear_reserva_publica(
     reserva_in: ReservasCreatePublic,
     session: SessionDep,
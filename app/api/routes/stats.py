@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.cache import principal_cache
+from app.auth.deps import get_current_active_superuser
+from app.core.admission import admission
+from app.core.database import replica_router
+from app.core.pool_stats import all_stats as pool_stats_all
+from app.core.sessions import session_usage
+from app.tours.autocomplete import autocomplete_index
+from app.tours.cache import catalog_cache
+from app.tours.geo import geo_index
+from app.tours.popularity import popularity_counters
+from app.tours.rebuilds import catalog_rebuilder
+from app.tours.snapshot import snapshot_store
+
+router = APIRouter(
+    prefix="/internal/stats",
+    tags=["Internal Stats"],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+
+
+# ============================================================
+# Cache del usuario autenticado
+# ============================================================
+@router.get("/auth-cache")
+async def auth_cache_stats():
+    return principal_cache.stats()
+
+
+# ============================================================
+# Réplicas de lectura
+# ============================================================
+@router.get("/replicas")
+async def replica_stats():
+    return replica_router.stats()
+
+
+# ============================================================
+# Pool de conexiones (por worker)
+# ============================================================
+@router.get("/pool")
+async def pool_stats():
+    return pool_stats_all()
+
+
+# ============================================================
+# Sesiones que no llegaron a pedir conexión
+# ============================================================
+@router.get("/sessions")
+async def session_stats():
+    return session_usage.stats()
+
+
+# ============================================================
+# Control de admisión
+# ============================================================
+@router.get("/admission")
+async def admission_stats():
+    return admission.stats()
+
+
+# ============================================================
+# Cache del catálogo público
+# ============================================================
+@router.get("/catalog-cache")
+async def catalog_cache_stats():
+    return catalog_cache.stats()
+
+
+# ============================================================
+# Snapshot mmap del catálogo
+# ============================================================
+@router.get("/catalog-snapshot")
+async def catalog_snapshot_stats():
+    return snapshot_store.stats()
+
+# ============================================================
+# Autocompletado en memoria
+# ============================================================
+@router.get("/autocomplete")
+async def autocomplete_stats():
+    return autocomplete_index.stats()
+
+
+# ============================================================
+# Índice geográfico (/tours/cercanos)
+# ============================================================
+@router.get("/geo")
+async def geo_stats():
+    return geo_index.stats()
+
+
+# ============================================================
+# Contadores de popularidad pendientes de volcar (por worker)
+# ============================================================
+@router.get("/popularity")
+async def popularity_stats():
+    return popularity_counters.stats()
+
+
+# ============================================================
+# Reconstrucciones del catálogo pedidas por escrituras del admin (por worker)
+# ============================================================
+@router.get("/rebuilds")
+async def rebuild_stats():
+    return catalog_rebuilder.stats()
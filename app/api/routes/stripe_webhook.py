@@ -6,6 +6,7 @@ from sqlmodel import select
 from app.auth.deps import SessionDep
 from app.core.config import settings
 from app.models import Reservas, Estado_Reserva, ReservaEnum
+from app.reservas.service import track_pagada
 
 router = APIRouter(tags=["Stripe Webhook"])
 stripe.api_key = str(settings.STRIPE_SECRET_KEY)
@@ -52,12 +53,15 @@ async def stripe_webhook(
             select(Estado_Reserva).where(Estado_Reserva.estado == ReservaEnum.PAGADA)
         ).first()
 
+        # Stripe reintenta los webhooks: solo cuenta si la reserva recién pasa a pagada
+        id_tour, estado_anterior = reserva.id_tour, reserva.id_reserva_estado
         reserva.id_reserva_estado = estado_pagada.id
         reserva.updated_date = datetime.datetime.now()
         reserva.checkout_session_id = session_obj["id"]
 
         session.add(reserva)
         session.commit()
+        track_pagada(id_tour, estado_anterior, id_tour, estado_pagada.id)
 
         return {"ok": True}
 
@@ -85,11 +89,14 @@ async def stripe_webhook(
             select(Estado_Reserva).where(Estado_Reserva.estado == ReservaEnum.PAGADA)
         ).first()
 
+        # Stripe reintenta los webhooks: solo cuenta si la reserva recién pasa a pagada
+        id_tour, estado_anterior = reserva.id_tour, reserva.id_reserva_estado
         reserva.id_reserva_estado = estado_pagada.id
         reserva.updated_date = datetime.datetime.now()
 
         session.add(reserva)
         session.commit()
+        track_pagada(id_tour, estado_anterior, id_tour, estado_pagada.id)
 
         return {"ok": True}
 
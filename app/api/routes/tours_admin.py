@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
-from app.auth.deps import SessionDep, get_current_active_superuser
+from app.auth.deps import SessionDep, AsyncSessionDep, AsyncReadSessionDep, get_current_active_superuser
+from app.core.http_cache import PRIVATE_CACHE_CONTROL, conditional, make_etag
+from app.core.pagination import set_next_cursor
 from app.models import TourCreate, TourUpdate, Tour, User
+from app.tours.images import generate_variants, store_upload
+from app.tours.repository import TOURS_KEYSET
 from app.tours.service import ToursService
 
 router = APIRouter(
@@ -17,14 +22,18 @@ router = APIRouter(
 @router.get("", response_model=list[Tour])
 @router.get("/", response_model=list[Tour])
 async def list_tours(
-    session: SessionDep,
+    response: Response,
+    session: AsyncReadSessionDep,
     current_user: User = Depends(get_current_active_superuser),
     offset: int = 0,
     limit: int = 100,
-    is_active: bool | None = None
+    is_active: bool | None = None,
+    cursor: str | None = None,
 ):
     print("🔥 Entrando a /admin/tours")
-    return ToursService.get_tours(session, offset, limit, is_active)
+    tours = await ToursService.get_tours_async(session, offset, limit, is_active, cursor)
+    set_next_cursor(response, TOURS_KEYSET.next_cursor(tours, limit))
+    return tours
 
 
 # ============================================================
@@ -52,6 +61,31 @@ async def update_tour(
     return ToursService.update_tour(session, id, tour_in, current_user)
 
 
+# ============================================================
+# SUBIR IMAGEN (superuser)
+# ============================================================
+@router.put("/{id}/image", response_model=Tour)
+async def upload_tour_image(
+    id: int,
+    file: UploadFile,
+    background_tasks: BackgroundTasks,
+    session: SessionDep,
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """
+    Guarda el original (nombre = hash del contenido) y responde enseguida;
+    las variantes WebP/JPEG se generan después de la respuesta.
+    """
+    ToursService.get_tour(session, id)  # 404 antes de copiar nada
+    if file.content_type and not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=415, detail="El archivo no es una imagen")
+
+    image = await run_in_threadpool(store_upload, file.file)
+    tour = ToursService.set_tour_image(session, id, image, current_user)
+    background_tasks.add_task(generate_variants, image.digest)
+    return tour
+
+
 # ============================================================
 # DESACTIVAR TOUR (superuser)
 # ============================================================
@@ -89,7 +123,15 @@ async def activate_tour(
 @router.get("/{id}", response_model=Tour)
 async def get_admin_tour_by_id(
     id: int,
-    session: SessionDep,
+    request: Request,
+    response: Response,
+    session: AsyncSessionDep,
     current_user: User = Depends(get_current_active_superuser)
 ):
-    return ToursService.get_tour(session, id)
+    # La respuesta (Tour) son solo columnas del tour: alcanza con su propia versión
+    version = await ToursService.get_tour_version_async(session, id, with_relations=False)
+    if version is not None:
+        not_modified = conditional(request, response, make_etag("tour-admin", id, version), PRIVATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+    return await ToursService.get_tour_async(session, id)
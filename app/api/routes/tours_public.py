@@ -1,21 +1,158 @@
-from typing import Annotated
-from fastapi import APIRouter
+import asyncio
+import datetime as dt
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.params import Query
+from fastapi.responses import FileResponse
 
-from app.auth.deps import SessionDep
-from app.models import TourPublic
+from app.auth.deps import AsyncReadSessionDep
+from app.core.config import settings
+from app.core.http_cache import PUBLIC_CACHE_CONTROL, cache_headers, conditional, etag_matches, make_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, set_next_cursor
+from app.models import TourNearby, TourPublic, TourSearch, TourSearchHit, TourSort, TourSuggestion, TourSummary
+from app.tours.autocomplete import MAX_SUGGESTIONS, autocomplete_index, ensure_ready
+from app.tours.cache import get_catalog_json, get_summary_json
+from app.tours.images import IMMUTABLE_CACHE_CONTROL, image_index
+from app.tours.popularity import popularity_counters
+from app.tours.repository import SEARCH_KEYSETS, UPCOMING_KEYSET
+from app.tours.snapshot import BufferResponse, snapshot_store
 from app.tours.service import ToursService
 
 router = APIRouter(prefix="/tours", tags=["Tours"])
 
-@router.get("", response_model=list[TourPublic])
+@router.get("", response_model=list[TourPublic] | list[TourSummary])
 async def get_tours(
-    session: SessionDep,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    cursor: str | None = None,
+    view: Literal["full", "summary"] = "full",
 ):
-    return ToursService.get_tours(session, offset, limit, is_active=True)
+    """
+    Próximas salidas (las que ya partieron no aparecen), por fecha y hora de inicio.
+
+    Página siguiente: `cursor` = header `X-Next-Cursor` de la respuesta anterior.
+
+    `view=summary` devuelve tarjetas livianas (TourSummary); el detalle completo
+    sigue en `/tours/{id}`.
+    """
+    if view == "summary":
+        page = await get_summary_json(offset, limit, cursor)
+        response = Response(content=page.body, media_type="application/json")
+        set_next_cursor(response, page.next_cursor)
+        return response
+
+    # Snapshot mmap compartido por los workers; sin snapshot → cache de JSON
+    snapshot = snapshot_store.current()
+    if snapshot is not None:
+        # Las salidas que partieron después del rebuild se saltean acá
+        first = snapshot.first_upcoming(dt.datetime.now())
+        start = max(first, snapshot.start_after(*UPCOMING_KEYSET.decode(cursor))) if cursor else first + offset
+        last_key = snapshot.last_key(start, limit)
+        headers = {NEXT_CURSOR_HEADER: UPCOMING_KEYSET.encode(last_key)} if last_key is not None else None
+        return BufferResponse(snapshot.page(start, limit), headers=headers)
+
+    page = await get_catalog_json(offset, limit, is_active=True, cursor=cursor, upcoming=True)
+    response = Response(content=page.body, media_type="application/json")
+    set_next_cursor(response, page.next_cursor)
+    return response
+
+@router.get("/search", response_model=list[TourPublic])
+async def search_tours(
+    response: Response,
+    session: AsyncReadSessionDep,
+    filters: Annotated[TourSearch, Depends()],
+    sort: TourSort = TourSort.FECHA,
+    offset: int = 0,
+    limit: Annotated[int, Query(le=100)] = 100,
+    cursor: str | None = None,
+):
+    """
+    Búsqueda en próximas salidas; `sort` con `-` adelante invierte el orden.
+
+    `sort=popular`: más vistos y reservados primero.
+    """
+    tours = await ToursService.search_tours_async(session, filters, sort, offset, limit, cursor)
+    set_next_cursor(response, SEARCH_KEYSETS[sort].next_cursor(tours, limit))
+    return tours
+
+@router.get("/search/text", response_model=list[TourSearchHit])
+async def search_tours_text(
+    session: AsyncReadSessionDep,
+    q: Annotated[str, Query(min_length=2, max_length=200)],
+    offset: int = 0,
+    limit: Annotated[int, Query(le=50)] = 20,
+):
+    """Texto libre ("isla de la plata snorkel"); admite "frase exacta", OR y -excluir."""
+    return await ToursService.search_tours_text_async(session, q, offset, limit)
+
+@router.get("/autocomplete", response_model=list[TourSuggestion])
+async def autocomplete(
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SUGGESTIONS)] = 8,
+):
+    """Destinos, tours y operadoras que empiezan con `q` (sin acentos ni mayúsculas)."""
+    await ensure_ready()
+    return [suggestion._asdict() for suggestion in autocomplete_index.complete(q, limit)]
+
+@router.get("/cercanos", response_model=list[TourNearby])
+async def nearby_tours(
+    session: AsyncReadSessionDep,
+    lat: Annotated[float, Query(ge=-90, le=90)],
+    lon: Annotated[float, Query(ge=-180, le=180)],
+    radio_km: Annotated[float, Query(gt=0, le=500)] = 30,
+    fecha_desde: dt.date | None = None,
+    fecha_hasta: dt.date | None = None,
+    offset: int = 0,
+    limit: Annotated[int, Query(le=50)] = 20,
+):
+    """Próximas salidas a menos de `radio_km` del punto, de la más cercana a la más lejana."""
+    return await ToursService.nearby_tours_async(
+        session, lat, lon, radio_km, fecha_desde, fecha_hasta, offset, limit
+    )
+
+@router.get("/images/{digest}/{name}")
+async def get_tour_image(digest: str, name: str, request: Request):
+    """Variante de una imagen subida (`<ancho>.webp|jpg`); la URL sale de `image_url`."""
+    served = image_index.cached_variant(digest, name) or await asyncio.to_thread(
+        image_index.variant_file, digest, name
+    )
+    if served is None:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    if not served.immutable:
+        # Variante todavía en proceso: el original, sin cache
+        return FileResponse(served.path, stat_result=served.stat, headers={"Cache-Control": "no-cache"})
+
+    headers = cache_headers(f'"{digest}-{name}"', IMMUTABLE_CACHE_CONTROL)
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(served.path, stat_result=served.stat, headers=headers)
+
+@router.get("/{id}/similar", response_model=list[TourSummary])
+async def get_similar_tours(
+    id: int,
+    session: AsyncReadSessionDep,
+    limit: Annotated[int, Query(ge=1, le=settings.SIMILAR_TOURS_K)] = 8,
+):
+    """Quienes reservaron este tour también reservaron… (próximas salidas, de más a menos parecida)."""
+    return await ToursService.similar_tours_async(session, id, limit)
 
 @router.get("/{id}", response_model=TourPublic)
-async def get_tour_by_id(id: int, session: SessionDep):
-    return ToursService.get_tour(session, id)
+async def get_tour_by_id(id: int, request: Request, response: Response, session: AsyncReadSessionDep):
+    snapshot = snapshot_store.current()
+    if snapshot is not None:
+        tour = snapshot.tour(id)
+        if tour is not None:
+            popularity_counters.record_view(id)
+            headers = cache_headers(make_etag("tour", id, snapshot.tour_version(id)), PUBLIC_CACHE_CONTROL)
+            if etag_matches(request, headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            return BufferResponse([tour], headers=headers)
+
+    # Tours inactivos (no están en el snapshot) → BD; primero solo la versión
+    version = await ToursService.get_tour_version_async(session, id)
+    if version is not None:
+        popularity_counters.record_view(id)
+        not_modified = conditional(request, response, make_etag("tour", id, version), PUBLIC_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+    return await ToursService.get_tour_async(session, id)
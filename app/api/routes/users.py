@@ -1,33 +1,49 @@
+import datetime
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.params import Depends
 from sqlmodel import select
 
-from app.auth.deps import SessionDep, get_current_active_superuser
-from app.core.security import get_password_hash
-from app.models import User, UserCreate, UserUpdate
+from app.auth.cache import principal_cache
+from app.auth.deps import SessionDep, ReadSessionDep, get_current_active_superuser
+from app.auth.revocation import auth_epochs, bump_auth_epoch
+from app.core.pagination import Keyset, set_next_cursor
+from app.core.security import password_hasher
+from app.models import Guia, User, UserCreate, UserUpdate
+from app.tours.service import ToursService
 
 router = APIRouter(tags=["users"], dependencies=[Depends(get_current_active_superuser)])
 
 
+def _is_guia(session: SessionDep, user_id: uuid.UUID) -> bool:
+    # Los datos del usuario de un guía salen en el catálogo público (GuiaWithUser)
+    return session.exec(select(Guia.id).where(Guia.id_usuario == user_id)).first() is not None
+
+
 @router.post("/users", response_model=User)
 async def add_user(user: UserCreate, session: SessionDep):
-    db_user = User.model_validate(user, update={"hashed_password": get_password_hash(user.password)})
+    hashed_password = await password_hasher.hash(user.password)
+    db_user = User.model_validate(user, update={"hashed_password": hashed_password})
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
     return db_user
 
+USERS_KEYSET = Keyset("users", User.created_date, User.id, descending=True)
+
+
 @router.get("/users", response_model=list[User])
 async def get_users(
-    session: SessionDep,
+    response: Response,
+    session: ReadSessionDep,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 100,
     estado: Annotated[str, Query(pattern="^(active|inactive|all)$")] = "active",
+    cursor: str | None = None,
 ):
     stmt = select(User)
 
@@ -37,7 +53,8 @@ async def get_users(
         stmt = stmt.where(User.estado_id == 2)
     # all => sin filtro
 
-    users = session.exec(stmt.offset(offset).limit(limit)).all()
+    users = session.exec(USERS_KEYSET.paginate(stmt, offset, limit, cursor)).all()
+    set_next_cursor(response, USERS_KEYSET.next_cursor(users, limit))
     return users
 
 @router.get("/users/{user_id}", response_model=User)
@@ -66,11 +83,22 @@ async def update_user(user_id:uuid.UUID, user: UserUpdate, session: SessionDep):
         existing_user = session.exec(select(User).where(User.email == user.email, User.id != user_id)).first()
         if existing_user:
             raise HTTPException(status_code=409, detail="Este correo ya está en uso")
+    previous = (user_db.email, user_db.rol_id, user_db.estado_id)
     user_data = user.model_dump(exclude_unset=True)
-    user_db.sqlmodel_update(user_data)
+    # updated_date entra en el ETag de las respuestas que incluyen al usuario (guía, tour)
+    user_db.sqlmodel_update(user_data, update={"updated_date": datetime.datetime.now()})
     session.add(user_db)
+    # Cambio de email/rol/estado → revocar los tokens emitidos antes
+    auth_epoch = None
+    if (user_db.email, user_db.rol_id, user_db.estado_id) != previous:
+        auth_epoch = bump_auth_epoch(session=session, user_id=user_id)
     session.commit()
     session.refresh(user_db)
+    if auth_epoch is not None:
+        auth_epochs.remember(user_id, auth_epoch)
+    principal_cache.invalidate(previous[0], user_db.email)
+    if _is_guia(session, user_id):
+        ToursService.catalog_relations_changed()
     return user_db
 
 @router.delete("/users/{user_id}")
@@ -89,8 +117,13 @@ async def delete_user(user_id: uuid.UUID, session: SessionDep):
     #Soft delete: desactivar cuenta
     user_db.estado_id = 2
     session.add(user_db)
+    auth_epoch = bump_auth_epoch(session=session, user_id=user_id)
     session.commit()
     session.refresh(user_db)
+    auth_epochs.remember(user_id, auth_epoch)
+    principal_cache.invalidate(user_db.email)
+    if _is_guia(session, user_id):
+        ToursService.catalog_relations_changed()
     return JSONResponse(
         content={
             "message": "Cuenta desactivada correctamente",
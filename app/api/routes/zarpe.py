@@ -1,34 +1,41 @@
 import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from sqlmodel import select
 
-from app.auth.deps import SessionDep
+from app.auth.deps import SessionDep, AsyncSessionDep, AsyncReadSessionDep
 from app.auth.deps import get_current_active_superuser
+from app.core.pagination import Keyset, set_next_cursor
 from app.models import Zarpe, ZarpeCreate, User, ZarpeUpdate
 
 router = APIRouter(tags=['zarpe'], dependencies=[Depends(get_current_active_superuser)])
 
 
+ZARPE_KEYSET = Keyset("zarpe", Zarpe.id)
+
+
 @router.get("/zarpe", response_model=list[Zarpe])
 async def get_zarpe(
-        session: SessionDep,
+        response: Response,
+        session: AsyncReadSessionDep,
         offset: int = 0,
         limit: Annotated[int, Query(le=100)] = 100,
+        cursor: str | None = None,
 ):
-    zarpes = session.exec(select(Zarpe).offset(offset).limit(limit)).all()
+    zarpes = (await session.exec(ZARPE_KEYSET.paginate(select(Zarpe), offset, limit, cursor))).all()
+    set_next_cursor(response, ZARPE_KEYSET.next_cursor(zarpes, limit))
     return zarpes
 
 
 @router.get('/zarpe/{id}', response_model=Zarpe)
 async def get_zarpe_by_id(
         id: int,
-        session: SessionDep
+        session: AsyncSessionDep
 ):
-    zarpe = session.get(Zarpe, id)
+    zarpe = await session.get(Zarpe, id)
     if not zarpe:
         raise HTTPException(status_code=404, detail="No se encontro Zarpe")
     return zarpe
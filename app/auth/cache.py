@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.models import UserPrincipal
+
+
+class PrincipalCache:
+    """
+    Cache en memoria (por proceso) del usuario autenticado.
+
+    - Clave: `sub` del token (email)
+    - TTL fijo por entrada y tamaño máximo (se expulsa la menos usada)
+    - Las rutas que modifican usuarios deben llamar a `invalidate`
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, UserPrincipal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, subject: str) -> UserPrincipal | None:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, subject: str, principal: UserPrincipal) -> None:
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[subject] = (expires_at, principal)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str | None) -> None:
+        with self._lock:
+            for subject in subjects:
+                if subject is not None:
+                    self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+)
@@ -1,30 +1,72 @@
 from typing import Annotated
 
-import jwt
-from fastapi import Depends, HTTPException, status, Cookie
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, status, Cookie, Request, Response
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
+from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
-from app.core.database import engine
-from app.core.security import SECRET_KEY, ALGORITHM
-from app.models import User
+from app.auth.cache import principal_cache
+from app.auth.revocation import auth_epochs
+from app.core.config import settings
+from app.core.database import engine, async_engine
+from app.core.rate_limit import Rate, client_ip, enforce, limit_by_ip
+from app.core.security import decode_access_token
+from app.core.sessions import LazySession, ReadSession, async_read_session
+from app.models import UserPrincipal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
 
 
 # =========================
 # Sesión DB
+# La conexión se pide al pool recién en la primera query: las requests que
+# salen antes (auth rechazada, respuesta desde cache) no ocupan el pool
 # =========================
 def get_session():
-    with Session(engine) as session:
+    with LazySession(engine) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
 
+# =========================
+# Sesión DB async (rutas de lectura)
+# =========================
+async def get_async_session():
+    # expire_on_commit=False: los objetos se serializan después del commit sin lazy-load
+    async with AsyncSession(async_engine, sync_session_class=LazySession, expire_on_commit=False) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+# =========================
+# Sesión DB de solo lectura (réplicas)
+# Solo para lecturas que toleran algo de lag; lo recién escrito → SessionDep
+#
+# scope="function": la sesión se cierra (y la conexión vuelve al pool) apenas
+# termina la ruta, antes de serializar y enviar la respuesta. Las rutas que la
+# usan deben cargar las relaciones que devuelven (selectinload/joinedload).
+# =========================
+def get_read_session():
+    with ReadSession() as session:
+        yield session
+
+
+async def get_async_read_session():
+    async with async_read_session() as session:
+        yield session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session, scope="function")]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session, scope="function")]
+
+
 # =========================
 # Usuario autenticado
 # =========================
@@ -46,16 +88,37 @@ async def get_current_user(
         raise credentials_exception
 
     try:
-        payload = jwt.decode(jwt_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(jwt_token)
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
     except InvalidTokenError:
         raise credentials_exception
 
-    user = crud.get_user_by_email(session=session, email=username)
+    # Token con claims firmados → se autoriza sin tocar la BD
+    if "uid" in payload and "aep" in payload:
+        try:
+            user = UserPrincipal(
+                id=payload["uid"],
+                email=username,
+                rol_id=payload.get("rol"),
+                estado_id=payload.get("est"),
+                nombre=payload.get("given_name"),
+                apellido=payload.get("family_name"),
+            )
+        except ValidationError:
+            raise credentials_exception
+        if auth_epochs.is_revoked(user.id, payload["aep"]):
+            raise credentials_exception
+        return user
+
+    # Tokens antiguos (solo "sub") → cache / BD
+    user = principal_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = crud.get_principal_by_email(session=session, email=username)
+        if user is None:
+            raise credentials_exception
+        principal_cache.set(username, user)
 
     return user
 
@@ -64,7 +127,7 @@ async def get_current_user(
 # Usuario activo (NORMAL)
 # =========================
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserPrincipal, Depends(get_current_user)],
 ):
     if current_user.estado_id != 1:
         raise HTTPException(status_code=403, detail="El usuario está inactivo")
@@ -75,7 +138,7 @@ async def get_current_active_user(
 # Usuario administrador
 # =========================
 async def get_current_active_superuser(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserPrincipal, Depends(get_current_user)],
 ):
     if current_user.estado_id != 1:
         raise HTTPException(status_code=403, detail="El usuario está inactivo")
@@ -84,3 +147,33 @@ async def get_current_active_superuser(
         raise HTTPException(status_code=403, detail="No tienes los privilegios para realizar esta acción")
 
     return current_user
+
+
+# =========================
+# Rate limiting (login, registro, reservas)
+# =========================
+LOGIN_IP_RATE = Rate.parse(settings.RATE_LIMIT_LOGIN_IP)
+LOGIN_ACCOUNT_RATE = Rate.parse(settings.RATE_LIMIT_LOGIN_ACCOUNT)
+BOOKING_IP_RATE = Rate.parse(settings.RATE_LIMIT_BOOKING_IP)
+BOOKING_USER_RATE = Rate.parse(settings.RATE_LIMIT_BOOKING_USER)
+
+limit_register = limit_by_ip("register", settings.RATE_LIMIT_REGISTER_IP)
+
+
+async def limit_login(
+    request: Request,
+    response: Response,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    # Antes de verificar la contraseña: un burst no llega a Argon2
+    await enforce("login-ip", client_ip(request), LOGIN_IP_RATE, response)
+    await enforce("login-account", form_data.username.strip().lower(), LOGIN_ACCOUNT_RATE, response)
+
+
+async def limit_booking(
+    request: Request,
+    response: Response,
+    current_user: Annotated[UserPrincipal, Depends(get_current_active_user)],
+):
+    await enforce("booking-ip", client_ip(request), BOOKING_IP_RATE, response)
+    await enforce("booking-user", str(current_user.id), BOOKING_USER_RATE, response)
@@ -0,0 +1,102 @@
+import asyncio
+import datetime as dt
+import logging
+import time
+import uuid
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import AuthEpoch
+
+logger = logging.getLogger(__name__)
+
+# Tope de la espera entre reintentos cuando la recarga falla
+_MAX_BACKOFF_SECONDS = 60
+
+
+class AuthEpochMap:
+    """
+    Mapa en memoria id_usuario → epoch de autenticación.
+
+    Cada token lleva el epoch del usuario al momento del login ("aep").
+    Si el epoch actual es mayor, el token fue revocado (cambio de rol,
+    desactivación o cambio de email).
+
+    - Una tarea del lifespan lo recarga completo desde `auth_epoch` cada
+      `refresh_seconds`, en un hilo (la tabla solo tiene filas de usuarios que
+      alguna vez se revocaron). Las requests solo leen el dict: nunca van a la BD
+    - Si la recarga falla se sigue con el mapa anterior y se reintenta con
+      espera creciente
+    - Los cambios hechos en este proceso se aplican al instante; los de otros
+      workers se ven en la siguiente recarga
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._epochs: dict[uuid.UUID, int] = {}
+        self.loaded_at: float | None = None
+
+    def refresh(self) -> None:
+        with Session(engine) as session:
+            rows = session.exec(select(AuthEpoch.id_usuario, AuthEpoch.epoch)).all()
+        epochs = {id_usuario: epoch for id_usuario, epoch in rows}
+        # Los epochs solo suben: un remember() que llegó mientras se leía la tabla no se pisa
+        for user_id, epoch in self._epochs.items():
+            if epoch > epochs.get(user_id, 0):
+                epochs[user_id] = epoch
+        self._epochs = epochs
+        self.loaded_at = time.monotonic()
+
+    def current(self, user_id: uuid.UUID) -> int:
+        return self._epochs.get(user_id, 0)
+
+    def is_revoked(self, user_id: uuid.UUID, token_epoch: int) -> bool:
+        return token_epoch < self.current(user_id)
+
+    def remember(self, user_id: uuid.UUID, epoch: int) -> None:
+        if epoch > self._epochs.get(user_id, 0):
+            self._epochs[user_id] = epoch
+
+
+# ============================================================
+# Lectura / escritura en la tabla auth_epoch
+# ============================================================
+def get_auth_epoch(*, session: Session, user_id: uuid.UUID) -> int:
+    row = session.get(AuthEpoch, user_id)
+    return row.epoch if row else 0
+
+
+def bump_auth_epoch(*, session: Session, user_id: uuid.UUID) -> int:
+    """Incrementa el epoch del usuario dentro de la transacción actual (sin commit)."""
+    stmt = (
+        insert(AuthEpoch)
+        .values(id_usuario=user_id, epoch=1, updated_date=dt.datetime.now())
+        .on_conflict_do_update(
+            index_elements=[AuthEpoch.id_usuario],
+            set_={"epoch": AuthEpoch.epoch + 1, "updated_date": dt.datetime.now()},
+        )
+        .returning(AuthEpoch.epoch)
+    )
+    return session.exec(stmt).scalar_one()
+
+
+auth_epochs = AuthEpochMap(refresh_seconds=settings.AUTH_EPOCH_REFRESH_SECONDS)
+
+
+async def run_refresher() -> None:
+    """Tarea de fondo del lifespan."""
+    failures = 0
+    while True:
+        try:
+            await asyncio.to_thread(auth_epochs.refresh)
+            failures = 0
+        except Exception:
+            failures += 1
+            logger.exception("No se pudo recargar auth_epoch; se sigue con el mapa anterior")
+        delay = auth_epochs.refresh_seconds
+        if failures:
+            delay = min(delay * 2 ** min(failures, 10), max(delay, _MAX_BACKOFF_SECONDS))
+        await asyncio.sleep(delay)
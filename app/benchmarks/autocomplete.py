@@ -0,0 +1,105 @@
+"""
+Microbenchmark del índice de autocompletado (app/tours/autocomplete.py).
+
+Arma un PrefixIndex con tours sintéticos (sin BD) y mide:
+- rebuild completo
+- complete() sin cache (cada prefijo por primera vez) y con cache
+- update_tour (lo que cuesta una edición desde el admin)
+
+Uso:
+    python -m app.benchmarks.autocomplete --tours 20000 --queries 50000
+"""
+import argparse
+import datetime
+import random
+import statistics
+import string
+import time
+from types import SimpleNamespace
+
+from app.tours.autocomplete import PrefixIndex, _row_of
+
+SYLLABLES = ["pla", "ta", "is", "la", "ma", "cha", "li", "lla", "frai", "les", "sa", "lan", "go",
+             "a", "gua", "blan", "ca", "puer", "to", "ló", "pez", "mon", "ñi", "o", "lón", "ca", "yo"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _tours(count: int, rng: random.Random) -> tuple[list[SimpleNamespace], dict[int, int]]:
+    destinos = [f"{_word(rng)} {_word(rng)}" for _ in range(max(count // 40, 1))]
+    operadoras = [SimpleNamespace(nombre=f"{_word(rng)} Tours") for _ in range(max(count // 100, 1))]
+    tours = [
+        SimpleNamespace(
+            id=i,
+            nombre=f"{_word(rng)} de {_word(rng)}",
+            destino=rng.choice(destinos),
+            operadora=rng.choice(operadoras),
+            is_active=True,
+            fecha=datetime.date.max,
+            hora_inicio=datetime.time(8),
+        )
+        for i in range(count)
+    ]
+    reservas = {i: rng.randint(0, 500) for i in range(count)}
+    return tours, reservas
+
+
+def _prefixes(count: int, rng: random.Random) -> list[str]:
+    return [
+        rng.choice(SYLLABLES)[: rng.randint(1, 3)] + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(0, 2)))
+        for _ in range(count)
+    ]
+
+
+def _per_call_us(fn, items) -> list[float]:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    p99 = statistics.quantiles(samples, n=100)[-1]
+    print(f"{label:<22} p50 {statistics.median(samples):8.1f} µs   p99 {p99:8.1f} µs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tours, reservas = _tours(args.tours, rng)
+    rows = [_row_of(tour) for tour in tours]
+    index = PrefixIndex(cache_entries=4096)
+
+    start = time.perf_counter()
+    index.rebuild(rows, reservas)
+    stats = index.stats()
+    print(f"rebuild: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({stats['terms']} términos, {stats['keys']} claves)")
+
+    prefixes = _prefixes(args.queries, rng)
+
+    def cold(prefix: str) -> None:
+        index._cache.clear()
+        index.complete(prefix, args.limit)
+
+    _report("complete sin cache", _per_call_us(cold, prefixes))
+    _report("complete con cache", _per_call_us(lambda p: index.complete(p, args.limit), prefixes))
+
+    def edit(tour: SimpleNamespace) -> None:
+        tour.nombre = f"{_word(rng)} de {_word(rng)}"
+        index.update_tour(tour)
+
+    _report("update_tour", _per_call_us(edit, rng.sample(tours, min(2000, len(tours)))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Catálogo completo (TourPublic) vs tarjetas (TourSummary, `/tours?view=summary`).
+
+Inserta `--tours` tours activos con descripciones, políticas y listas JSONB de
+tamaño realista dentro de una transacción (rollback al final) y, para una
+página de `--limit` tours, mide:
+- bytes del JSON de la respuesta
+- tiempo de consulta + serialización (lo que hace el cache del catálogo al
+  reconstruir una página)
+
+Uso:
+    python -m app.benchmarks.catalog_summary --tours 5000 --limit 100
+"""
+import argparse
+import statistics
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models import TourPublic, TourSummary
+from app.tours.repository import ToursRepository
+
+_SEED = text(
+    """
+    WITH ops AS (SELECT array_agg(id) AS ids FROM operadora),
+         guias AS (SELECT array_agg(id) AS ids FROM guia)
+    INSERT INTO tour (id_operadora, id_guia, nombre, descripcion, fecha, hora_inicio, hora_fin, precio,
+                      capacidad_maxima, destino, image_url, is_active, created_date, politicas,
+                      incluye, no_incluye, que_llevar, itinerario)
+    SELECT ops.ids[1 + n % cardinality(ops.ids)], guias.ids[1 + n % cardinality(guias.ids)],
+           'Tour ' || n, repeat('Recorrido por la costa con paradas para fotos y snorkel. ', 8),
+           current_date + (n % 365), '08:00', '14:00', 20 + n % 80, 15, 'Destino ' || (n % 50),
+           '/images/tours/' || n, true, now(), repeat('Cancelación gratuita hasta 24 horas antes. ', 4),
+           '["Guía bilingüe", "Transporte", "Almuerzo", "Equipo de snorkel", "Seguro"]',
+           '["Propinas", "Bebidas alcohólicas"]',
+           '["Protector solar", "Gorra", "Toalla", "Ropa de cambio"]',
+           '["08:00 Salida", "09:30 Isla", "12:00 Almuerzo", "13:30 Snorkel", "14:00 Regreso"]'
+    FROM generate_series(1, :tours) AS n, ops, guias
+    """
+)
+
+_full_adapter = TypeAdapter(list[TourPublic])
+_summary_adapter = TypeAdapter(list[TourSummary])
+
+
+def _full_page(session: Session, limit: int) -> bytes:
+    tours = ToursRepository.list(session, 0, limit, is_active=True)
+    return _full_adapter.dump_json(_full_adapter.validate_python(tours, from_attributes=True))
+
+
+def _summary_page(session: Session, limit: int) -> bytes:
+    rows = ToursRepository.list_summary(session, 0, limit)
+    return _summary_adapter.dump_json(_summary_adapter.validate_python(rows, from_attributes=True))
+
+
+def _measure(session: Session, build, limit: int, repeat: int) -> tuple[int, list[float]]:
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        session.expunge_all()  # cada vuelta hidrata de nuevo, como un request nuevo
+        start = time.perf_counter()
+        body = build(session, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    return len(body), samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        session.exec(_SEED.bindparams(tours=args.tours))
+        session.exec(text("ANALYZE tour"))
+
+        print(f"Página de {args.limit} tours ({args.repeat} repeticiones):")
+        for label, build in (("TourPublic", _full_page), ("TourSummary", _summary_page)):
+            size, samples = _measure(session, build, args.limit, args.repeat)
+            print(
+                f"  {label:<12} {size / 1024:8.1f} KiB   p50 {statistics.median(samples):7.2f} ms"
+                f"   min {min(samples):7.2f} ms"
+            )
+
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de concurrencia en un solo worker: Session sync vs AsyncSession.
+
+Lanza N lecturas concurrentes del catálogo (ToursRepository.list) desde el
+event loop, igual que lo hacen las rutas `async def`:
+- sync  → Session(engine): cada consulta bloquea el loop, se ejecutan en serie
+- async → AsyncSession(async_engine): las consultas se solapan
+
+--db-latency-ms agrega un pg_sleep por consulta para simular una BD remota.
+
+Uso:
+    python -m app.benchmarks.db_concurrency --requests 200 --concurrency 20 --db-latency-ms 5
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import engine, async_engine
+from app.tours.repository import ToursRepository, AsyncToursRepository
+
+
+def _latency_stmt(db_latency_ms: float):
+    return text("SELECT pg_sleep(:s)").bindparams(s=db_latency_ms / 1000)
+
+
+async def _run_sync(requests: int, concurrency: int, db_latency_ms: float) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler() -> None:
+        async with semaphore:
+            with Session(engine) as session:
+                if db_latency_ms:
+                    session.exec(_latency_stmt(db_latency_ms))
+                ToursRepository.list(session, 0, 100, is_active=True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def _run_async(requests: int, concurrency: int, db_latency_ms: float) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler() -> None:
+        async with semaphore:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                if db_latency_ms:
+                    await session.exec(_latency_stmt(db_latency_ms))
+                await AsyncToursRepository.list(session, 0, 100, is_active=True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def _bench(requests: int, concurrency: int, db_latency_ms: float) -> None:
+    # Calentar ambos pools
+    await _run_sync(concurrency, concurrency, 0)
+    await _run_async(concurrency, concurrency, 0)
+
+    for name, runner in (("sync ", _run_sync), ("async", _run_async)):
+        elapsed = await runner(requests, concurrency, db_latency_ms)
+        print(f"{name} {requests / elapsed:8.1f} req/s  ({elapsed:.3f} s)")
+
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(_bench(args.requests, args.concurrency, args.db_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark de /tours/cercanos con un catálogo grande.
+
+Inserta `--tours` tours con coordenadas repartidas a lo largo de la costa (de
+Esmeraldas a Salinas) y salidas en el próximo año, dentro de una transacción
+(rollback al final). Mide:
+
+- build  → armar el KD-tree (load_points + GeoIndex.rebuild)
+- index  → GeoIndex.nearby: radio + fechas en memoria
+- total  → index + las tarjetas de la página (_summary_by_ids_stmt)
+- sql    → la misma consulta resuelta solo en SQL (caja lat/lon + haversine,
+           sin índice espacial), como referencia
+
+Uso:
+    python -m app.benchmarks.geo --tours 100000 --repeat 50
+"""
+import argparse
+import datetime as dt
+import math
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.tours.geo import EARTH_RADIUS_KM, GeoIndex, load_points
+from app.tours.repository import _summary_by_ids_stmt
+
+# (nombre, lat, lon)
+ORIGINS = [
+    ("Puerto López", -1.5586, -80.8117),
+    ("Montañita", -1.8264, -80.7536),
+    ("Manta", -0.9677, -80.7089),
+    ("Quito (lejos de todo)", -0.1807, -78.4678),
+]
+RADII_KM = [5, 30, 100]
+
+_SEED = text(
+    """
+    INSERT INTO tour (nombre, descripcion, fecha, hora_inicio, hora_fin, precio, capacidad_maxima,
+                      destino, is_active, created_date, latitud, longitud)
+    SELECT 'Geo ' || n, 'bench', current_date + (n % 365), make_time(6 + n % 10, 0, 0), '18:00',
+           20 + n % 80, 15, 'Destino ' || (n % 50), true, now(),
+           -2.3 + 3.3 * ((n::bigint * 7919) % 100000) / 100000.0,
+           -80.95 + 0.35 * ((n::bigint * 104729) % 100000) / 100000.0
+    FROM generate_series(1, :tours) AS n
+    """
+)
+
+_SQL_NEARBY = text(
+    """
+    SELECT id, dist FROM (
+        SELECT id, 2 * :r * asin(sqrt(
+                   power(sin(radians(latitud - :lat) / 2), 2)
+                   + cos(radians(:lat)) * cos(radians(latitud)) * power(sin(radians(longitud - :lon) / 2), 2)
+               )) AS dist
+        FROM tour
+        WHERE is_active AND (fecha, hora_inicio) >= (current_date, localtime)
+          AND fecha BETWEEN :desde AND :hasta
+          AND latitud BETWEEN :lat - :dlat AND :lat + :dlat
+          AND longitud BETWEEN :lon - :dlon AND :lon + :dlon
+    ) t
+    WHERE dist <= :radio
+    ORDER BY dist
+    LIMIT :limit
+    """
+)
+
+
+def _stats(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return f"p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms"
+
+
+def _time(fn, repeat: int) -> tuple[list[float], object]:
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30, help="ventana de fechas de cada búsqueda")
+    args = parser.parse_args()
+
+    desde = dt.date.today()
+    hasta = desde + dt.timedelta(days=args.days)
+
+    with Session(engine) as session:
+        session.exec(_SEED.bindparams(tours=args.tours))
+        session.exec(text("ANALYZE tour"))
+
+        index = GeoIndex(rebuild_pending=512)
+        start = time.perf_counter()
+        points = load_points(session)
+        loaded = time.perf_counter()
+        index.rebuild(points)
+        built = time.perf_counter()
+        print(
+            f"{len(points)} puntos: carga {(loaded - start) * 1000:.0f} ms, "
+            f"KD-tree {(built - loaded) * 1000:.0f} ms"
+        )
+        print(f"ventana de {args.days} días, limit {args.limit}, {args.repeat} repeticiones\n")
+
+        for name, lat, lon in ORIGINS:
+            for radio in RADII_KM:
+                def nearby():
+                    return index.nearby(lat, lon, radio, desde, hasta, 0, args.limit)
+
+                def total():
+                    hits = nearby()
+                    ids = [hit.point.tour_id for hit in hits]
+                    return session.exec(_summary_by_ids_stmt(ids)).all() if ids else []
+
+                dlat = math.degrees(radio / EARTH_RADIUS_KM)
+                sql_stmt = _SQL_NEARBY.bindparams(
+                    r=EARTH_RADIUS_KM, lat=lat, lon=lon, radio=radio, limit=args.limit, desde=desde, hasta=hasta,
+                    dlat=dlat, dlon=dlat / math.cos(math.radians(lat)),
+                )
+
+                def sql():
+                    return session.exec(sql_stmt).all()
+
+                index_ms, hits = _time(nearby, args.repeat)
+                total_ms, _ = _time(total, args.repeat)
+                sql_ms, rows = _time(sql, args.repeat)
+                assert [hit.point.tour_id for hit in hits] == [row.id for row in rows], (
+                    "el índice y SQL deberían encontrar lo mismo"
+                )
+                print(f"{name:<22} {radio:>4} km  {len(hits):>3} resultados")
+                print(f"    index {_stats(index_ms)}")
+                print(f"    total {_stats(total_ms)}")
+                print(f"    sql   {_stats(sql_ms)}")
+
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de throughput de login: Argon2 en línea vs pool de procesos.
+
+Simula una ráfaga de logins concurrentes sobre un mismo worker y mide:
+- logins por segundo
+- retraso del event loop (un "ticker" que debería despertar cada 10 ms)
+
+Uso:
+    python -m app.benchmarks.login_throughput --logins 64 --concurrency 16 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.security import PasswordHasherPool, get_password_hash
+
+TICK_SECONDS = 0.01
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def _run(hasher: PasswordHasherPool, hashed: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            assert await hasher.verify("password", hashed)
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "logins_per_second": round(logins / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+        "loop_lag_p50_ms": round(statistics.median(lags_ms), 2),
+        "loop_lag_max_ms": round(lags_ms[-1], 2),
+    }
+
+
+async def _bench(logins: int, concurrency: int, workers: int) -> None:
+    hashed = get_password_hash("password")
+
+    inline = PasswordHasherPool(max_workers=0)
+    print("inline  ", await _run(inline, hashed, logins, concurrency))
+
+    pool = PasswordHasherPool(max_workers=workers)
+    pool.start()
+    try:
+        print(f"pool({workers})", await _run(pool, hashed, logins, concurrency))
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(_bench(args.logins, args.concurrency, args.workers))
+
+
+if __name__ == "__main__":
+    main()
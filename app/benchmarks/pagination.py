@@ -0,0 +1,84 @@
+"""
+Benchmark de paginación: OFFSET vs cursor (keyset) en una página profunda.
+
+Inserta `--rows` reservas de prueba dentro de una transacción (se hace
+rollback al final, la tabla queda como estaba) y mide el listado admin
+(`_list_all_stmt`: created_date DESC, id DESC) en la página `--page`:
+- offset → OFFSET page*limit: la base recorre y descarta todas las filas anteriores
+- cursor → WHERE (created_date, id) < (…): entra directo por ix_reservas_created_id
+
+Uso:
+    python -m app.benchmarks.pagination --rows 200000 --page 1000 --limit 100
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.reservas.repository import RESERVAS_KEYSET, _list_all_stmt
+
+_SEED = text(
+    """
+    INSERT INTO reservas (id_reserva_estado, nombre_cliente, email_cliente, numero_personas, created_date)
+    SELECT 1, 'bench ' || n, 'bench' || n || '@example.com', 1 + n % 5,
+           now() - make_interval(secs => n)
+    FROM generate_series(1, :rows) AS n
+    """
+)
+
+
+def _time_ms(session: Session, stmt, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.exec(stmt).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<7} p50 {statistics.median(samples):8.2f} ms"
+        f"   min {min(samples):8.2f} ms   max {max(samples):8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    offset = args.page * args.limit
+    if offset >= args.rows:
+        parser.error("--rows tiene que superar --page × --limit")
+
+    with Session(engine) as session:
+        session.exec(_SEED.bindparams(rows=args.rows))
+        session.exec(text("ANALYZE reservas"))
+
+        # Cursor de la página pedida: lo que el cliente habría recibido en la anterior
+        previous = session.exec(_list_all_stmt(offset - args.limit, args.limit)).unique().all()
+        cursor = RESERVAS_KEYSET.next_cursor(previous, args.limit)
+
+        offset_stmt = _list_all_stmt(offset, args.limit)
+        cursor_stmt = _list_all_stmt(0, args.limit, cursor)
+
+        by_offset = session.exec(offset_stmt).unique().all()
+        by_cursor = session.exec(cursor_stmt).unique().all()
+        assert [r.id for r in by_offset] == [r.id for r in by_cursor], "las dos páginas deberían coincidir"
+
+        print(f"{args.rows} reservas, página {args.page} (limit {args.limit}):")
+        _report("offset", _time_ms(session, offset_stmt, args.repeat))
+        _report("cursor", _time_ms(session, cursor_stmt, args.repeat))
+
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Contadores de popularidad (app/tours/popularity.py) y `sort=popular`.
+
+Inserta `--tours` tours próximos dentro de una transacción (rollback al final).
+Mide:
+
+- directo  → un UPDATE de tour_popularity por vista (lo que se evita)
+- memoria  → PopularityCounters.record_view por vista
+- volcado  → apply_batch de todas las vistas acumuladas (un upsert)
+- búsqueda → /tours/search con sort=popular vs sort=fecha (primera página)
+
+Uso:
+    python -m app.benchmarks.popularity --tours 20000 --views 200000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models import TourSearch, TourSort
+from app.tours.popularity import PopularityCounters, apply_batch
+from app.tours.repository import _search_stmt
+
+_SEED = text(
+    """
+    INSERT INTO tour (nombre, descripcion, fecha, hora_inicio, hora_fin, precio, capacidad_maxima,
+                      destino, is_active, created_date)
+    SELECT 'Popular ' || n, 'bench-popular', current_date + 1 + (n % 300), '08:00', '18:00',
+           20 + n % 80, 15, 'Destino ' || (n % 50), true, now()
+    FROM generate_series(1, :tours) AS n
+    RETURNING id
+    """
+)
+_DIRECT = text(
+    """
+    INSERT INTO tour_popularity (tour_id, views, reservas, updated_date) VALUES (:id, 1, 0, now())
+    ON CONFLICT (tour_id) DO UPDATE SET views = tour_popularity.views + 1, updated_date = now()
+    """
+)
+
+
+def _stats(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return f"p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=20_000)
+    parser.add_argument("--views", type=int, default=200_000)
+    parser.add_argument("--direct", type=int, default=2_000, help="vistas escritas una por una")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with Session(engine) as session:
+        tour_ids = session.exec(_SEED.bindparams(tours=args.tours)).scalars().all()
+        session.exec(text("ANALYZE tour"))
+        # Pocas salidas se llevan casi todas las vistas
+        views = rng.choices(tour_ids, weights=[1 / (i + 1) for i in range(len(tour_ids))], k=args.views)
+
+        start = time.perf_counter()
+        for tour_id in views[: args.direct]:
+            session.exec(_DIRECT.bindparams(id=tour_id))
+        direct = (time.perf_counter() - start) / args.direct
+        print(f"directo   {direct * 1e6:9.1f} µs/vista (sin contar el commit de cada request)")
+
+        counters = PopularityCounters()
+        start = time.perf_counter()
+        for tour_id in views:
+            counters.record_view(tour_id)
+        memory = (time.perf_counter() - start) / len(views)
+        print(f"memoria   {memory * 1e6:9.2f} µs/vista")
+
+        batch = counters.take()
+        start = time.perf_counter()
+        apply_batch(session, batch)
+        flushed = time.perf_counter() - start
+        print(f"volcado   {flushed * 1000:9.1f} ms para {len(batch.tour_ids)} tours ({len(views)} vistas)\n")
+
+        for sort in (TourSort.POPULAR, TourSort.FECHA):
+            samples = []
+            for _ in range(args.repeat):
+                begin = time.perf_counter()
+                session.exec(_search_stmt(TourSearch(), sort, 0, 20)).all()
+                samples.append((time.perf_counter() - begin) * 1000)
+            print(f"sort={sort.value:<8} {_stats(samples)}")
+
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Microbenchmark del rate limiter en memoria.
+
+Mide el costo por request de:
+- MemoryBackend.hit (la cuenta de la ventana deslizante)
+- la dependencia completa de FastAPI (`enforce`: hit + headers RateLimit-*)
+
+con muchas claves distintas (IPs/cuentas) y con una sola clave caliente.
+
+Uso:
+    python -m app.benchmarks.rate_limit --hits 200000 --keys 10000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException, Response
+
+from app.core.rate_limit import MemoryBackend, Rate, enforce
+
+
+def bench_hit(hits: int, keys: int) -> float:
+    backend = MemoryBackend()
+    rate = Rate(limit=1_000_000, window_seconds=60)
+    names = [f"ip:{i}" for i in range(keys)]
+
+    start = time.perf_counter()
+    for i in range(hits):
+        backend.hit(names[i % keys], rate)
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+async def _bench_enforce(hits: int, keys: int) -> float:
+    rate = Rate(limit=10, window_seconds=60)
+    names = [f"ip:{i}" for i in range(keys)]
+
+    start = time.perf_counter()
+    for i in range(hits):
+        try:
+            await enforce("bench", names[i % keys], rate, Response())
+        except HTTPException:
+            pass  # la mayoría se rechaza: también es parte del costo
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hits", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"hit        {args.keys} claves: {bench_hit(args.hits, args.keys):.2f} µs/request")
+    print(f"hit        1 clave:      {bench_hit(args.hits, 1):.2f} µs/request")
+    print(f"enforce    {args.keys} claves: {asyncio.run(_bench_enforce(args.hits, args.keys)):.2f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Chequeo de planes de /tours/search sobre un catálogo grande.
+
+Inserta `--tours` tours activos (más algunos inactivos) y `--reservas` reservas
+dentro de una transacción (rollback al final), corre ANALYZE y pide
+EXPLAIN de `_search_stmt` para cada combinación de filtros y cada orden.
+Falla (exit 1) si algún plan hace Seq Scan sobre `tour` o `reservas`, o si
+una combinación con un filtro selectivo (destino, una semana, un rango de
+precio...) no lo usa como Index Cond: todas tienen que entrar por los índices
+ix_tour_search_* / ix_reservas_tour_ocupacion. También corre con pytest
+(app/tests/test_search_plans.py).
+
+Uso:
+    python -m app.benchmarks.search_plans --tours 200000 --reservas 400000
+"""
+import argparse
+import datetime as dt
+import itertools
+import json
+import re
+import sys
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models import TourSearch, TourSort
+from app.tours.repository import _search_stmt
+
+DESTINOS = 200
+# Tamaño del catálogo de prueba (los planes dependen de las estadísticas: con pocas filas todo es Seq Scan)
+TOURS = 200_000
+RESERVAS = 400_000
+
+_SEED_TOURS = text(
+    """
+    WITH ops AS (SELECT array_agg(id) AS ids FROM operadora),
+         guias AS (SELECT array_agg(id) AS ids FROM guia)
+    INSERT INTO tour (id_operadora, id_guia, nombre, descripcion, fecha, hora_inicio, hora_fin,
+                      precio, capacidad_maxima, destino, is_active, created_date)
+    SELECT ops.ids[1 + n % cardinality(ops.ids)], guias.ids[1 + n % cardinality(guias.ids)],
+           'Tour ' || md5(n::text), 'bench', current_date + (n % 730), '08:00', '12:00',
+           10 + (n * 7919) % 490, 10 + n % 20, 'Destino ' || (n % :destinos), n % 20 <> 0, now()
+    FROM generate_series(1, :tours) AS n, ops, guias
+    """
+)
+
+_SEED_RESERVAS = text(
+    """
+    WITH seeded AS (SELECT array_agg(id) AS ids FROM tour WHERE descripcion = 'bench')
+    INSERT INTO reservas (id_tour, id_reserva_estado, nombre_cliente, email_cliente, numero_personas, created_date)
+    SELECT seeded.ids[1 + (n * 31) % cardinality(seeded.ids)], 1 + n % 3, 'bench', 'bench@example.com',
+           1 + n % 5, now()
+    FROM generate_series(1, :reservas) AS n, seeded
+    """
+)
+
+# Valores selectivos para cada filtro (un destino, una semana, un rango de precio...)
+_FILTERS = {
+    "destino": {"destino": "Destino 7"},
+    "fecha": {"fecha_desde": dt.date.today() + dt.timedelta(days=30),
+              "fecha_hasta": dt.date.today() + dt.timedelta(days=37)},
+    "precio": {"precio_min": 100, "precio_max": 105},
+    "operadora": {"id_operadora": None},
+    "guia": {"id_guia": None},
+    "cupos": {"cupos_min": 5},
+}
+# Cómo aparece cada filtro en un Index Cond: "((destino)::text = ...)", "(precio >= ...)".
+# fecha con el valor del filtro (no el ROW(fecha, hora_inicio) de _upcoming ni lo que se deriva de él).
+# cupos sale de reservas: no tiene índice propio en tour
+def _index_cond_patterns(filters: dict[str, dict]) -> dict[str, re.Pattern]:
+    def column(name: str, value: str = "") -> re.Pattern:
+        return re.compile(rf"\({name}(\)::\w+)? [<>]?= {re.escape(value)}")
+
+    return {
+        "destino": column("destino"),
+        "fecha": column("fecha", f"'{filters['fecha']['fecha_desde']}'"),
+        "precio": column("precio"),
+        "operadora": column("id_operadora"),
+        "guia": column("id_guia"),
+    }
+
+
+# Un filtro que deja menos de esta fracción del catálogo tiene que entrar por índice
+SELECTIVE = 0.05
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in ("tour", "reservas"):
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += _seq_scans(child)
+    return found
+
+
+def _index_conds(plan: dict) -> list[str]:
+    found = [plan["Index Cond"]] if "Index Cond" in plan else []
+    for child in plan.get("Plans", []):
+        found += _index_conds(child)
+    return found
+
+
+def _explain(session: Session, stmt) -> dict:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    row = session.exec(text(f"EXPLAIN (FORMAT JSON) {sql}")).one()
+    plan = row[0] if not isinstance(row[0], str) else json.loads(row[0])
+    return plan[0]["Plan"]
+
+
+def seed(session: Session, tours: int = TOURS, reservas: int = RESERVAS) -> None:
+    """Catálogo de prueba dentro de la transacción de `session` (quien llama hace rollback)."""
+    session.exec(_SEED_TOURS.bindparams(tours=tours, destinos=DESTINOS))
+    session.exec(_SEED_RESERVAS.bindparams(reservas=reservas))
+    # tour_popularity recibe una fila por tour (trigger): sin estadísticas el planner la cree vacía
+    for table in ("tour", "reservas", "tour_popularity"):
+        session.exec(text(f"ANALYZE {table}"))
+
+
+def _filters(session: Session) -> dict[str, dict]:
+    filters = {name: dict(values) for name, values in _FILTERS.items()}
+    filters["operadora"]["id_operadora"] = session.exec(text("SELECT min(id) FROM operadora")).one()[0]
+    filters["guia"]["id_guia"] = session.exec(text("SELECT min(id) FROM guia")).one()[0]
+    return filters
+
+
+def _selective(session: Session, filters: dict[str, dict], indexed: set[str]) -> set[str]:
+    """Filtros con índice que dejan menos de SELECTIVE de los tours que ve /tours/search."""
+    def count(values: dict) -> int:
+        stmt = _search_stmt(TourSearch(**values), TourSort.FECHA, 0, None).order_by(None)
+        return session.exec(select(func.count()).select_from(stmt.subquery())).one()
+
+    total = count({}) or 1
+    return {name for name in indexed if count(filters[name]) < total * SELECTIVE}
+
+
+def check_plans(session: Session, limit: int = 100, verbose: bool = False) -> tuple[int, list[str]]:
+    """
+    (planes revisados, fallas) de cada combinación de filtros × orden. Falla si
+    hay un Seq Scan sobre tour/reservas, o si la combinación tiene un filtro
+    selectivo y ninguno aparece como Index Cond: recorrer entero un índice de
+    orden filtrando fila por fila es justo el plan lento que se quiere evitar.
+    """
+    filters = _filters(session)
+    patterns = _index_cond_patterns(filters)
+    selective = _selective(session, filters, set(patterns))
+    combinations = [
+        combo for size in range(len(filters) + 1) for combo in itertools.combinations(filters, size)
+    ]
+    failures = []
+    for combo, sort in itertools.product(combinations, TourSort):
+        values = {k: v for name in combo for k, v in filters[name].items()}
+        plan = _explain(session, _search_stmt(TourSearch(**values), sort, 0, limit))
+        label = f"{'+'.join(combo) or '(sin filtros)'} sort={sort.value}"
+        wanted = selective.intersection(combo)
+        conds = _index_conds(plan)
+        if scans := _seq_scans(plan):
+            problem = f"SEQ SCAN {label}: {', '.join(scans)}"
+        elif wanted and not any(patterns[name].search(cond) for name in wanted for cond in conds):
+            problem = f"FILTRO   {label}: ni {', '.join(sorted(wanted))} en un Index Cond"
+        else:
+            if verbose:
+                print(f"ok       {label}")
+            continue
+        failures.append(problem)
+        print(problem)
+        if verbose:
+            print(json.dumps(plan, indent=2))
+    return len(combinations) * len(TourSort), failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=TOURS)
+    parser.add_argument("--reservas", type=int, default=RESERVAS)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostrar el plan de cada combinación")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        seed(session, args.tours, args.reservas)
+        total, failures = check_plans(session, args.limit, args.verbose)
+        session.rollback()
+
+    print(f"{total - len(failures)}/{total} planes usan índices")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark del recálculo de tours similares (app/tours/similar.py).
+
+Inserta `--tours` tours, `--users` usuarios y `--reservas` reservas con
+"gustos" (cada usuario reserva casi siempre tours de su grupo) dentro de una
+transacción: la sesión del job trabaja con savepoints, así que sus commits no
+salen de la transacción y al final se hace rollback. Mide:
+
+- full        → refresh(): pares desde la BD, Xᵀ·X, top-k y escritura de la tabla
+- incremental → refresh(since): `--nuevas` reservas recién creadas
+- endpoint    → _similar_stmt (la consulta de /tours/{id}/similar)
+
+Uso:
+    python -m app.benchmarks.similar --tours 20000 --users 300000 --reservas 2000000
+"""
+import argparse
+import datetime as dt
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.tours.repository import _similar_stmt
+from app.tours.similar import refresh
+
+GROUPS = 200
+
+_SEED_TOURS = text(
+    """
+    INSERT INTO tour (nombre, descripcion, fecha, hora_inicio, hora_fin, precio, capacidad_maxima,
+                      destino, is_active, created_date)
+    SELECT 'Similar ' || n, 'bench-similar', current_date + 1 + (n % 300), '08:00', '18:00',
+           20 + n % 80, 15, 'Destino ' || (n % 50), true, now()
+    FROM generate_series(0, :tours - 1) AS n
+    """
+)
+_SEED_USERS = text(
+    """
+    INSERT INTO "user" (id, rol_id, estado_id, cedula, nombre, apellido, email, hashed_password, created_date)
+    SELECT gen_random_uuid(), (SELECT min(id) FROM rol), (SELECT min(id) FROM estado),
+           'S' || lpad(n::text, 9, '0'), 'Bench', 'Similar', 'similar' || n || '@example.com', '-', now()
+    FROM generate_series(0, :users - 1) AS n
+    """
+)
+# Usuario al azar; 80% de sus reservas en tours de su grupo (usuario % GROUPS), el resto al azar
+_SEED_RESERVAS = text(
+    f"""
+    WITH t AS (
+        SELECT id, (row_number() OVER (ORDER BY id) - 1)::int AS i FROM tour WHERE descripcion = 'bench-similar'
+    ),
+    u AS (
+        SELECT id, (row_number() OVER (ORDER BY email) - 1)::int AS i FROM "user" WHERE apellido = 'Similar'
+    ),
+    r AS (
+        SELECT ui, CASE WHEN random() < 0.2 THEN floor(random() * :tours)::int
+                        ELSE ui % {GROUPS} + {GROUPS} * floor(random() * (:tours / {GROUPS}))::int
+                   END AS ti
+        FROM (SELECT floor(random() * :users)::int AS ui FROM generate_series(1, :reservas)) s
+    )
+    INSERT INTO reservas (id_tour, id_usuario, id_reserva_estado, nombre_cliente, email_cliente,
+                          numero_personas, created_date)
+    SELECT t.id, u.id, 1, 'bench', 'bench@example.com', 1, :created
+    FROM r JOIN t ON t.i = r.ti JOIN u ON u.i = r.ui
+    """
+)
+
+
+def _stats(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return f"p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=300_000)
+    parser.add_argument("--reservas", type=int, default=2_000_000)
+    parser.add_argument("--nuevas", type=int, default=100, help="reservas de la vuelta incremental")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        outer = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        now = dt.datetime.now()
+        session.exec(text("SELECT setseed(0.42)"))
+
+        start = time.perf_counter()
+        session.exec(_SEED_TOURS.bindparams(tours=args.tours))
+        session.exec(_SEED_USERS.bindparams(users=args.users))
+        session.exec(
+            _SEED_RESERVAS.bindparams(
+                tours=args.tours, users=args.users, reservas=args.reservas, created=now - dt.timedelta(days=30)
+            )
+        )
+        session.exec(text("ANALYZE reservas"))
+        session.exec(text('ANALYZE "user"'))
+        print(f"datos de prueba: {time.perf_counter() - start:.1f} s\n")
+
+        full = refresh(session)
+        print(f"full         {full.seconds:7.2f} s  {full.tours} tours, {full.rows} filas")
+
+        session.exec(
+            _SEED_RESERVAS.bindparams(
+                tours=args.tours, users=args.users, reservas=args.nuevas, created=now
+            )
+        )
+        incremental = refresh(session, since=now - dt.timedelta(minutes=1))
+        print(f"incremental  {incremental.seconds:7.2f} s  {incremental.tours} tours, {incremental.rows} filas")
+
+        tour_ids = session.exec(
+            text("SELECT DISTINCT tour_id FROM tour_similar ORDER BY tour_id LIMIT :n").bindparams(n=args.repeat)
+        ).scalars().all()
+        samples = []
+        for tour_id in tour_ids:
+            begin = time.perf_counter()
+            session.exec(_similar_stmt(tour_id, 8)).all()
+            samples.append((time.perf_counter() - begin) * 1000)
+        print(f"endpoint     {_stats(samples)}")
+
+        session.close()
+        outer.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark de /tours/search/text sobre un catálogo grande.
+
+Inserta `--tours` tours con texto en español (nombres, descripciones,
+itinerarios) dentro de una transacción (rollback al final), corre ANALYZE y
+mide `_text_search_stmt` para varias búsquedas típicas: latencia p50/p95 y
+cantidad de resultados. También muestra el plan de la primera búsqueda
+(tiene que usar ix_tour_search_vector).
+
+Uso:
+    python -m app.benchmarks.text_search --tours 100000 --repeat 30
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.tours.repository import _text_search_stmt
+
+QUERIES = [
+    "isla de la plata snorkel",
+    "ballenas jorobadas",
+    "excursión en lancha",
+    '"bosque seco" -playa',
+    "buceo OR snorkel",
+    "almuerzo típico incluido",
+]
+
+_SEED = text(
+    """
+    WITH words AS (
+        SELECT ARRAY['Isla de la Plata', 'Machalilla', 'Los Frailes', 'Salango', 'Agua Blanca',
+                     'Puerto López', 'Montañita', 'Ayampe', 'Olón', 'Puerto Cayo'] AS lugares,
+               ARRAY['snorkel', 'ballenas jorobadas', 'piqueros de patas azules', 'bosque seco',
+                     'excursión en lancha', 'caminata guiada', 'playa', 'arrecife de coral',
+                     'avistamiento de aves', 'buceo', 'kayak', 'surf', 'museo arqueológico',
+                     'aguas termales', 'cascada', 'almuerzo típico', 'mirador', 'manglar'] AS actividades
+    )
+    INSERT INTO tour (nombre, descripcion, fecha, hora_inicio, hora_fin, precio, capacidad_maxima,
+                      destino, is_active, created_date, itinerario, incluye)
+    SELECT lugares[1 + n % 10] || ' ' || n,
+           'Tour de ' || actividades[1 + n % 18] || ' y ' || actividades[1 + (n / 18) % 18]
+               || ' con salida desde ' || lugares[1 + (n / 7) % 10] || '.',
+           current_date + (n % 365), '08:00', '14:00', 20 + n % 80, 10 + n % 15,
+           lugares[1 + n % 10], n % 10 <> 0, now(),
+           jsonb_build_array('Salida del muelle', 'Parada para ' || actividades[1 + (n / 5) % 18]),
+           jsonb_build_array('Guía bilingüe', CASE WHEN n % 3 = 0 THEN 'Almuerzo típico incluido' ELSE 'Agua' END)
+    FROM generate_series(1, :tours) AS n, words
+    """
+)
+
+
+def _time(session: Session, stmt, repeat: int) -> tuple[list[float], int]:
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(session.exec(stmt).all())
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tours", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        session.exec(_SEED.bindparams(tours=args.tours))
+        session.exec(text("ANALYZE tour"))
+        # Lo que haría autovacuum: pasar la pending list de GIN al índice
+        session.exec(text("SELECT gin_clean_pending_list('ix_tour_search_vector')"))
+
+        first = _text_search_stmt(QUERIES[0], 0, args.limit)
+        compiled = first.compile(dialect=engine.dialect)
+        plan = session.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+        print("\n".join(row[0] for row in plan))
+        print()
+
+        print(f"{args.tours} tours, limit {args.limit}, {args.repeat} repeticiones:")
+        for q in QUERIES:
+            samples, rows = _time(session, _text_search_stmt(q, 0, args.limit), args.repeat)
+            p95 = statistics.quantiles(samples, n=20)[-1]
+            print(f"  {q!r:<30} p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms   {rows} resultados")
+
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
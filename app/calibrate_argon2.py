@@ -0,0 +1,85 @@
+"""
+Calibra los parámetros de Argon2 para el host actual.
+
+Busca la mayor memoria (empezando por --max-memory-mib) y luego el mayor
+time_cost cuya verificación quede por debajo de la latencia objetivo.
+Imprime las variables a copiar en el .env:
+
+    python -m app.calibrate_argon2 --target-ms 250
+
+Los hashes existentes se actualizan solos en el siguiente login exitoso
+(crud.authenticate → verify_and_update).
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from app.core.security import build_password_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# OWASP: argon2id con 19 MiB es el mínimo recomendable
+MIN_MEMORY_MIB = 19
+MAX_TIME_COST = 10
+
+
+def measure_verify_ms(time_cost: int, memory_mib: int, parallelism: int, samples: int) -> float:
+    password_hash = build_password_hash(
+        time_cost=time_cost, memory_cost=memory_mib * 1024, parallelism=parallelism
+    )
+    hashed = password_hash.hash("calibration-password")
+    password_hash.verify("calibration-password", hashed)  # warm-up
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        password_hash.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, max_memory_mib: int, parallelism: int, samples: int) -> dict | None:
+    memory_mib = max_memory_mib
+    while memory_mib >= MIN_MEMORY_MIB:
+        best = None
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            latency = measure_verify_ms(time_cost, memory_mib, parallelism, samples)
+            logger.info("t=%s m=%sMiB p=%s → %.1f ms", time_cost, memory_mib, parallelism, latency)
+            if latency > target_ms:
+                break
+            best = {
+                "time_cost": time_cost,
+                "memory_cost": memory_mib * 1024,
+                "parallelism": parallelism,
+                "verify_ms": round(latency, 1),
+            }
+        if best:
+            return best
+        memory_mib //= 2
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latencia objetivo de verify")
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--parallelism", type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms, args.max_memory_mib, args.parallelism, args.samples)
+    if result is None:
+        logger.error("Ninguna configuración (>= %s MiB) cumple %.0f ms", MIN_MEMORY_MIB, args.target_ms)
+        raise SystemExit(1)
+
+    logger.info("Verify en %.1f ms", result["verify_ms"])
+    print(f"ARGON2_TIME_COST={result['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={result['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={result['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
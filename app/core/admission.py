@@ -0,0 +1,122 @@
+"""
+Control de admisión: rechaza rápido (503 + Retry-After) el tráfico de menor
+prioridad cuando el proceso está saturado, en vez de encolarlo en el pool.
+
+Prioridad por prefijo de path (ADMISSION_PRIORITIES), opcionalmente con método:
+
+    {"GET /api/v1/tours": "low", "/api/v1/stripe/webhook": "critical"}
+
+- low:      se descarta primero (catálogo público, listados de admin)
+- normal:   se descarta con saturación alta
+- critical: nunca se descarta (reservas, checkout, pagos, webhook de Stripe)
+
+Saturación = requests en curso (por worker) y espera promedio en el pool.
+"""
+import threading
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.pool_stats import max_wait_ewma_ms
+
+PRIORITIES = ("critical", "normal", "low")
+
+# Fracción de ADMISSION_MAX_IN_FLIGHT / múltiplo de ADMISSION_POOL_WAIT_MS
+# a partir del cual se descarta cada prioridad
+SHED_IN_FLIGHT = {"low": 0.5, "normal": 0.8}
+SHED_POOL_WAIT = {"low": 1.0, "normal": 3.0}
+
+
+class AdmissionController:
+    def __init__(self, priorities: dict[str, str], max_in_flight: int, pool_wait_ms: float):
+        self.max_in_flight = max_in_flight
+        self.pool_wait_ms = pool_wait_ms
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = dict.fromkeys(PRIORITIES, 0)
+        self.shed = dict.fromkeys(PRIORITIES, 0)
+        self._lock = threading.Lock()
+
+        # (método | None, prefijo, prioridad), del prefijo más largo al más corto
+        rules = []
+        for key, priority in priorities.items():
+            if priority not in PRIORITIES:
+                raise ValueError(f"Prioridad inválida '{priority}' para '{key}'")
+            method, _, prefix = key.rpartition(" ")
+            rules.append((method or None, prefix.rstrip("/"), priority))
+        self.rules = sorted(rules, key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+
+    def priority_for(self, method: str, path: str) -> str:
+        for rule_method, prefix, priority in self.rules:
+            if rule_method is not None and rule_method != method:
+                continue
+            if path == prefix or path.startswith(prefix + "/"):
+                return priority
+        return "normal"
+
+    def should_shed(self, priority: str) -> bool:
+        if priority == "critical":
+            return False
+        if self.in_flight >= self.max_in_flight * SHED_IN_FLIGHT[priority]:
+            return True
+        return max_wait_ewma_ms() >= self.pool_wait_ms * SHED_POOL_WAIT[priority]
+
+    def try_enter(self, priority: str) -> bool:
+        with self._lock:
+            if self.should_shed(priority):
+                self.shed[priority] += 1
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.admitted[priority] += 1
+            return True
+
+    def leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "pool_wait_ewma_ms": round(max_wait_ewma_ms(), 3),
+                "pool_wait_threshold_ms": self.pool_wait_ms,
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+            }
+
+
+admission = AdmissionController(
+    priorities=settings.ADMISSION_PRIORITIES,
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    pool_wait_ms=settings.ADMISSION_POOL_WAIT_MS,
+)
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.controller.priority_for(scope["method"], scope["path"])
+        if not self.controller.try_enter(priority):
+            response = JSONResponse(
+                {"detail": "Servicio saturado, intente nuevamente en unos segundos"},
+                status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.leave()
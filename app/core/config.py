@@ -31,8 +31,22 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Anillo de claves JWT compartido entre workers/nodos (ver app/core/keyring.py)
+    JWT_KEYRING_FILE: str | None = None
+    JWT_KEYRING_RELOAD_SECONDS: int = 30
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Cache en memoria del usuario autenticado (0 = desactivado)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+    # Cada cuánto se recarga la tabla auth_epoch (revocación de tokens)
+    AUTH_EPOCH_REFRESH_SECONDS: int = 5
+    # Procesos dedicados a Argon2 (0 = hash/verify en el event loop)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Parámetros de Argon2 (None = default de la librería). Calibrar con app.calibrate_argon2
+    ARGON2_TIME_COST: int | None = None
+    ARGON2_MEMORY_COST: int | None = None  # KiB
+    ARGON2_PARALLELISM: int | None = None
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -67,6 +81,94 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Pool de conexiones (por engine y por worker de uvicorn):
+    # conexiones máximas a Postgres ≈ workers × engines × (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # segundos; -1 desactiva
+    DB_POOL_PRE_PING: bool = True
+
+    # Conteo de queries por request (app/core/query_stats.py)
+    QUERY_N1_THRESHOLD: int = 5  # misma sentencia N veces en un request → probable N+1
+    QUERY_BUDGETS: dict[str, int] = {}  # {"GET /api/v1/tours": 2, ...}
+    QUERY_BUDGET_ENFORCE: bool = False  # true en tests: excederse falla el request
+
+    # Control de admisión (app/core/admission.py), por worker
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_POOL_WAIT_MS: float = 100.0  # espera promedio en el pool que empieza a descartar "low"
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    ADMISSION_PRIORITIES: dict[str, str] = {
+        "POST /api/v1/reservas": "critical",
+        "/api/v1/checkout": "critical",
+        "/api/v1/pagos": "critical",
+        "/api/v1/stripe/webhook": "critical",
+        "GET /api/v1/tours": "low",
+        "GET /api/v1/admin": "low",
+        "GET /public": "low",
+    }
+
+    # Rate limiting (app/core/rate_limit.py); formato "N/second|minute|hour|day"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: str | None = None  # compartido entre workers; sin esto es por proceso
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # usar X-Forwarded-For (solo detrás de un proxy propio)
+    RATE_LIMIT_LOGIN_IP: str = "30/minute"
+    RATE_LIMIT_LOGIN_ACCOUNT: str = "10/minute"
+    RATE_LIMIT_REGISTER_IP: str = "10/hour"
+    RATE_LIMIT_BOOKING_USER: str = "20/minute"
+    RATE_LIMIT_BOOKING_IP: str = "60/minute"
+
+    # Cache del JSON del catálogo público (app/tours/cache.py), por proceso
+    CATALOG_CACHE_TTL_SECONDS: int = 30  # 0 desactiva
+    CATALOG_CACHE_STALE_SECONDS: int = 300  # se sirve vencido mientras se reconstruye
+    CATALOG_CACHE_MAX_ENTRIES: int = 256
+
+    # Snapshot mmap del catálogo activo (app/tours/snapshot.py), compartido por los workers del nodo
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_DIR: str = "/tmp/tours_catalog"
+    CATALOG_SNAPSHOT_CHECK_SECONDS: float = 1.0  # cada cuánto cada worker mira el puntero CURRENT
+    CATALOG_SNAPSHOT_REFRESH_SECONDS: int = 60  # rebuild periódico (cambios de otros nodos)
+
+    # Baja automática de salidas pasadas (app/tours/expiry.py); un solo worker por vez (advisory lock)
+    TOUR_EXPIRY_ENABLED: bool = True
+    TOUR_EXPIRY_INTERVAL_SECONDS: int = 3600
+    TOUR_EXPIRY_GRACE_DAYS: int = 0  # fecha < hoy - N → is_active=false
+    TOUR_EXPIRY_BATCH_SIZE: int = 500  # filas por UPDATE (un commit por lote)
+
+    # Cache-Control del detalle público de tours (ETag + revalidación, app/core/http_cache.py)
+    HTTP_CACHE_PUBLIC_MAX_AGE_SECONDS: int = 60
+
+    # Imágenes de tours (app/tours/images.py): originales y variantes con nombre = hash del contenido
+    TOUR_IMAGES_DIR: str | None = None  # None → app/assets/images/tours
+    TOUR_IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+    TOUR_IMAGE_MAX_PIXELS: int = 40_000_000  # evita "bombas" de descompresión
+
+    # Autocompletado en memoria (app/tours/autocomplete.py), por proceso
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 60  # rebuild completo: conteo de reservas y cambios de otros workers
+    AUTOCOMPLETE_CACHE_ENTRIES: int = 4096  # resultados por prefijo
+
+    # Búsqueda por cercanía en memoria (app/tours/geo.py), por proceso
+    GEO_INDEX_REFRESH_SECONDS: int = 60  # rebuild completo: cambios de otros workers/nodos
+    GEO_INDEX_REBUILD_PENDING: int = 512  # cambios sueltos antes de recompactar el KD-tree
+
+    # Tours similares (app/tours/similar.py): co-ocurrencia en reservas; un solo worker por vez (advisory lock)
+    SIMILAR_TOURS_ENABLED: bool = True
+    SIMILAR_TOURS_INTERVAL_SECONDS: int = 900  # vuelta incremental: tours de los usuarios con reservas nuevas
+    SIMILAR_TOURS_FULL_REBUILD_SECONDS: int = 86400  # recálculo completo (normas de todos los tours)
+    SIMILAR_TOURS_K: int = 20  # vecinos guardados por tour
+    SIMILAR_TOURS_MIN_COMMON: int = 2  # usuarios en común para considerar un par
+
+    # Popularidad (app/tours/popularity.py): contadores en memoria por worker, volcados en lotes a tour_popularity
+    POPULARITY_FLUSH_SECONDS: int = 10  # vistas perdidas si el proceso muere sin apagarse (el shutdown vuelca)
+    POPULARITY_BATCH_RETENTION_HOURS: int = 24  # ids de lotes aplicados que se recuerdan para los reintentos
+
+    # Réplicas de lectura: DSNs separados por coma (postgresql+psycopg://...)
+    POSTGRES_REPLICA_DSNS: Annotated[
+        list[str] | str, BeforeValidator(parse_cors)
+    ] = []
+    # Tiempo que una réplica caída queda fuera de la rotación
+    REPLICA_RETRY_SECONDS: int = 30
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -1,10 +1,65 @@
+import asyncio
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.pool_stats import register_monitor
+from app.core.replicas import Replica, ReplicaRouter
 from app.models import User, UserCreate, Rol, RolEnum, Estado, EstadoEnum
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), pool_size=10, max_overflow=20)
+
+# ============================================================
+# Engines (pool configurado desde Settings e instrumentado)
+# ============================================================
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _create_engine(url: str, name: str):
+    monitor = register_monitor(name)
+    db_engine = create_engine(url, poolclass=monitor.pool_class(QueuePool), **_pool_options())
+    monitor.attach(db_engine)
+    return db_engine
+
+
+def _create_async_engine(url: str, name: str):
+    monitor = register_monitor(name)
+    db_engine = create_async_engine(
+        url, poolclass=monitor.pool_class(AsyncAdaptedQueuePool), **_pool_options()
+    )
+    monitor.attach(db_engine.sync_engine)
+    return db_engine
+
+
+engine = _create_engine(str(settings.SQLALCHEMY_DATABASE_URI), "primary")
+
+# Mismo DSN con psycopg async: para las rutas de lectura que no deben bloquear el event loop
+async_engine = _create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), "primary_async")
+
+# Réplicas de lectura (opcional): catálogo y listados
+replica_router = ReplicaRouter(
+    primary=engine,
+    async_primary=async_engine,
+    replicas=[
+        Replica(
+            name=make_url(dsn).render_as_string(hide_password=True),
+            engine=_create_engine(dsn, f"replica{i}"),
+            async_engine=_create_async_engine(dsn, f"replica{i}_async"),
+        )
+        for i, dsn in enumerate(settings.POSTGRES_REPLICA_DSNS)
+    ],
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -47,4 +102,4 @@ def init_db(session: Session) -> None:
             estado_id=1,
             cedula="0000000000"
         )
-        user = crud.create_user(session=session, user_create=user_in)
+        user = asyncio.run(crud.create_user(session=session, user_create=user_in))
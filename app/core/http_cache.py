@@ -0,0 +1,49 @@
+"""
+ETags fuertes y GET condicional para las rutas de detalle.
+
+El ETag sale de (tipo, id, versión), donde la versión es la fecha más nueva
+entre `updated_date`/`created_date` de las filas que arman la respuesta. La
+ruta pide solo esa versión (una consulta por PK, sin cargar relaciones) y,
+si coincide con `If-None-Match`, responde 304 sin serializar nada.
+"""
+import datetime as dt
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+ETAG_HEADER = "ETag"
+
+# Detalle público (CDN + clientes): se puede reusar un rato y después se revalida
+PUBLIC_CACHE_CONTROL = f"public, max-age={settings.HTTP_CACHE_PUBLIC_MAX_AGE_SECONDS}"
+# Rutas autenticadas: solo el cliente guarda la copia y revalida siempre
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(kind: str, id, version: dt.datetime) -> str:
+    digest = hashlib.blake2b(f"{kind}:{id}:{version.isoformat()}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match usa comparación débil: `W/"x"` también coincide con `"x"`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    return {ETAG_HEADER: etag, "Cache-Control": cache_control}
+
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str) -> Response | None:
+    """Pone ETag/Cache-Control en la respuesta; si el cliente ya tiene esta versión devuelve el 304."""
+    headers = cache_headers(etag, cache_control)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
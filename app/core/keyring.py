@@ -0,0 +1,147 @@
+"""
+Anillo de claves para firmar los JWT, compartido por todos los workers/nodos.
+
+Archivo JSON (JWT_KEYRING_FILE):
+
+    {"active": "k2", "keys": {"k2": "<secreto>", "k1": "<secreto anterior>"}}
+
+- create_access_token firma con la clave activa y pone su `kid` en el header
+- get_current_user verifica con la clave del `kid` (cualquiera del anillo)
+- Sin archivo se usa settings.SECRET_KEY como única clave, con kid "default".
+  Los tokens sin `kid` (anteriores al anillo) también se verifican con
+  "default": dejan de valer cuando esa clave sale del anillo
+- Si el archivo falta o no se puede leer (p. ej. escrito a medias) se sigue con
+  las últimas claves buenas
+
+Rotación sin downtime:
+
+    python -m app.core.keyring rotate --keep 3
+
+Agrega una clave nueva, la deja activa y conserva las anteriores para que los
+tokens ya emitidos sigan siendo válidos hasta expirar. La primera rotación
+guarda SECRET_KEY como "default": lo firmado antes del archivo (tokens y
+cursores de paginación) sigue valiendo hasta que esa clave se descarte.
+"""
+import argparse
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KID = "default"
+
+
+class JWTKeyRing:
+    def __init__(self, path: str | None, reload_seconds: float, fallback_secret: str):
+        self.path = Path(path) if path else None
+        self.reload_seconds = reload_seconds
+        self.fallback_secret = fallback_secret
+        self._active_kid = DEFAULT_KID
+        self._keys: dict[str, str] = {DEFAULT_KID: fallback_secret}
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, force: bool = False) -> None:
+        if self.path is None:
+            return
+        # Forzado (kid desconocido) → como máximo una relectura por segundo
+        now = time.monotonic()
+        min_interval = 1.0 if force else self.reload_seconds
+        if now - self._checked_at < min_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime
+                if mtime == self._mtime:
+                    return
+                data = json.loads(self.path.read_text())
+                keys, active = data["keys"], data["active"]
+                if active not in keys:
+                    raise ValueError(f"La clave activa '{active}' no está en el archivo")
+            except (OSError, ValueError, KeyError, TypeError):
+                # Un error acá no puede tumbar la autenticación: se reintenta en la próxima lectura
+                logger.exception("No se pudo leer el anillo de claves %s; se siguen usando las anteriores", self.path)
+                return
+            self._keys = keys
+            self._active_kid = active
+            self._mtime = mtime
+
+    def signing_key(self) -> tuple[str, str]:
+        self._load()
+        return self._active_kid, self._keys[self._active_kid]
+
+    def verification_key(self, kid: str | None) -> str | None:
+        # Tokens emitidos antes del anillo (sin kid) → la clave "default" (SECRET_KEY), mientras siga en el anillo
+        if kid is None:
+            kid = DEFAULT_KID
+
+        self._load()
+        if kid not in self._keys:
+            # Otro nodo ya rotó: se relee el archivo antes de rechazar el token
+            self._load(force=True)
+        return self._keys.get(kid)
+
+
+# ============================================================
+# CLI: rotate
+# ============================================================
+def _write_atomic(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+
+def rotate(path: Path, keep: int, initial_secret: str) -> str:
+    # Primera rotación: la clave con la que se firmó hasta ahora queda como "default"
+    data = json.loads(path.read_text()) if path.exists() else {"active": None, "keys": {DEFAULT_KID: initial_secret}}
+
+    kid = f"k{int(time.time())}-{secrets.token_hex(2)}"
+    data["keys"] = {kid: secrets.token_urlsafe(32), **data["keys"]}
+    data["active"] = kid
+
+    # Conserva la activa + (keep - 1) anteriores (ordenadas de más nueva a más vieja)
+    data["keys"] = dict(list(data["keys"].items())[:keep])
+
+    _write_atomic(path, data)
+    return kid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rotate"])
+    parser.add_argument("--file", default=settings.JWT_KEYRING_FILE)
+    parser.add_argument("--keep", type=int, default=3, help="claves a conservar, incluida la activa")
+    args = parser.parse_args()
+
+    if not args.file:
+        parser.error("Definir JWT_KEYRING_FILE o --file")
+    if args.keep < 2:
+        parser.error("--keep debe ser >= 2 para no invalidar los tokens vigentes")
+
+    kid = rotate(Path(args.file), args.keep, str(settings.SECRET_KEY))
+    print(f"Clave activa: {kid}")
+
+
+keyring = JWTKeyRing(
+    path=settings.JWT_KEYRING_FILE,
+    reload_seconds=settings.JWT_KEYRING_RELOAD_SECONDS,
+    fallback_secret=str(settings.SECRET_KEY),
+)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+Cada listado define un orden estable (p. ej. `created_date DESC, id DESC`).
+El cliente pide la primera página sin cursor y recibe el siguiente en el
+header `X-Next-Cursor`; la página siguiente filtra `(created_date, id) < (…)`
+en vez de saltear filas con OFFSET, así que cuesta lo mismo en la página 1
+que en la 1000 (con el índice que corresponde).
+
+El cursor es opaco y va firmado con el anillo de claves de los JWT
+(app/core/keyring.py): un cursor alterado o de otro listado → 400.
+
+`offset` sigue funcionando igual cuando no se envía cursor.
+"""
+import base64
+import binascii
+import datetime as dt
+import hashlib
+import hmac
+import json
+import uuid
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.keyring import keyring
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+_SIGNATURE_BYTES = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(key: str, payload: str) -> str:
+    digest = hmac.new(key.encode(), payload.encode(), hashlib.sha256).digest()
+    return _b64encode(digest[:_SIGNATURE_BYTES])
+
+
+def _to_json(value):
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _python_type(column: InstrumentedAttribute) -> type | None:
+    try:
+        return column.type.python_type
+    except NotImplementedError:  # p. ej. AutoString de sqlmodel: el valor ya es str
+        return None
+
+
+def _from_json(value, python_type: type | None):
+    if value is None or python_type is None:
+        return value
+    if python_type is dt.datetime:
+        return dt.datetime.fromisoformat(value)
+    if python_type is dt.date:
+        return dt.date.fromisoformat(value)
+    if python_type is dt.time:
+        return dt.time.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+class Keyset:
+    """Orden estable de un listado + codificación de su cursor."""
+
+    def __init__(self, name: str, *columns: InstrumentedAttribute, descending: bool = False):
+        self.name = name
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self):
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    # ============================================================
+    # Cursor
+    # ============================================================
+    def encode(self, values: list) -> str:
+        kid, key = keyring.signing_key()
+        payload = _b64encode(
+            json.dumps({"k": self.name, "v": [_to_json(v) for v in values]}, separators=(",", ":")).encode()
+        )
+        return f"{kid}.{payload}.{_sign(key, payload)}"
+
+    def decode(self, cursor: str) -> list:
+        invalid = HTTPException(status_code=400, detail="Cursor inválido")
+        try:
+            kid, payload, signature = cursor.split(".")
+            key = keyring.verification_key(kid)
+            if key is None or not hmac.compare_digest(signature, _sign(key, payload)):
+                raise invalid
+            data = json.loads(_b64decode(payload))
+            if data.get("k") != self.name or len(data["v"]) != len(self.columns):
+                raise invalid
+            return [
+                _from_json(value, _python_type(column))
+                for value, column in zip(data["v"], self.columns)
+            ]
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise invalid
+
+    # ============================================================
+    # Consultas
+    # ============================================================
+    def paginate(self, stmt, offset: int, limit: int | None, cursor: str | None):
+        """ORDER BY estable + (cursor → WHERE por clave | sin cursor → OFFSET)."""
+        stmt = stmt.order_by(*self.order_by())
+        if cursor:
+            values = self.decode(cursor)
+            key = tuple_(*self.columns)
+            stmt = stmt.where(key < tuple_(*values) if self.descending else key > tuple_(*values))
+        elif offset:
+            stmt = stmt.offset(offset)
+        return stmt.limit(limit)
+
+    def next_cursor(self, rows: list, limit: int | None) -> str | None:
+        """Cursor de la página siguiente (None si esta página no vino completa)."""
+        if not rows or limit is None or len(rows) < limit:
+            return None
+        last = rows[-1]
+        return self.encode([getattr(last, column.key) for column in self.columns])
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import Pool
+
+from app.core.request_context import current_route
+
+# Muestras recientes de espera para calcular percentiles
+WAIT_SAMPLES = 1024
+# Peso de la última espera en el promedio móvil (lo usa el control de admisión)
+WAIT_EWMA_ALPHA = 0.2
+# Sin checkouts nuevos el promedio se reduce a la mitad cada N segundos
+# (si no, un pico quedaría congelado mientras se descarta el tráfico)
+WAIT_EWMA_HALF_LIFE = 1.0
+
+
+class PoolMonitor:
+    """
+    Métricas del pool de conexiones de un engine (por proceso/worker).
+
+    - Espera en el checkout: tiempo dentro de `Pool._do_get` (incluye esperar
+      a que se libere una conexión y abrir una nueva)
+    - Retención por ruta: del checkout al checkin, agrupado por la plantilla de ruta
+    - Conexiones en uso, overflow usado y pico de conexiones en uso
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool | None = None
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_ewma_ms = 0.0
+        self._last_wait_at = 0.0
+        self.waiting = 0  # hilos/tareas esperando una conexión ahora mismo
+        self.peak_in_use = 0
+        self._routes: dict[str, list[float]] = {}  # ruta → [checkouts, total_ms, max_ms]
+
+    def pool_class(self, base: type[Pool]) -> type[Pool]:
+        """Subclase de `base` que mide la espera del checkout.
+
+        Es una clase por monitor (y no un atributo de la instancia) porque
+        `engine.dispose()` recrea el pool con `self.__class__`.
+        """
+        monitor = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                start = time.perf_counter()
+                monitor.start_wait()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    monitor.record_timeout()
+                    raise
+                finally:
+                    monitor.record_wait((time.perf_counter() - start) * 1000)
+
+        TimedPool.__name__ = f"Timed{base.__name__}"
+        return TimedPool
+
+    def attach(self, engine: Engine) -> None:
+        self.pool = engine.pool
+        event.listen(engine, "engine_disposed", self._on_disposed)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    # ============================================================
+    # Eventos
+    # ============================================================
+    def _on_disposed(self, engine: Engine) -> None:
+        self.pool = engine.pool
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checkout_at"] = time.perf_counter()
+        connection_record.info["route"] = current_route() or "-"
+        in_use = self.pool.checkedout() if self.pool is not None else 0
+        with self._lock:
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        route = connection_record.info.pop("route", "-")
+        if checkout_at is None:
+            return
+
+        held_ms = (time.perf_counter() - checkout_at) * 1000
+        with self._lock:
+            stats = self._routes.setdefault(route, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += held_ms
+            stats[2] = max(stats[2], held_ms)
+
+    def start_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            recent = self.recent_wait_ms()
+            self.wait_ewma_ms = recent + WAIT_EWMA_ALPHA * (wait_ms - recent)
+            self._last_wait_at = time.monotonic()
+            self._waits.append(wait_ms)
+
+    def recent_wait_ms(self) -> float:
+        idle = time.monotonic() - self._last_wait_at
+        return self.wait_ewma_ms * 0.5 ** (idle / WAIT_EWMA_HALF_LIFE)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    # ============================================================
+    # Lectura
+    # ============================================================
+    def _percentile(self, samples: list[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            routes = {
+                route: {
+                    "checkouts": count,
+                    "hold_avg_ms": round(total / count, 2),
+                    "hold_max_ms": round(max_ms, 2),
+                }
+                for route, (count, total, max_ms) in sorted(
+                    self._routes.items(), key=lambda item: item[1][1], reverse=True
+                )
+            }
+            return {
+                "pool_size": pool.size() if pool is not None else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "checked_out": pool.checkedout() if pool is not None else None,
+                "overflow": max(pool.overflow(), 0) if pool is not None else None,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_p50_ms": round(self._percentile(waits, 0.50), 3),
+                "wait_p95_ms": round(self._percentile(waits, 0.95), 3),
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_ewma_ms": round(self.recent_wait_ms(), 3),
+                "waiting": self.waiting,
+                "routes": routes,
+            }
+
+
+pool_monitors: dict[str, PoolMonitor] = {}
+
+
+def register_monitor(name: str) -> PoolMonitor:
+    monitor = PoolMonitor(name)
+    pool_monitors[name] = monitor
+    return monitor
+
+
+def max_wait_ewma_ms() -> float:
+    """Peor promedio móvil de espera entre todos los pools del proceso."""
+    return max((monitor.recent_wait_ms() for monitor in pool_monitors.values()), default=0.0)
+
+
+def all_stats() -> dict:
+    return {
+        # Las métricas son por proceso: multiplicar por la cantidad de workers
+        # de uvicorn para comparar con max_connections de Postgres
+        "pid": os.getpid(),
+        "pools": {name: monitor.stats() for name, monitor in pool_monitors.items()},
+    }
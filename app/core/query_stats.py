@@ -0,0 +1,168 @@
+"""
+Conteo de queries SQL por request y detector de N+1.
+
+- Listeners `before/after_cursor_execute` sobre todos los engines (sync, async y réplicas)
+- QueryStatsMiddleware abre un contador por request; en ENVIRONMENT=local agrega
+  `X-DB-Query-Count` y `X-DB-Time-Ms` a la respuesta
+- Una misma sentencia repetida QUERY_N1_THRESHOLD veces o más en un request se
+  reporta como probable N+1, con la ruta y las relaciones candidatas
+- Presupuestos por ruta (QUERY_BUDGETS): se loguean, o fallan el request si
+  QUERY_BUDGET_ENFORCE=true (pensado para tests)
+
+En tests de servicios/repositorios:
+
+    with query_budget(2):
+        ToursService.get_tours(session, 0, 10)
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event
+from sqlmodel import SQLModel
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_context import route_of
+
+logger = logging.getLogger(__name__)
+
+_FROM_TABLE = re.compile(r'\bFROM\s+"?(\w+)"?', re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+    def tables(self) -> set[str]:
+        return {table for stmt in self.statements for table in _FROM_TABLE.findall(stmt)}
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+# ============================================================
+# Listeners (todas las instancias de Engine)
+# ============================================================
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or not conn.info.get("query_start"):
+        return
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    stats.record(statement, elapsed_ms)
+
+
+# ============================================================
+# Diagnóstico de N+1
+# ============================================================
+def _relationship_candidates(table: str, loaded_tables: set[str]) -> list[str]:
+    """Relaciones que apuntan a `table` desde alguna tabla consultada en el request."""
+    candidates = []
+    for mapper in SQLModel._sa_registry.mappers:
+        if mapper.local_table.name not in loaded_tables:
+            continue
+        for rel in mapper.relationships:
+            if rel.mapper.local_table.name == table:
+                candidates.append(f"{mapper.class_.__name__}.{rel.key}")
+    return sorted(candidates)
+
+
+def report_n_plus_one(stats: QueryStats, route: str | None, threshold: int) -> list[dict]:
+    findings = []
+    loaded_tables = stats.tables()
+    for statement, times in stats.repeated(threshold):
+        match = _FROM_TABLE.search(statement)
+        table = match.group(1) if match else None
+        relationships = _relationship_candidates(table, loaded_tables - {table}) if table else []
+        findings.append(
+            {"route": route, "times": times, "table": table, "relationships": relationships}
+        )
+        logger.warning(
+            "Probable N+1 en %s: %s consultas iguales sobre '%s' (relaciones: %s)",
+            route, times, table, ", ".join(relationships) or "?",
+        )
+    return findings
+
+
+def check_budget(stats: QueryStats, route: str | None, budget: int | None) -> None:
+    if budget is None or stats.count <= budget:
+        return
+    message = f"{route} ejecutó {stats.count} queries (presupuesto: {budget})"
+    if settings.QUERY_BUDGET_ENFORCE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Falla si el bloque ejecuta más de `max_queries` sentencias (mismo hilo/contexto)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{stats.count} queries (presupuesto: {max_queries}): "
+            + "; ".join(f"{n}× {stmt[:80]}" for stmt, n in stats.statements.most_common(3))
+        )
+
+
+# ============================================================
+# Middleware
+# ============================================================
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.debug_headers = settings.ENVIRONMENT == "local"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+
+        route = route_of(scope)
+        report_n_plus_one(stats, route, settings.QUERY_N1_THRESHOLD)
+        check_budget(stats, route, settings.QUERY_BUDGETS.get(route))
+
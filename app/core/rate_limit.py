@@ -0,0 +1,239 @@
+"""
+Rate limiting con ventana deslizante (sliding window counter).
+
+Por cada clave se guardan dos contadores: la ventana fija actual y la anterior.
+El conteo estimado es `anterior × (fracción que queda de la ventana anterior) + actual`:
+O(1) en tiempo y memoria por clave, sin guardar timestamps.
+
+Backends:
+- MemoryBackend: por proceso (límite efectivo = límite × workers)
+- RedisBackend:  compartido entre workers/nodos (RATE_LIMIT_REDIS_URL, requiere `redis`)
+
+Uso en rutas (headers RateLimit-* y 429 con Retry-After):
+
+    @router.post("/register", dependencies=[Depends(limit_by_ip("register", "5/hour"))])
+
+Microbenchmark: python -m app.benchmarks.rate_limit
+"""
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, NamedTuple
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.core.config import settings
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    window_seconds: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """"20/minute" → Rate(20, 60)"""
+        match = _RATE.match(value)
+        if not match:
+            raise ValueError(f"Rate inválido '{value}' (formato: N/second|minute|hour|day)")
+        return cls(int(match.group(1)), _UNITS[match.group(2)])
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int
+
+
+def _window(now: float, window_seconds: int) -> tuple[int, float]:
+    """Índice de la ventana actual y peso de la ventana anterior."""
+    index = int(now // window_seconds)
+    elapsed = now - index * window_seconds
+    return index, 1.0 - elapsed / window_seconds
+
+
+def _seconds_until_allowed(previous: float, current: float, rate: Rate, weight: float) -> float:
+    """
+    Segundos hasta que `anterior × peso + actual + 1 ≤ límite`. El peso baja con
+    el tiempo y, al cambiar de ventana, la actual pasa a ser la anterior con peso 1:
+    llenar la ventana al final la sigue limitando en la siguiente.
+    """
+    free = rate.limit - 1
+    if current <= free:
+        if previous * weight <= free - current:
+            return 0.0
+        # En esta misma ventana, cuando el peso baje a (libre - actual) / anterior
+        return rate.window_seconds * (weight - (free - current) / previous)
+    # Hasta el cambio de ventana y después hasta que el peso baje a libre / actual
+    return rate.window_seconds * (weight + 1 - max(free, 0) / current)
+
+
+def _result(allowed: bool, previous: float, current: float, rate: Rate, weight: float) -> RateLimitResult:
+    estimated = previous * weight + current
+    return RateLimitResult(
+        allowed=allowed,
+        limit=rate.limit,
+        remaining=max(0, math.floor(rate.limit - estimated)),
+        reset_seconds=max(1, math.ceil(_seconds_until_allowed(previous, current, rate, weight))),
+    )
+
+
+# ============================================================
+# Backends
+# ============================================================
+class MemoryBackend:
+    # Cada cuántos hits se eliminan las claves sin actividad reciente
+    PRUNE_EVERY = 10_000
+
+    def __init__(self):
+        # clave → [índice de ventana, conteo actual, conteo anterior, tamaño de ventana]
+        self._counters: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key: str, rate: Rate, now: float | None = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        index, weight = _window(now, rate.window_seconds)
+
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = [index, 0, 0, rate.window_seconds]
+            elif counter[0] != index:
+                # Avanza la ventana: la actual pasa a ser la anterior (o se descarta si hubo un hueco)
+                counter[2] = counter[1] if counter[0] == index - 1 else 0
+                counter[1] = 0
+                counter[0] = index
+
+            previous, current = counter[2], counter[1]
+            allowed = previous * weight + current + 1 <= rate.limit
+            if allowed:
+                current = counter[1] = current + 1
+
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+        return _result(allowed, previous, current, rate, weight)
+
+    async def acquire(self, key: str, rate: Rate) -> RateLimitResult:
+        return self.hit(key, rate)
+
+    def _prune(self, now: float) -> None:
+        # Sin actividad en las últimas 2 ventanas (de su propio tamaño) el conteo ya es 0
+        stale = [
+            key for key, counter in self._counters.items()
+            if (counter[0] + 2) * counter[3] <= now
+        ]
+        for key in stale:
+            del self._counters[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class RedisBackend:
+    # Lee actual + anterior e incrementa la actual en un solo round trip atómico;
+    # devuelve (permitido, anterior, actual) para calcular el reset en Python
+    _SCRIPT = """
+    local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+    local limit = tonumber(ARGV[1])
+    local weight = tonumber(ARGV[2])
+    if previous * weight + current + 1 > limit then
+        return {0, previous, current}
+    end
+    current = redis.call('INCR', KEYS[1])
+    if current == 1 then
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+    end
+    return {1, previous, current}
+    """
+
+    def __init__(self, url: str, prefix: str = "rl"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requiere el paquete `redis`") from e
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self._SCRIPT)
+
+    async def acquire(self, key: str, rate: Rate) -> RateLimitResult:
+        index, weight = _window(time.time(), rate.window_seconds)
+        base = f"{self.prefix}:{rate.window_seconds}:{key}"
+        allowed, previous, current = await self._script(
+            keys=[f"{base}:{index}", f"{base}:{index - 1}"],
+            args=[rate.limit, weight, rate.window_seconds * 2],
+        )
+        return _result(bool(allowed), int(previous), int(current), rate, weight)
+
+    async def reset(self) -> None:
+        async for key in self._client.scan_iter(f"{self.prefix}:*"):
+            await self._client.delete(key)
+
+
+def _create_backend():
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryBackend()
+
+
+backend = _create_backend()
+
+
+# ============================================================
+# Dependencias FastAPI
+# ============================================================
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _set_headers(response: Response, result: RateLimitResult) -> None:
+    # Con varios límites en la misma ruta se informa el más restrictivo
+    current = response.headers.get("RateLimit-Remaining")
+    if current is not None and int(current) <= result.remaining:
+        return
+    response.headers["RateLimit-Limit"] = str(result.limit)
+    response.headers["RateLimit-Remaining"] = str(result.remaining)
+    response.headers["RateLimit-Reset"] = str(result.reset_seconds)
+
+
+async def enforce(name: str, key: str, rate: Rate, response: Response) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    result = await backend.acquire(f"{name}:{key}", rate)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas solicitudes, intente nuevamente más tarde",
+            headers={
+                "Retry-After": str(result.reset_seconds),
+                "RateLimit-Limit": str(result.limit),
+                "RateLimit-Remaining": "0",
+                "RateLimit-Reset": str(result.reset_seconds),
+            },
+        )
+    _set_headers(response, result)
+
+
+def limit_by_ip(name: str, rate: str) -> Callable:
+    parsed = Rate.parse(rate)
+
+    async def dependency(request: Request, response: Response) -> None:
+        await enforce(name, client_ip(request), parsed, response)
+
+    return dependency
@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine | None = None
+    down_until: float = field(default=0.0)
+
+
+class ReplicaRouter:
+    """
+    Reparte las lecturas entre réplicas con round-robin.
+
+    - Una réplica que falla al conectar (o pierde la conexión) queda fuera
+      `retry_seconds` y luego se vuelve a intentar
+    - Elegir réplica no toca la red: el chequeo de salud (`check`, tarea del
+      lifespan) prueba las réplicas en un hilo y las saca o las devuelve a la
+      rotación; una sesión no pide una conexión extra para probar
+    - Sin réplicas configuradas o sanas → primary
+    - Las escrituras y los flujos read-your-own-writes usan siempre el primary
+      (SessionDep / AsyncSessionDep)
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        async_primary: AsyncEngine | None,
+        replicas: list[Replica],
+        retry_seconds: float,
+    ):
+        self.primary = primary
+        self.async_primary = async_primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+        for replica in replicas:
+            engines = [replica.engine]
+            if replica.async_engine is not None:
+                engines.append(replica.async_engine.sync_engine)
+            for engine in engines:
+                event.listen(engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: Replica):
+        def handle_error(context) -> None:
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                self.mark_down(replica)
+        return handle_error
+
+    def mark_down(self, replica: Replica) -> None:
+        replica.down_until = time.monotonic() + self.retry_seconds
+        logger.warning("Réplica %s fuera de servicio por %ss", replica.name, self.retry_seconds)
+
+    def _pick(self) -> Replica | None:
+        if not self.replicas:
+            return None
+
+        with self._lock:
+            start = next(self._counter)
+        now = time.monotonic()
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if replica.down_until <= now:
+                return replica
+        return None
+
+    def read_bind(self, use_async: bool = False) -> Engine:
+        """Engine para una lectura; para async devuelve el `sync_engine` del AsyncEngine.
+
+        Se llama en el primer uso de la sesión (ReadSession.get_bind). Solo mira
+        `down_until`: una réplica que se cae falla esa consulta, `handle_error`
+        la marca y las sesiones siguientes van a la próxima o al primary.
+        """
+        for _ in range(len(self.replicas)):
+            replica = self._pick()
+            if replica is None:
+                break
+            if use_async:
+                if replica.async_engine is None:
+                    continue
+                return replica.async_engine.sync_engine
+            return replica.engine
+
+        if use_async:
+            return self.async_primary.sync_engine
+        return self.primary
+
+    def check(self) -> None:
+        """Prueba cada réplica (bloqueante: correr en un hilo)."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect():
+                    pass
+            except exc.OperationalError:
+                if replica.down_until <= time.monotonic():
+                    self.mark_down(replica)
+                continue
+            if replica.down_until:
+                replica.down_until = 0.0
+                logger.info("Réplica %s de vuelta en la rotación", replica.name)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"name": replica.name, "healthy": replica.down_until <= now}
+            for replica in self.replicas
+        ]
+
+
+async def run_health_check(router: ReplicaRouter) -> None:
+    """Tarea de fondo del lifespan (solo con réplicas configuradas)."""
+    while True:
+        await asyncio.sleep(router.retry_seconds)
+        try:
+            await asyncio.to_thread(router.check)
+        except Exception:
+            logger.exception("No se pudo chequear las réplicas")
@@ -0,0 +1,49 @@
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Scope ASGI del request en curso (None fuera de un request: scripts, jobs)
+# Las dependencias sync corren en el threadpool con una copia del contexto,
+# así que el valor también se ve desde ahí
+_current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+def _full_route_path(path: str, route) -> str:
+    # Con routers anidados `route.path` no incluye el prefijo del router
+    # (/api/v1): se busca el sufijo del path que matchea la ruta
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + route.path
+        start = path.find("/", start + 1)
+    return route.path
+
+
+def route_of(scope: Scope) -> str | None:
+    """Plantilla de la ruta (`GET /api/v1/tours/{id}`), no la URL concreta."""
+    route = scope.get("route")
+    if route is not None:
+        return f"{scope['method']} {_full_route_path(scope['path'], route)}"
+    # Antes del routing (middlewares) solo se conoce el path
+    return scope.get("path")
+
+
+def current_route() -> str | None:
+    scope = _current_scope.get()
+    return route_of(scope) if scope is not None else None
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
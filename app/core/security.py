@@ -1,14 +1,41 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import jwt
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 from app.core.config import settings
+from app.core.keyring import keyring
 
-password_hash = PasswordHash.recommended()
 
-SECRET_KEY = str(settings.SECRET_KEY)
+def build_password_hash(
+    time_cost: int | None = None,
+    memory_cost: int | None = None,
+    parallelism: int | None = None,
+) -> PasswordHash:
+    """
+    Argon2 con los parámetros calibrados para el host
+    (ver `python -m app.calibrate_argon2`). Lo que no se define usa el default de la librería.
+    """
+    params = {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+    }
+    return PasswordHash((Argon2Hasher(**{k: v for k, v in params.items() if v is not None}),))
+
+
+password_hash = build_password_hash(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
 
@@ -20,13 +47,101 @@ def create_access_token(data: dict | Any, expires_delta: timedelta | None = None
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    kid, secret = keyring.signing_key()
+    encoded_jwt = jwt.encode(to_encode, secret, algorithm=ALGORITHM, headers={"kid": kid})
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """Verifica el token con la clave de su `kid` (lanza InvalidTokenError si no es válido)."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    secret = keyring.verification_key(kid)
+    if secret is None:
+        raise jwt.InvalidTokenError(f"kid desconocido: {kid}")
+    return jwt.decode(token, secret, algorithms=[ALGORITHM])
+
+
+def principal_claims(user: Any, auth_epoch: int) -> dict:
+    """
+    Claims firmados que permiten autorizar sin consultar la BD:
+    - uid / rol / est → id, rol_id y estado_id del usuario
+    - aep → epoch de autenticación (ver app/auth/revocation.py)
+    """
+    return {
+        "sub": user.email,
+        "uid": str(user.id),
+        "rol": user.rol_id,
+        "est": user.estado_id,
+        "aep": auth_epoch,
+        "given_name": user.nombre,
+        "family_name": user.apellido,
+    }
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # Si el hash se generó con parámetros distintos a los actuales, devuelve uno nuevo
+    return password_hash.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
+
+
+class PasswordHasherPool:
+    """
+    Ejecuta Argon2 (hash / verify) en un pool de procesos acotado para no
+    bloquear el event loop durante el login o el registro.
+
+    - max_workers = 0 → se ejecuta en línea (comportamiento anterior)
+    - Los procesos se crean con "spawn" (no se hace fork del worker de uvicorn)
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.max_workers <= 0:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def start(self) -> None:
+        # Levanta los procesos al arrancar para no pagar el "spawn" en el primer login
+        if self.max_workers > 0:
+            executor = self._get_executor()
+            for _ in range(self.max_workers):
+                executor.submit(int)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasherPool(max_workers=settings.PASSWORD_HASH_WORKERS)
@@ -0,0 +1,95 @@
+import threading
+
+from sqlalchemy import event
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import replica_router
+
+
+class SessionUsage:
+    """
+    Cuántas sesiones llegaron a pedir una conexión al pool.
+
+    Una sesión que se cierra sin haber ejecutado nada (respuesta desde cache,
+    auth rechazada, validación fallida) cuenta como `skipped`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.checked_out = 0
+
+    def record(self, touched_db: bool) -> None:
+        with self._lock:
+            self.sessions += 1
+            if touched_db:
+                self.checked_out += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            skipped = self.sessions - self.checked_out
+            return {
+                "sessions": self.sessions,
+                "checked_out": self.checked_out,
+                "skipped": skipped,
+                "skipped_rate": round(skipped / self.sessions, 4) if self.sessions else 0.0,
+            }
+
+
+session_usage = SessionUsage()
+
+
+class LazySession(Session):
+    """
+    Session que registra si llegó a usar la base.
+
+    La conexión se pide recién en la primera query (`after_begin`) y se
+    devuelve al pool en el commit/rollback o al cerrar la sesión.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.touched_db = False
+        self._usage_recorded = False
+
+    def close(self) -> None:
+        super().close()
+        if not self._usage_recorded:
+            self._usage_recorded = True
+            session_usage.record(self.touched_db)
+
+
+@event.listens_for(LazySession, "after_begin")
+def _mark_touched(session: LazySession, transaction, connection) -> None:
+    session.touched_db = True
+
+
+class ReadSession(LazySession):
+    """
+    LazySession de solo lectura: elige réplica (o primary) recién en la primera query.
+
+    Con `use_async=True` se usa como `sync_session_class` de un AsyncSession.
+    `primary=True` lee del primary (lo recién escrito, sin lag de réplica).
+    """
+
+    def __init__(self, *args, use_async: bool = False, primary: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._use_async = use_async
+        self._primary = primary
+        self._read_bind = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._read_bind is None:
+            if self._primary:
+                self._read_bind = (
+                    replica_router.async_primary.sync_engine if self._use_async else replica_router.primary
+                )
+            else:
+                self._read_bind = replica_router.read_bind(use_async=self._use_async)
+        return self._read_bind
+
+
+def async_read_session(primary: bool = False) -> AsyncSession:
+    """AsyncSession de lectura fuera de una dependencia (jobs, refrescos en segundo plano)."""
+    return AsyncSession(sync_session_class=ReadSession, use_async=True, primary=primary, expire_on_commit=False)
@@ -1,11 +1,12 @@
 from sqlmodel import Session, select
-from app.models import User, UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.models import User, UserCreate, UserPrincipal
+from app.core.security import password_hasher
 
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+async def create_user(*, session: Session, user_create: UserCreate) -> User:
+    hashed_password = await password_hasher.hash(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
     session.commit()
@@ -18,7 +19,17 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
     return session_user
 
 
-def authenticate(*, session: Session, email: str, password: str) -> User | None:
+def get_principal_by_email(*, session: Session, email: str) -> UserPrincipal | None:
+    statement = select(
+        User.id, User.email, User.rol_id, User.estado_id, User.nombre, User.apellido
+    ).where(User.email == email)
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    return UserPrincipal.model_validate(row._mapping)
+
+
+async def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     # No existe el usuario
     if not db_user:
@@ -27,8 +38,15 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     if db_user.estado_id != 1:
         return None
     # Password incorrecto
-    if not verify_password(password, db_user.hashed_password):
+    valid, updated_hash = await password_hasher.verify_and_update(password, db_user.hashed_password)
+    if not valid:
         return None
+    # Hash con parámetros de Argon2 antiguos → se re-hashea con los actuales
+    if updated_hash:
+        db_user.hashed_password = updated_hash
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
     # Usuario válido y activo
     return db_user
 
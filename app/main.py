@@ -1,5 +1,24 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from app.api.main import api_router
+from app.auth.revocation import run_refresher as run_auth_epoch_refresher
 from app.core.config import settings
+from app.core.http_cache import ETAG_HEADER
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.admission import AdmissionControlMiddleware
+from app.core.database import async_engine, replica_router
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.replicas import run_health_check
+from app.core.request_context import RequestContextMiddleware
+from app.core.security import password_hasher
+from app.tours.autocomplete import run_refresher as run_autocomplete_refresher
+from app.tours.expiry import run_expirer
+from app.tours.geo import run_refresher as run_geo_refresher
+from app.tours.popularity import run_flusher as run_popularity_flusher
+from app.tours.rebuilds import catalog_rebuilder
+from app.tours.similar import run_refresher as run_similar_refresher
+from app.tours.snapshot import run_refresher
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.routing import APIRoute
@@ -11,11 +30,47 @@ def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    auth_epoch_refresher = asyncio.create_task(run_auth_epoch_refresher())
+    snapshot_refresher = asyncio.create_task(run_refresher()) if settings.CATALOG_SNAPSHOT_ENABLED else None
+    autocomplete_refresher = asyncio.create_task(run_autocomplete_refresher())
+    geo_refresher = asyncio.create_task(run_geo_refresher())
+    rebuilder = asyncio.create_task(catalog_rebuilder.run())
+    popularity_flusher = asyncio.create_task(run_popularity_flusher())
+    replica_checker = asyncio.create_task(run_health_check(replica_router)) if replica_router.replicas else None
+    expirer = asyncio.create_task(run_expirer()) if settings.TOUR_EXPIRY_ENABLED else None
+    similar_refresher = asyncio.create_task(run_similar_refresher()) if settings.SIMILAR_TOURS_ENABLED else None
+    yield
+    for task in (replica_checker, expirer, similar_refresher):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    # popularity_flusher y rebuilder hacen lo pendiente al cancelarse
+    for task in (auth_epoch_refresher, autocomplete_refresher, geo_refresher, popularity_flusher, rebuilder):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if snapshot_refresher is not None:
+        snapshot_refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_refresher
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+# Descarta tráfico de baja prioridad con 503 si el proceso está saturado.
+# Se agrega antes que CORS (queda más adentro) para que los 503 lleven headers CORS
+app.add_middleware(AdmissionControlMiddleware)
+
 if settings.all_cors_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -23,7 +78,13 @@ if settings.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
     )
 
+# Queries SQL por request (headers X-DB-* en local, N+1 y presupuestos)
+app.add_middleware(QueryStatsMiddleware)
+# Guarda el scope del request (ruta) para las métricas del pool y de queries
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(api_router_public,prefix="/public")
\ No newline at end of file
@@ -5,7 +5,8 @@ from typing import Optional, Dict, List
 
 from pydantic import EmailStr, BaseModel
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, Enum, JSON
+from sqlalchemy import BigInteger, Column, Computed, Enum, Index, JSON, REAL, SmallInteger, text
+from sqlalchemy.orm import query_expression
 from sqlalchemy.dialects.postgresql import JSONB
 
 
@@ -34,6 +35,9 @@ class Estado(SQLModel, table=True):
 
 
 class User(SQLModel, table=True):
+    # Listado de /users: filtro por estado + orden (created_date DESC, id DESC) para el cursor
+    __table_args__ = (Index("ix_user_estado_created_id", "estado_id", "created_date", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     rol_id: int | None = Field(foreign_key="rol.id")
     estado_id: int | None = Field(foreign_key="estado.id")
@@ -122,6 +126,25 @@ class UserPublic(BaseModel):
     apellido: str | None
 
 
+class AuthEpoch(SQLModel, table=True):
+    # Se incrementa al cambiar rol/estado/email: invalida los tokens emitidos antes
+    __tablename__ = "auth_epoch"
+
+    id_usuario: uuid.UUID = Field(primary_key=True, foreign_key="user.id")
+    epoch: int = Field(default=0)
+    updated_date: dt.datetime = Field(default_factory=dt.datetime.now)
+
+
+class UserPrincipal(SQLModel):
+    # Solo las columnas que necesita la autenticación (sin hashed_password ni auditoría)
+    id: uuid.UUID
+    email: EmailStr
+    rol_id: int | None
+    estado_id: int | None
+    nombre: str | None = None
+    apellido: str | None = None
+
+
 class UserUpdate(SQLModel):
     email: EmailStr | None = None
     nombre: str | None = None
@@ -232,6 +255,21 @@ class GuiaUpdate(SQLModel):
 
 
 class Tour(SQLModel, table=True):
+    __table_args__ = (
+        # Listado admin: filtro is_active + orden por id para el cursor
+        Index("ix_tour_active_id", "is_active", "id"),
+        # Catálogo público: próximas salidas por (fecha, hora_inicio); también sort=fecha de /tours/search
+        Index("ix_tour_upcoming", "fecha", "hora_inicio", "id", "precio", postgresql_where=text("is_active")),
+        # /tours/search (solo tours activos): un índice por orden y por filtro de igualdad.
+        # Los índices de orden llevan al final las columnas de los filtros por rango (precio, fecha):
+        # al recorrerlos en orden el filtro se evalúa en el índice (Index Cond), sin ir al heap
+        Index("ix_tour_search_precio", "precio", "id", "fecha", postgresql_where=text("is_active")),
+        Index("ix_tour_search_nombre", "nombre", "id", "precio", "fecha", postgresql_where=text("is_active")),
+        Index("ix_tour_search_destino", "destino", "fecha", postgresql_where=text("is_active")),
+        Index("ix_tour_search_operadora", "id_operadora", "fecha", postgresql_where=text("is_active")),
+        Index("ix_tour_search_guia", "id_guia", "fecha", postgresql_where=text("is_active")),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     id_operadora: int | None = Field(default=None, foreign_key="operadora.id")
     id_guia: int | None = Field(default=None, foreign_key="guia.id")
@@ -246,6 +284,13 @@ class Tour(SQLModel, table=True):
     destino: str
 
     image_url: str | None = Field(default=None)
+    # Imagen subida (app/tours/images.py): hash del original y placeholder WebP diminuto (data URI)
+    image_hash: str | None = Field(default=None, max_length=32)
+    image_placeholder: str | None = Field(default=None)
+
+    # Punto de salida (app/tours/geo.py: /tours/cercanos); sin coordenadas no aparece en la búsqueda
+    latitud: float | None = Field(default=None)
+    longitud: float | None = Field(default=None)
 
     # NUEVO: Soft delete
     is_active: bool = Field(default=True)
@@ -289,6 +334,8 @@ class TourCreate(SQLModel):
     capacidad_maxima: int
     destino: str
     image_url: str | None = None
+    latitud: float | None = Field(default=None, ge=-90, le=90)
+    longitud: float | None = Field(default=None, ge=-180, le=180)
     incluye: List[str] = []
     no_incluye: List[str] = []
     que_llevar: List[str] = []
@@ -310,6 +357,8 @@ class TourUpdate(SQLModel):
     capacidad_maxima: int | None = None
     destino: str | None = None
     image_url: str | None = None
+    latitud: float | None = Field(default=None, ge=-90, le=90)
+    longitud: float | None = Field(default=None, ge=-180, le=180)
 
     # NUEVOS CAMPOS (opcionales para no pisar si no se envían)
     incluye: List[str] | None = None
@@ -334,6 +383,9 @@ class TourPublic(SQLModel):
     operadora: Operadora
     guia: GuiaWithUser
     image_url: str
+    image_placeholder: str | None = None
+    latitud: float | None = None
+    longitud: float | None = None
     # NUEVOS CAMPOS
     incluye: List[str] = []
     no_incluye: List[str] = []
@@ -342,6 +394,126 @@ class TourPublic(SQLModel):
     politicas: str | None = None
 
 
+class TourSummary(SQLModel):
+    """Tarjeta del catálogo (`/tours?view=summary`): solo lo que muestra el listado."""
+    id: int
+    nombre: str
+    destino: str
+    fecha: dt.date
+    hora_inicio: dt.time
+    precio: float
+    image_url: str | None = None
+    image_placeholder: str | None = None
+    operadora: str | None = None
+    guia: str | None = None
+
+
+class TourSort(StrEnum):
+    PRECIO = "precio"
+    PRECIO_DESC = "-precio"
+    FECHA = "fecha"
+    FECHA_DESC = "-fecha"
+    NOMBRE = "nombre"
+    NOMBRE_DESC = "-nombre"
+    POPULAR = "popular"  # vistas del detalle + reservas pagadas (app/tours/popularity.py), más popular primero
+
+
+class TourSearch(SQLModel):
+    """Filtros de /tours/search (todos opcionales, se combinan con AND)."""
+    destino: str | None = None
+    fecha_desde: dt.date | None = None
+    fecha_hasta: dt.date | None = None
+    precio_min: float | None = Field(default=None, ge=0)
+    precio_max: float | None = Field(default=None, ge=0)
+    id_operadora: int | None = None
+    id_guia: int | None = None
+    # Cupos libres: capacidad_maxima - personas en reservas no canceladas
+    cupos_min: int | None = Field(default=None, ge=1)
+
+
+class TourSearchHit(SQLModel):
+    """Resultado de /tours/search/text: relevancia + fragmento con <mark>…</mark>."""
+    id: int
+    nombre: str
+    destino: str
+    fecha: dt.date
+    precio: float
+    image_url: str | None = None
+    rank: float
+    snippet: str
+
+
+class TourSuggestion(SQLModel):
+    texto: str
+    tipo: str  # destino | tour | operadora
+    reservas: int
+
+
+class TourNearby(TourSummary):
+    """Resultado de /tours/cercanos: la tarjeta, su punto de salida y la distancia al punto pedido."""
+    latitud: float
+    longitud: float
+    distancia_km: float
+
+
+class TourSimilar(SQLModel, table=True):
+    """
+    Vecinos precalculados de cada tour (app/tours/similar.py): los SIMILAR_TOURS_K
+    más parecidos por co-ocurrencia en reservas. /tours/{id}/similar lee por PK.
+
+    Sin foreign keys: es una tabla derivada que el job reescribe con COPY (los
+    chequeos de FK por fila triplicaban la escritura). La consulta hace JOIN con
+    tour, y lo de tours borrados desaparece en el siguiente recálculo completo.
+    """
+    __tablename__ = "tour_similar"
+    # Marca de agua del recálculo incremental y antigüedad del último completo (min/max sin leer la tabla)
+    __table_args__ = (Index("ix_tour_similar_computed_at", "computed_at"),)
+
+    tour_id: int = Field(primary_key=True)
+    rank: int = Field(primary_key=True, sa_type=SmallInteger)
+    similar_id: int
+    score: float = Field(sa_type=REAL)
+    computed_at: dt.datetime
+
+
+# Una reserva pagada pesa como tantas vistas del detalle (columna generada: cambiarlo es una migración)
+POPULARITY_RESERVA_WEIGHT = 20
+
+
+class TourPopularity(SQLModel, table=True):
+    """
+    Contadores de popularidad por tour (app/tours/popularity.py).
+
+    Tabla aparte para no tocar la fila del tour en cada vista: cada worker
+    acumula en memoria y suma sus deltas acá en lotes (upsert). Todo tour tiene
+    su fila (trigger AFTER INSERT en tour): sort=popular es un JOIN que recorre
+    ix_tour_popularity_score de mayor a menor y corta en la página.
+    """
+    __tablename__ = "tour_popularity"
+    __table_args__ = (Index("ix_tour_popularity_score", "score", "tour_id"),)
+
+    tour_id: int = Field(primary_key=True, foreign_key="tour.id", ondelete="CASCADE")
+    views: int = Field(default=0, sa_type=BigInteger)
+    reservas: int = Field(default=0)  # reservas pagadas (menos las que se cancelaron después)
+    score: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, Computed(f"views + {POPULARITY_RESERVA_WEIGHT} * reservas"), nullable=False),
+    )
+    updated_date: dt.datetime = Field(default_factory=dt.datetime.now)
+
+
+class TourPopularityBatch(SQLModel, table=True):
+    # Lotes ya sumados: un lote reintentado (commit que falló a medias) no cuenta dos veces
+    __tablename__ = "tour_popularity_batch"
+
+    id: uuid.UUID = Field(primary_key=True)
+    applied_date: dt.datetime = Field(default_factory=dt.datetime.now, index=True)
+
+
+# Puntaje de popularidad del tour; solo se carga con with_expression (sort=popular de /tours/search)
+Tour.__mapper__.add_property("popularidad", query_expression())
+
+
 class ReservaEnum(StrEnum):
     PAGADA = "PAGADA"
     PENDIENTE = "PENDIENTE"
@@ -355,6 +527,19 @@ class Estado_Reserva(SQLModel, table=True):
     reservas: list["Reservas"] = Relationship(back_populates="estado")
 
 class Reservas(SQLModel, table=True):
+    # Listados admin: orden (created_date DESC, id DESC) para el cursor, global y por usuario
+    __table_args__ = (
+        Index("ix_reservas_created_id", "created_date", "id"),
+        Index("ix_reservas_usuario_created_id", "id_usuario", "created_date", "id"),
+        # Reservas modificadas desde la última vuelta de tours similares (BitmapOr con created_date)
+        Index("ix_reservas_updated_date", "updated_date"),
+        # Cupos ocupados por tour (reservas no canceladas) sin leer la tabla
+        Index(
+            "ix_reservas_tour_ocupacion", "id_tour", "numero_personas",
+            postgresql_where=text("id_reserva_estado <> 3"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     id_tour: int | None = Field(default=None, foreign_key="tour.id")
     id_usuario: uuid.UUID | None = Field(default=None, foreign_key="user.id")
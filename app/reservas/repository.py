@@ -1,12 +1,55 @@
 import uuid
 from sqlmodel import select
 from fastapi import HTTPException
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
-from app.auth.deps import SessionDep
+from app.auth.deps import SessionDep, AsyncSessionDep
+from app.core.pagination import Keyset
 from app.models import Reservas, Tour, ReservasCreateAdmin, User
 
 
+# ============================================================
+# Consultas compartidas (sync / async)
+# ============================================================
+def _with_relations(stmt):
+    # Todas son many-to-one: un solo SELECT con JOINs en vez de 5 round trips extra
+    return stmt.options(
+        joinedload(Reservas.tour),
+        joinedload(Reservas.estado),
+        joinedload(Reservas.usuario),
+        joinedload(Reservas.usuario_created),
+        joinedload(Reservas.usuario_updated),
+    )
+
+
+def _by_id_stmt(reserva_id: int):
+    return _with_relations(select(Reservas).where(Reservas.id == reserva_id))
+
+
+# Más recientes primero; `id` desempata reservas creadas en el mismo instante
+RESERVAS_KEYSET = Keyset("reservas", Reservas.created_date, Reservas.id, descending=True)
+
+
+def _list_all_stmt(offset: int, limit: int, cursor: str | None = None):
+    return RESERVAS_KEYSET.paginate(_with_relations(select(Reservas)), offset, limit, cursor)
+
+
+def _parse_user_id(user_id) -> uuid.UUID:
+    # Convertir a UUID si viene como string
+    if isinstance(user_id, str):
+        try:
+            return uuid.UUID(user_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ID de usuario inválido")
+    return user_id
+
+
+def _list_by_user_stmt(user_id: uuid.UUID, offset: int, limit: int, cursor: str | None = None):
+    return RESERVAS_KEYSET.paginate(
+        _with_relations(select(Reservas).where(Reservas.id_usuario == user_id)), offset, limit, cursor
+    )
+
+
 class ReservasRepository:
 
     # ============================================================
@@ -14,17 +57,7 @@ class ReservasRepository:
     # ============================================================
     @staticmethod
     def get_by_id(session: SessionDep, reserva_id: int) -> Reservas:
-        reserva = session.exec(
-            select(Reservas)
-            .where(Reservas.id == reserva_id)
-            .options(
-                selectinload(Reservas.tour),
-                selectinload(Reservas.estado),
-                selectinload(Reservas.usuario),
-                selectinload(Reservas.usuario_created),
-                selectinload(Reservas.usuario_updated),
-            )
-        ).first()
+        reserva = session.exec(_by_id_stmt(reserva_id)).first()
 
         if not reserva:
             raise HTTPException(status_code=404, detail="Reserva no encontrada")
@@ -35,49 +68,19 @@ class ReservasRepository:
     # Listar TODAS las reservas (admin)
     # ============================================================
     @staticmethod
-    def list_all(session: SessionDep, offset: int = 0, limit: int = 100) -> list[Reservas]:
-        return session.exec(
-            select(Reservas)
-            .options(
-                selectinload(Reservas.tour),
-                selectinload(Reservas.estado),
-                selectinload(Reservas.usuario),
-                selectinload(Reservas.usuario_created),
-                selectinload(Reservas.usuario_updated),
-            )
-            .order_by(Reservas.created_date.desc())
-            .offset(offset)
-            .limit(limit)
-        ).all()
+    def list_all(session: SessionDep, offset: int = 0, limit: int = 100, cursor: str | None = None) -> list[Reservas]:
+        return session.exec(_list_all_stmt(offset, limit, cursor)).all()
 
     # ============================================================
     # Listar reservas por usuario (ADMIN)
     # Acepta str o uuid.UUID
     # ============================================================
     @staticmethod
-    def list_by_user(session: SessionDep, user_id, offset: int = 0, limit: int = 100) -> list[Reservas]:
-
-        # Convertir a UUID si viene como string
-        if isinstance(user_id, str):
-            try:
-                user_id = uuid.UUID(user_id)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="ID de usuario inválido")
-
-        return session.exec(
-            select(Reservas)
-            .where(Reservas.id_usuario == user_id)
-            .options(
-                selectinload(Reservas.tour),
-                selectinload(Reservas.estado),
-                selectinload(Reservas.usuario),
-                selectinload(Reservas.usuario_created),
-                selectinload(Reservas.usuario_updated),
-            )
-            .order_by(Reservas.created_date.desc())
-            .offset(offset)
-            .limit(limit)
-        ).all()
+    def list_by_user(
+        session: SessionDep, user_id, offset: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[Reservas]:
+        user_id = _parse_user_id(user_id)
+        return session.exec(_list_by_user_stmt(user_id, offset, limit, cursor)).all()
 
     # Alias
     @staticmethod
@@ -147,3 +150,32 @@ class ReservasRepository:
     def _hard_delete(session: SessionDep, reserva_db: Reservas) -> None:
         session.delete(reserva_db)
         session.commit()
+
+
+class AsyncReservasRepository:
+    """Lecturas de reservas con AsyncSession (listados y detalle del admin)."""
+
+    @staticmethod
+    async def get_by_id(session: AsyncSessionDep, reserva_id: int) -> Reservas:
+        result = await session.exec(_by_id_stmt(reserva_id))
+        reserva = result.first()
+
+        if not reserva:
+            raise HTTPException(status_code=404, detail="Reserva no encontrada")
+
+        return reserva
+
+    @staticmethod
+    async def list_all(
+        session: AsyncSessionDep, offset: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[Reservas]:
+        result = await session.exec(_list_all_stmt(offset, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    async def list_by_user(
+        session: AsyncSessionDep, user_id, offset: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[Reservas]:
+        user_id = _parse_user_id(user_id)
+        result = await session.exec(_list_by_user_stmt(user_id, offset, limit, cursor))
+        return result.all()
@@ -1,7 +1,7 @@
 import datetime as dt
 from fastapi import HTTPException
 
-from app.auth.deps import SessionDep
+from app.auth.deps import SessionDep, AsyncSessionDep
 from app.models import (
     Reservas,
     ReservasCreatePublic,
@@ -9,7 +9,8 @@ from app.models import (
     ReservasUpdate,
     User
 )
-from app.reservas.repository import ReservasRepository
+from app.reservas.repository import ReservasRepository, AsyncReservasRepository
+from app.tours.popularity import popularity_counters
 
 
 # Estados de reserva
@@ -18,6 +19,14 @@ ESTADO_RESERVA_CANCELADA = 3
 ESTADO_RESERVA_PAGADA = 1   # ← FALTABA ESTA CONSTANTE
 
 
+def track_pagada(id_tour_anterior: int | None, estado_anterior: int, id_tour: int | None, estado: int) -> None:
+    """Popularidad: llamar después del commit con el tour/estado de la reserva antes y después del cambio."""
+    if estado_anterior == ESTADO_RESERVA_PAGADA and id_tour_anterior is not None:
+        popularity_counters.record_reserva(id_tour_anterior, -1)
+    if estado == ESTADO_RESERVA_PAGADA and id_tour is not None:
+        popularity_counters.record_reserva(id_tour, +1)
+
+
 class ReservasService:
 
     # ============================================================
@@ -73,7 +82,9 @@ class ReservasService:
         reserva_in: ReservasCreateAdmin,
         current_user: User,
     ) -> Reservas:
-        return ReservasRepository.create_admin(session, reserva_in, current_user)
+        reserva = ReservasRepository.create_admin(session, reserva_in, current_user)
+        track_pagada(None, ESTADO_RESERVA_PENDIENTE, reserva.id_tour, reserva.id_reserva_estado)
+        return reserva
 
     # ============================================================
     # Listar reservas del usuario autenticado
@@ -121,6 +132,35 @@ class ReservasService:
             raise HTTPException(status_code=404, detail="Reserva no encontrada")
         return reserva
 
+    # ============================================================
+    # Lecturas async (ADMIN)
+    # ============================================================
+    @staticmethod
+    async def admin_list_reservas_async(
+        session: AsyncSessionDep,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+    ):
+        return await AsyncReservasRepository.list_all(session, offset, limit, cursor)
+
+    @staticmethod
+    async def admin_list_reservas_by_user_async(
+        session: AsyncSessionDep,
+        user_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+    ):
+        return await AsyncReservasRepository.list_by_user(session, user_id, offset, limit, cursor)
+
+    @staticmethod
+    async def admin_get_reserva_by_id_async(
+        session: AsyncSessionDep,
+        reserva_id: int,
+    ) -> Reservas:
+        return await AsyncReservasRepository.get_by_id(session, reserva_id)
+
     # ============================================================
     # Cancelar reserva (ADMIN)
     # ============================================================
@@ -131,6 +171,7 @@ class ReservasService:
         current_user: User,
     ) -> Reservas:
         reserva_db = ReservasRepository.get_by_id(session, reserva_id)
+        id_tour, estado = reserva_db.id_tour, reserva_db.id_reserva_estado
 
         data = {
             "id_reserva_estado": ESTADO_RESERVA_CANCELADA,
@@ -139,7 +180,9 @@ class ReservasService:
             "id_usuario_updated": current_user.id,
         }
 
-        return ReservasRepository.update(session, reserva_db, data)
+        reserva = ReservasRepository.update(session, reserva_db, data)
+        track_pagada(id_tour, estado, reserva.id_tour, reserva.id_reserva_estado)
+        return reserva
 
     # ============================================================
     # Actualizar reserva (ADMIN)
@@ -152,13 +195,16 @@ class ReservasService:
         current_user: User,
     ) -> Reservas:
         reserva_db = ReservasRepository.get_by_id(session, reserva_id)
+        id_tour, estado = reserva_db.id_tour, reserva_db.id_reserva_estado
 
         update_data = reserva_in.model_dump(exclude_unset=True)
         update_data["id_usuario_updated"] = current_user.id
         update_data["updated_date"] = dt.datetime.now()
         update_data["fecha_modificacion_reserva"] = dt.datetime.now()
 
-        return ReservasRepository.update(session, reserva_db, update_data)
+        reserva = ReservasRepository.update(session, reserva_db, update_data)
+        track_pagada(id_tour, estado, reserva.id_tour, reserva.id_reserva_estado)
+        return reserva
 
     # ============================================================
     # Marcar como PAGADA (ADMIN)
@@ -173,6 +219,7 @@ class ReservasService:
 
         if not reserva_db:
             raise HTTPException(status_code=404, detail="Reserva no encontrada")
+        id_tour, estado = reserva_db.id_tour, reserva_db.id_reserva_estado
 
         data = {
             "id_reserva_estado": ESTADO_RESERVA_PAGADA,
@@ -181,4 +228,6 @@ class ReservasService:
             "id_usuario_updated": current_user.id,
         }
 
-        return ReservasRepository.update(session, reserva_db, data)
+        reserva = ReservasRepository.update(session, reserva_db, data)
+        track_pagada(id_tour, estado, reserva.id_tour, reserva.id_reserva_estado)
+        return reserva
@@ -15,6 +15,8 @@ def create_tour():
         operadoras = session.exec(select(Operadora.id).limit(3)).all()
         guias = session.exec(select(Guia.id).limit(3)).all()
         nombres = ["Isla de la Plata", "Machalilla", "Frailes"]
+        # Punto de salida (lat, lon): la Isla de la Plata sale del muelle de Puerto López
+        coordenadas = [(-1.5590, -80.8120), (-1.4800, -80.7700), (-1.4950, -80.7830)]
         horas_inicio = [
             datetime.time.fromisoformat("08:00:00"),
             datetime.time.fromisoformat("10:00:00"),
@@ -25,7 +27,9 @@ def create_tour():
             datetime.time.fromisoformat("12:00:00"),
             datetime.time.fromisoformat("16:00:00")
         ]
-        for i, (operadora, guia, nombre, hora_i, hora_f) in enumerate(zip(operadoras, guias, nombres, horas_inicio, horas_fin)):
+        for i, (operadora, guia, nombre, hora_i, hora_f, (lat, lon)) in enumerate(
+            zip(operadoras, guias, nombres, horas_inicio, horas_fin, coordenadas)
+        ):
             fecha = datetime.datetime.now() + datetime.timedelta(days=7)
             tour = Tour(
                 id_operadora=operadora,
@@ -38,7 +42,9 @@ def create_tour():
                 precio=random.randint(10, 30),
                 capacidad_maxima=random.randint(10, 15),
                 destino=nombre,
-                image_url=None
+                image_url=None,
+                latitud=lat,
+                longitud=lon,
             )
             session.add(tour)
             session.flush()
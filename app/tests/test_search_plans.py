@@ -0,0 +1,31 @@
+"""
+Planes de /tours/search: cada combinación de filtros × orden entra por índice
+(ver app/benchmarks/search_plans.py). Necesita Postgres; sin base configurada se saltea.
+"""
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def session():
+    try:
+        from sqlmodel import Session
+
+        from app.core.database import engine
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"sin base de datos: {e}")
+
+    with Session(engine) as session:
+        yield session
+        session.rollback()
+
+
+def test_search_plans_use_indexes(session):
+    from app.benchmarks.search_plans import check_plans, seed
+
+    seed(session)
+    total, failures = check_plans(session)
+    assert not failures, f"{len(failures)}/{total} planes sin índice:\n" + "\n".join(failures)
@@ -0,0 +1,308 @@
+"""
+Autocompletado de destinos, nombres de tour y operadoras, en memoria.
+
+El vocabulario es chico y cambia poco: se arma por proceso a partir de los
+tours activos que todavía no partieron (como el resto del catálogo público) y
+no se consulta la BD por cada tecla.
+
+- Arreglo ordenado de claves normalizadas (sin acentos, minúsculas), una por
+  cada palabra del término: "pla" encuentra "Isla de la Plata"
+- Un prefijo es un rango del arreglo (bisect); dentro del rango se eligen los
+  top-k por cantidad de reservas (no canceladas) de sus tours
+- Prefijos de 1-2 letras: top-k precalculado; el resto, cache por prefijo
+- ToursService actualiza solo el tour que cambió; el rebuild completo periódico
+  (AUTOCOMPLETE_REFRESH_SECONDS) trae los conteos de reservas y los cambios
+  hechos por otros workers/nodos
+"""
+import asyncio
+import bisect
+import datetime
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from typing import NamedTuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Operadora, Reservas, Tour
+from app.reservas.service import ESTADO_RESERVA_CANCELADA
+from app.tours.repository import _upcoming
+
+logger = logging.getLogger(__name__)
+
+DESTINO = "destino"
+TOUR = "tour"
+OPERADORA = "operadora"
+
+Term = tuple[str, str]  # (tipo, texto)
+
+MAX_SUGGESTIONS = 20
+SHORT_PREFIX = 2  # prefijos con top-k precalculado
+
+
+class TourTerms(NamedTuple):
+    """Lo único que el índice lee de un tour."""
+    id: int
+    destino: str
+    nombre: str
+    operadora: str | None
+
+
+class Suggestion(NamedTuple):
+    texto: str
+    tipo: str
+    reservas: int
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin acentos: "Isla de la Plata" → "isla de la plata", "Olón" → "olon"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def _keys(text: str) -> list[str]:
+    """Una clave por palabra: "isla de la plata", "de la plata", "la plata", "plata"."""
+    words = fold(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class _TermStats:
+    __slots__ = ("tours", "reservas")
+
+    def __init__(self):
+        self.tours: set[int] = set()
+        self.reservas = 0
+
+
+def _top(
+    entries: list[tuple[str, str, str]], terms: dict[Term, _TermStats], key: str, limit: int
+) -> list[Suggestion]:
+    start = bisect.bisect_left(entries, (key,))
+    stop = bisect.bisect_left(entries, (key + "\uffff",), lo=start)
+    candidates = {(tipo, texto) for _, tipo, texto in entries[start:stop]}
+    # Más reservas primero; a igualdad, el texto más corto (y orden estable)
+    best = heapq.nsmallest(
+        limit, candidates, key=lambda term: (-terms[term].reservas, len(term[1]), term)
+    )
+    return [Suggestion(texto, tipo, terms[(tipo, texto)].reservas) for tipo, texto in best]
+
+
+def _short_prefixes(keys) -> set[str]:
+    return {key[:n] for key in keys for n in range(1, SHORT_PREFIX + 1) if len(key) >= n}
+
+
+class PrefixIndex:
+    """
+    Los prefijos de hasta SHORT_PREFIX letras abarcan rangos enormes ("a"):
+    su top-MAX_SUGGESTIONS se precalcula en el rebuild. Los más largos son
+    rangos chicos y se calculan al vuelo, con un cache por (prefijo, limit).
+    Un cambio invalida solo los prefijos de las claves que tocó.
+    """
+
+    def __init__(self, cache_entries: int):
+        self.cache_entries = cache_entries
+        self._lock = threading.Lock()
+        self._entries: list[tuple[str, str, str]] = []  # (clave, tipo, texto), ordenado
+        self._terms: dict[Term, _TermStats] = {}
+        self._tours: dict[int, list[Term]] = {}  # tour_id → términos (solo tours activos)
+        self._reservas: dict[int, int] = {}  # tour_id → reservas no canceladas (del último rebuild)
+        self._short: dict[str, list[Suggestion]] = {}
+        self._cache: dict[tuple[str, int], list[Suggestion]] = {}
+        self._cached_limits: set[int] = set()
+        self.built_at: float | None = None
+        self.queries = 0
+        self.cache_hits = 0
+        self.incremental_updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    # ============================================================
+    # Consulta
+    # ============================================================
+    def complete(self, prefix: str, limit: int = 8) -> list[Suggestion]:
+        key = fold(prefix)
+        limit = min(limit, MAX_SUGGESTIONS)
+        self.queries += 1
+        if not key:
+            return []
+        if len(key) <= SHORT_PREFIX:
+            short = self._short.get(key)
+            if short is None:  # invalidado por un update_tour
+                with self._lock:
+                    short = self._short[key] = _top(self._entries, self._terms, key, MAX_SUGGESTIONS)
+            return short[:limit]
+
+        cached = self._cache.get((key, limit))
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        with self._lock:
+            result = _top(self._entries, self._terms, key, limit)
+            if len(self._cache) >= self.cache_entries:
+                self._cache.clear()
+            self._cache[(key, limit)] = result
+            self._cached_limits.add(limit)
+        return result
+
+    # ============================================================
+    # Actualización
+    # ============================================================
+    def rebuild(self, tours: list[TourTerms], reservas: dict[int, int]) -> None:
+        terms: dict[Term, _TermStats] = {}
+        by_tour: dict[int, list[Term]] = {}
+        for tour in tours:
+            tour_terms = _terms_of(tour)
+            count = reservas.get(tour.id, 0)
+            by_tour[tour.id] = tour_terms
+            for term in tour_terms:
+                stats = terms.setdefault(term, _TermStats())
+                stats.tours.add(tour.id)
+                stats.reservas += count
+
+        entries = sorted((key, tipo, texto) for tipo, texto in terms for key in _keys(texto))
+        short = {
+            prefix: _top(entries, terms, prefix, MAX_SUGGESTIONS)
+            for prefix in _short_prefixes(key for key, _, _ in entries)
+        }
+        with self._lock:
+            self._entries, self._terms, self._tours, self._reservas = entries, terms, by_tour, reservas
+            self._short = short
+            self._cache = {}
+            self.built_at = time.monotonic()
+
+    def update_tour(self, tour: Tour) -> None:
+        """Reemplaza los términos de un tour (alta, edición, activación o baja)."""
+        if not self.ready:
+            return  # el primer rebuild ya lo va a leer de la BD
+        with self._lock:
+            count = self._reservas.get(tour.id, 0)
+            old_terms = self._tours.pop(tour.id, [])
+            for term in old_terms:
+                stats = self._terms[term]
+                stats.tours.discard(tour.id)
+                stats.reservas -= count
+                if not stats.tours:
+                    del self._terms[term]
+                    self._remove_entries(term)
+
+            suggestible = tour.is_active and _departs_after(tour, datetime.datetime.now())
+            new_terms = _terms_of(_row_of(tour)) if suggestible else []
+            if new_terms:
+                self._tours[tour.id] = new_terms
+            for term in new_terms:
+                if term not in self._terms:
+                    self._terms[term] = _TermStats()
+                    self._insert_entries(term)
+                self._terms[term].tours.add(tour.id)
+                self._terms[term].reservas += count
+
+            # Solo cambian los resultados de los prefijos de las claves tocadas
+            keys = {key for _, texto in old_terms + new_terms for key in _keys(texto)}
+            for prefix in _short_prefixes(keys):
+                self._short.pop(prefix, None)  # se recalcula en la próxima consulta
+            for key in keys:
+                for n in range(SHORT_PREFIX + 1, len(key) + 1):
+                    for limit in self._cached_limits:
+                        self._cache.pop((key[:n], limit), None)
+            self.incremental_updates += 1
+
+    def _insert_entries(self, term: Term) -> None:
+        tipo, texto = term
+        for key in _keys(texto):
+            bisect.insort(self._entries, (key, tipo, texto))
+
+    def _remove_entries(self, term: Term) -> None:
+        tipo, texto = term
+        for key in _keys(texto):
+            i = bisect.bisect_left(self._entries, (key, tipo, texto))
+            if i < len(self._entries) and self._entries[i] == (key, tipo, texto):
+                del self._entries[i]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "terms": len(self._terms),
+            "keys": len(self._entries),
+            "tours": len(self._tours),
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "incremental_updates": self.incremental_updates,
+        }
+
+
+def _terms_of(row: TourTerms) -> list[Term]:
+    terms = [(DESTINO, row.destino), (TOUR, row.nombre), (OPERADORA, row.operadora)]
+    return list(dict.fromkeys(term for term in terms if term[1]))
+
+
+def _row_of(tour: Tour) -> TourTerms:
+    operadora = tour.operadora.nombre if tour.operadora is not None else None
+    return TourTerms(tour.id, tour.destino, tour.nombre, operadora)
+
+
+def _departs_after(tour: Tour, now: datetime.datetime) -> bool:
+    """El mismo corte que _upcoming(), para los cambios que llegan de a uno."""
+    return (tour.fecha, tour.hora_inicio) >= (now.date(), now.time())
+
+
+autocomplete_index = PrefixIndex(cache_entries=settings.AUTOCOMPLETE_CACHE_ENTRIES)
+
+
+# ============================================================
+# Carga desde la BD
+# ============================================================
+def rebuild_index(session: Session) -> None:
+    # Solo las tres columnas que se sugieren, no la entidad completa
+    tours = [
+        TourTerms(*row)
+        for row in session.exec(
+            select(Tour.id, Tour.destino, Tour.nombre, Operadora.nombre)
+            .outerjoin(Operadora, Tour.id_operadora == Operadora.id)
+            .where(Tour.is_active == True, _upcoming())
+        ).all()
+    ]
+    reservas = dict(
+        session.exec(
+            select(Reservas.id_tour, func.count())
+            .where(Reservas.id_reserva_estado != ESTADO_RESERVA_CANCELADA)
+            .group_by(Reservas.id_tour)
+        ).all()
+    )
+    autocomplete_index.rebuild(tours, reservas)
+
+
+def _rebuild_from_db() -> None:
+    with Session(engine) as session:
+        rebuild_index(session)
+
+
+_first_build = asyncio.Lock()
+
+
+async def ensure_ready() -> None:
+    """Primer request del proceso: arma el índice (una sola vez aunque lleguen varios)."""
+    if autocomplete_index.ready:
+        return
+    async with _first_build:
+        if not autocomplete_index.ready:
+            await asyncio.to_thread(_rebuild_from_db)
+
+
+async def run_refresher() -> None:
+    """Tarea de fondo del lifespan."""
+    while True:
+        try:
+            await asyncio.to_thread(_rebuild_from_db)
+        except Exception:
+            logger.exception("No se pudo reconstruir el índice de autocompletado")
+        await asyncio.sleep(settings.AUTOCOMPLETE_REFRESH_SECONDS)
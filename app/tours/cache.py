@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.sessions import async_read_session
+from app.models import TourPublic, TourSummary
+from app.tours.repository import UPCOMING_KEYSET, AsyncToursRepository, catalog_keyset
+
+logger = logging.getLogger(__name__)
+
+# (vista, offset, limit, is_active, upcoming, cursor); vista: "full" (TourPublic) | "summary" (TourSummary)
+CatalogKey = tuple[str, int, int | None, bool | None, bool, str | None]
+
+
+class CatalogPage(NamedTuple):
+    body: bytes
+    next_cursor: str | None
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Evita "exception was never retrieved" si nadie quedó esperando el rebuild
+    if not task.cancelled():
+        task.exception()
+
+
+_tour_list_adapter = TypeAdapter(list[TourPublic])
+_summary_list_adapter = TypeAdapter(list[TourSummary])
+
+
+class CatalogCache:
+    """
+    Cache en memoria (por proceso) del JSON final del catálogo público.
+
+    - Clave: (vista, offset, limit, is_active, upcoming, cursor); valor: bytes listos para la respuesta
+      y el cursor de la página siguiente
+    - Fresca durante `ttl_seconds`; luego, hasta `stale_seconds`, se sirve la
+      versión vieja mientras se reconstruye en segundo plano (stale-while-revalidate)
+    - Un solo rebuild por clave a la vez: los requests concurrentes esperan el mismo
+    - ToursService invalida todo al crear/editar/activar/desactivar; los otros
+      workers se enteran al vencer el TTL
+    - Durante `ttl_seconds` después de una invalidación, los builds leen del
+      primary: una réplica atrasada no vuelve a guardar el catálogo de antes de
+      la escritura por todo un TTL. Los refrescos posteriores vuelven a las réplicas
+    """
+
+    def __init__(self, ttl_seconds: float, stale_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CatalogKey, tuple[float, CatalogPage]] = OrderedDict()
+        self._building: dict[CatalogKey, asyncio.Task] = {}
+        self._refresh_tasks: set[asyncio.Task] = set()
+        self._generation = 0
+        self._invalidated_at = -math.inf
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    async def get(self, key: CatalogKey, build: Callable[[bool], Awaitable[CatalogPage]]) -> CatalogPage:
+        """`build(primary)`: primary=True → leer del primary en vez de una réplica."""
+        if not self.enabled:
+            return await build(False)
+
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = now - entry[0]
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                if key not in self._building:
+                    task = asyncio.create_task(self._refresh(key, build))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return entry[1]
+
+        self.misses += 1
+        return await self._build(key, build)
+
+    async def _build(self, key: CatalogKey, build: Callable[[bool], Awaitable[CatalogPage]]) -> CatalogPage:
+        """
+        Espera el rebuild de `key` (lo arranca si no hay uno en curso). El rebuild
+        es una tarea del cache: si se cancela el request que lo arrancó (cliente
+        desconectado, timeout), sigue corriendo para los demás que lo esperan.
+        """
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_build(key, build))
+            task.add_done_callback(_retrieve_exception)
+            self._building[key] = task
+        return await asyncio.shield(task)
+
+    async def _run_build(self, key: CatalogKey, build: Callable[[bool], Awaitable[CatalogPage]]) -> CatalogPage:
+        generation = self._generation
+        primary = time.monotonic() - self._invalidated_at < self.ttl_seconds
+        try:
+            page = await build(primary)
+        finally:
+            self._building.pop(key, None)
+
+        # Si hubo una invalidación durante el build, no se guarda (podría ser viejo)
+        if generation == self._generation:
+            self._store(key, page)
+        return page
+
+    async def _refresh(self, key: CatalogKey, build: Callable[[bool], Awaitable[CatalogPage]]) -> None:
+        try:
+            await self._build(key, build)
+        except Exception:
+            logger.exception("No se pudo refrescar el catálogo %s", key)
+
+    def _store(self, key: CatalogKey, page: CatalogPage) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), page)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at = time.monotonic()
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.stale_hits) / total, 4) if total else 0.0,
+        }
+
+
+catalog_cache = CatalogCache(
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+    stale_seconds=settings.CATALOG_CACHE_STALE_SECONDS,
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+)
+
+
+# ============================================================
+# Catálogo público como JSON
+# ============================================================
+async def build_catalog_json(
+    offset: int,
+    limit: int | None,
+    is_active: bool | None,
+    cursor: str | None = None,
+    upcoming: bool = False,
+    primary: bool = False,
+) -> CatalogPage:
+    # Sesión propia: el rebuild puede correr en segundo plano, después del request
+    async with async_read_session(primary) as session:
+        tours = await AsyncToursRepository.list(session, offset, limit, is_active, cursor, upcoming)
+        # Lo mismo que haría FastAPI con response_model=list[TourPublic]
+        body = _tour_list_adapter.dump_json(_tour_list_adapter.validate_python(tours, from_attributes=True))
+        return CatalogPage(body, catalog_keyset(upcoming).next_cursor(tours, limit))
+
+
+async def get_catalog_json(
+    offset: int, limit: int | None, is_active: bool | None, cursor: str | None = None, upcoming: bool = False
+) -> CatalogPage:
+    # Con upcoming, una página cacheada puede incluir una salida que partió hace menos de TTL
+    return await catalog_cache.get(
+        ("full", offset, limit, is_active, upcoming, cursor),
+        lambda primary: build_catalog_json(offset, limit, is_active, cursor, upcoming, primary),
+    )
+
+
+async def build_summary_json(
+    offset: int, limit: int | None, cursor: str | None = None, primary: bool = False
+) -> CatalogPage:
+    async with async_read_session(primary) as session:
+        rows = await AsyncToursRepository.list_summary(session, offset, limit, cursor)
+        body = _summary_list_adapter.dump_json(_summary_list_adapter.validate_python(rows, from_attributes=True))
+        return CatalogPage(body, UPCOMING_KEYSET.next_cursor(rows, limit))
+
+
+async def get_summary_json(offset: int, limit: int | None, cursor: str | None = None) -> CatalogPage:
+    return await catalog_cache.get(
+        ("summary", offset, limit, True, True, cursor),
+        lambda primary: build_summary_json(offset, limit, cursor, primary),
+    )
@@ -0,0 +1,113 @@
+"""
+Baja automática de las salidas que ya pasaron.
+
+El catálogo público ya oculta las salidas que partieron (`_upcoming`), pero
+mientras sigan con is_active=true ocupan lugar en los índices parciales
+(ix_tour_upcoming, ix_tour_search_*, ix_tour_search_vector) y en el
+autocompletado, y esos crecen temporada tras temporada. Este job las
+desactiva (soft delete, como el DELETE del admin):
+
+- Lotes de TOUR_EXPIRY_BATCH_SIZE: UPDATE ... WHERE id IN (SELECT ... LIMIT n
+  FOR UPDATE SKIP LOCKED), un commit por lote → transacciones cortas y sin
+  esperar filas que esté editando un admin
+- Un solo worker/nodo por vez (pg_try_advisory_lock); los demás saltean la vuelta
+- Si desactivó algo: invalida el cache del catálogo y reconstruye el snapshot
+
+Corrida manual (o desde cron con TOUR_EXPIRY_ENABLED=false):
+
+    python -m app.tours.expiry
+"""
+import argparse
+import asyncio
+import datetime as dt
+import logging
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Tour
+from app.tours.cache import catalog_cache
+from app.tours.snapshot import rebuild_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock (arbitraria, única en la app)
+_LOCK_KEY = 0x746F7572  # "tour"
+
+
+def _expire_batch_stmt(cutoff: dt.date, batch_size: int):
+    expired = (
+        select(Tour.id)
+        .where(Tour.is_active == True, Tour.fecha < cutoff)
+        .order_by(Tour.fecha, Tour.hora_inicio, Tour.id)  # ix_tour_upcoming
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Tour)
+        .where(Tour.id.in_(expired.scalar_subquery()))
+        .values(is_active=False, updated_date=dt.datetime.now())
+        .returning(Tour.id)
+    )
+
+
+def expire_past_tours(session: Session, today: dt.date | None = None) -> list[int]:
+    """Desactiva los tours con fecha anterior a hoy - TOUR_EXPIRY_GRACE_DAYS; devuelve sus ids."""
+    cutoff = (today or dt.date.today()) - dt.timedelta(days=settings.TOUR_EXPIRY_GRACE_DAYS)
+    batch_size = settings.TOUR_EXPIRY_BATCH_SIZE
+    expired: list[int] = []
+    while True:
+        ids = session.exec(_expire_batch_stmt(cutoff, batch_size)).scalars().all()
+        session.commit()
+        expired += ids
+        if len(ids) < batch_size:
+            break
+
+    if expired:
+        catalog_cache.invalidate()
+        rebuild_snapshot(session)
+    return expired
+
+
+def run_once() -> list[int] | None:
+    """None si otro worker/nodo tiene el lock."""
+    # El lock vive en su propia conexión: la sesión hace commit por lote
+    with engine.connect() as lock_conn:
+        locked = lock_conn.scalar(select(func.pg_try_advisory_lock(_LOCK_KEY)))
+        lock_conn.commit()  # el lock es de sesión: no hace falta dejar la transacción abierta
+        if not locked:
+            return None
+        try:
+            with Session(engine) as session:
+                return expire_past_tours(session)
+        finally:
+            lock_conn.scalar(select(func.pg_advisory_unlock(_LOCK_KEY)))
+
+
+async def run_expirer() -> None:
+    """Tarea de fondo del lifespan."""
+    while True:
+        try:
+            expired = await asyncio.to_thread(run_once)
+            if expired:
+                logger.info("Tours desactivados por fecha pasada: %d", len(expired))
+        except Exception:
+            logger.exception("No se pudieron desactivar los tours pasados")
+        await asyncio.sleep(settings.TOUR_EXPIRY_INTERVAL_SECONDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    expired = run_once()
+    if expired is None:
+        print("Otro proceso está corriendo la baja de tours pasados")
+    else:
+        print(f"Tours desactivados: {len(expired)}")
+
+
+if __name__ == "__main__":
+    main()
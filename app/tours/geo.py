@@ -0,0 +1,325 @@
+"""
+Búsqueda de salidas cercanas (`/tours/cercanos`) sin PostGIS, en memoria.
+
+No hay cube/earthdistance en todas las instalaciones de Postgres, y el
+conjunto (tours activos con salida pendiente y coordenadas) es chico: cada
+proceso arma un KD-tree y resuelve "radio + fechas" sin ir a la BD; la BD
+solo trae las tarjetas de la página ya elegida.
+
+- Los puntos van a la esfera unidad (x, y, z): la distancia euclídea (cuerda)
+  crece igual que la distancia sobre la superficie, así que un radio en km es
+  un radio en el KD-tree, sin distorsión por latitud ni corte en ±180°
+- La salida (fecha + hora) es la cuarta dimensión del árbol: la ventana de
+  fechas poda ramas igual que el radio
+- KD-tree estático, implícito sobre un arreglo ordenado (la mediana de cada
+  rango es el nodo); las hojas de LEAF_SIZE puntos se recorren enteras
+- ToursService avisa cada cambio: el tour va a una lista de pendientes (que se
+  recorre lineal) y su punto viejo del árbol queda marcado como obsoleto.
+  Con GEO_INDEX_REBUILD_PENDING cambios se recompacta el árbol en memoria,
+  en segundo plano (app/tours/rebuilds.py)
+- Rebuild completo desde la BD cada GEO_INDEX_REFRESH_SECONDS (cambios de
+  otros workers/nodos, salidas que ya partieron)
+"""
+import asyncio
+import datetime as dt
+import heapq
+import logging
+import math
+import threading
+import time
+from operator import itemgetter
+from typing import NamedTuple
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Tour
+from app.tours.repository import _upcoming
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 16
+_EPOCH = dt.datetime(1970, 1, 1)
+
+Point = tuple[float, float, float, float, int]  # (x, y, z, salida en segundos, tour_id)
+
+
+def _xyz(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _seconds(value: dt.datetime) -> float:
+    return (value - _EPOCH).total_seconds()
+
+
+def _chord(km: float) -> float:
+    """Cuerda (esfera unidad) que corresponde a un arco de `km`."""
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _km(chord_squared: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+
+
+def _distance2(a, b) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class KDTree:
+    """
+    KD-tree 4D estático sobre (x, y, z, salida): el nodo de cada rango [lo, hi)
+    es su mediana en el eje depth % 4.
+
+    `nearest` recorre primero el lado cercano, descarta ramas por radio (ejes
+    espaciales) y por ventana de fechas (eje de salida), y achica el radio al
+    k-ésimo mejor encontrado: no enumera todo lo que cae dentro del radio.
+    """
+
+    def __init__(self, points: list[Point]):
+        self._points = list(points)
+        stack = [(0, len(self._points), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            self._points[lo:hi] = sorted(self._points[lo:hi], key=itemgetter(axis))
+            mid = (lo + hi) // 2
+            next_axis = (axis + 1) % 4
+            stack.append((lo, mid, next_axis))
+            stack.append((mid + 1, hi, next_axis))
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def nearest(
+        self,
+        q: tuple[float, float, float],
+        max_d2: float,
+        t_min: float,
+        t_max: float,
+        k: int,
+        skip: set[int],
+    ) -> list[tuple[float, int]]:
+        """Hasta k (cuerda², tour_id), los más cercanos con cuerda² ≤ max_d2 y salida en [t_min, t_max]."""
+        points = self._points
+        heap: list[tuple[float, int]] = []  # (-cuerda², -tour_id): el peor arriba
+        bound = max_d2
+
+        def consider(point: Point) -> float:
+            if t_min <= point[3] <= t_max and point[4] not in skip:
+                d2 = _distance2(q, point)
+                if d2 <= bound:
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, -point[4]))
+                    else:
+                        heapq.heappushpop(heap, (-d2, -point[4]))
+                    if len(heap) == k:
+                        return -heap[0][0]
+            return bound
+
+        # (lo, hi, eje, cota inferior de cuerda² para todo el rango)
+        stack = [(0, len(points), 0, 0.0)]
+        while stack:
+            lo, hi, axis, lower = stack.pop()
+            if lower > bound or k == 0:
+                continue
+            if hi - lo <= LEAF_SIZE:
+                for point in points[lo:hi]:
+                    bound = consider(point)
+                continue
+            mid = (lo + hi) // 2
+            node = points[mid]
+            bound = consider(node)
+            next_axis = (axis + 1) % 4
+            # Izquierda: valores ≤ nodo; derecha: ≥ nodo
+            if axis == 3:
+                if node[3] <= t_max:
+                    stack.append((mid + 1, hi, next_axis, lower))
+                if node[3] >= t_min:
+                    stack.append((lo, mid, next_axis, lower))
+                continue
+            delta = q[axis] - node[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if delta <= 0 else ((mid + 1, hi), (lo, mid))
+            stack.append((*far, next_axis, max(lower, delta * delta)))
+            stack.append((*near, next_axis, lower))
+
+        return sorted((-d2, -tour_id) for d2, tour_id in heap)
+
+
+class TourPoint(NamedTuple):
+    tour_id: int
+    latitud: float
+    longitud: float
+    salida: dt.datetime
+    xyz: tuple[float, float, float]
+
+    def as_point(self) -> Point:
+        return (*self.xyz, _seconds(self.salida), self.tour_id)
+
+
+def _point_of(tour_id: int, latitud: float, longitud: float, fecha: dt.date, hora_inicio: dt.time) -> TourPoint:
+    return TourPoint(tour_id, latitud, longitud, dt.datetime.combine(fecha, hora_inicio), _xyz(latitud, longitud))
+
+
+class Nearby(NamedTuple):
+    point: TourPoint
+    distancia_km: float
+
+
+class GeoIndex:
+    def __init__(self, rebuild_pending: int):
+        self.rebuild_pending = rebuild_pending
+        self._lock = threading.Lock()
+        self._tree = KDTree([])
+        self._points: dict[int, TourPoint] = {}  # todos los vigentes (árbol + pendientes)
+        self._stale: set[int] = set()  # ids del árbol cuyo punto cambió o se fue
+        self._pending: dict[int, TourPoint] = {}  # altas/cambios desde el último árbol
+        self.built_at: float | None = None
+        self._changes = 0  # sube con cada update_tour/rebuild: compact() no pisa cambios más nuevos
+        self.queries = 0
+        self.incremental_updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    # ============================================================
+    # Consulta
+    # ============================================================
+    def nearby(
+        self,
+        latitud: float,
+        longitud: float,
+        radio_km: float,
+        fecha_desde: dt.date | None = None,
+        fecha_hasta: dt.date | None = None,
+        offset: int = 0,
+        limit: int = 20,
+        now: dt.datetime | None = None,
+    ) -> list[Nearby]:
+        """Salidas pendientes dentro del radio, de la más cercana a la más lejana."""
+        self.queries += 1
+        now = now or dt.datetime.now()
+        t_min = _seconds(max(now, dt.datetime.combine(fecha_desde, dt.time.min)) if fecha_desde else now)
+        t_max = _seconds(dt.datetime.combine(fecha_hasta, dt.time.max)) if fecha_hasta else math.inf
+        q = _xyz(latitud, longitud)
+        max_d2 = _chord(radio_km) ** 2
+        k = offset + limit
+        with self._lock:
+            tree, stale, points = self._tree, self._stale, self._points
+            pending = list(self._pending.values())
+
+        # Los k mejores del árbol (sin los obsoletos) + los pendientes que califican
+        best = tree.nearest(q, max_d2, t_min, t_max, k, stale)
+        for point in pending:
+            d2 = _distance2(q, point.xyz)
+            if d2 <= max_d2 and t_min <= _seconds(point.salida) <= t_max:
+                best.append((d2, point.tour_id))
+        best = heapq.nsmallest(k, best)[offset:]
+        return [Nearby(points[tour_id], round(_km(d2), 2)) for d2, tour_id in best if tour_id in points]
+
+    # ============================================================
+    # Actualización
+    # ============================================================
+    def rebuild(self, points: list[TourPoint]) -> None:
+        tree = KDTree([point.as_point() for point in points])
+        with self._lock:
+            self._tree = tree
+            self._points = {point.tour_id: point for point in points}
+            self._stale = set()
+            self._pending = {}
+            self._changes += 1
+            self.built_at = time.monotonic()
+
+    def update_tour(self, tour: Tour) -> bool:
+        """Alta, edición, activación o baja de un tour; True si conviene llamar a compact()."""
+        if not self.ready:
+            return False  # el primer rebuild ya lo va a leer de la BD
+        point = None
+        if tour.is_active and tour.latitud is not None and tour.longitud is not None:
+            point = _point_of(tour.id, tour.latitud, tour.longitud, tour.fecha, tour.hora_inicio)
+
+        with self._lock:
+            # El punto viejo queda en el árbol pero se descarta; el nuevo va a pendientes
+            self._stale.add(tour.id)
+            self._pending.pop(tour.id, None)
+            self._points.pop(tour.id, None)
+            if point is not None:
+                self._pending[tour.id] = point
+                self._points[tour.id] = point
+            self.incremental_updates += 1
+            self._changes += 1
+            return len(self._pending) + len(self._stale) >= self.rebuild_pending
+
+    def compact(self) -> None:
+        """Rearma el KD-tree con los puntos vigentes (lento: se llama fuera del request)."""
+        while True:
+            with self._lock:
+                changes = self._changes
+                points = list(self._points.values())
+            tree = KDTree([point.as_point() for point in points])
+            with self._lock:
+                if self._changes == changes:
+                    self._tree = tree
+                    self._stale = set()
+                    self._pending = {}
+                    return
+            # Llegó un cambio mientras se armaba el árbol: se rearma con él
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "tours": len(self._points),
+            "tree": len(self._tree),
+            "pending": len(self._pending),
+            "stale": len(self._stale),
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            "queries": self.queries,
+            "incremental_updates": self.incremental_updates,
+        }
+
+
+geo_index = GeoIndex(rebuild_pending=settings.GEO_INDEX_REBUILD_PENDING)
+
+
+# ============================================================
+# Carga desde la BD
+# ============================================================
+def load_points(session: Session) -> list[TourPoint]:
+    rows = session.exec(
+        select(Tour.id, Tour.latitud, Tour.longitud, Tour.fecha, Tour.hora_inicio).where(
+            Tour.is_active == True, _upcoming(), Tour.latitud != None, Tour.longitud != None
+        )
+    ).all()
+    return [_point_of(*row) for row in rows]
+
+
+def _rebuild_from_db() -> None:
+    with Session(engine) as session:
+        points = load_points(session)
+    geo_index.rebuild(points)
+
+
+_first_build = asyncio.Lock()
+
+
+async def ensure_ready() -> None:
+    """Primer request del proceso: arma el índice (una sola vez aunque lleguen varios)."""
+    if geo_index.ready:
+        return
+    async with _first_build:
+        if not geo_index.ready:
+            await asyncio.to_thread(_rebuild_from_db)
+
+
+async def run_refresher() -> None:
+    """Tarea de fondo del lifespan."""
+    while True:
+        try:
+            await asyncio.to_thread(_rebuild_from_db)
+        except Exception:
+            logger.exception("No se pudo reconstruir el índice geográfico")
+        await asyncio.sleep(settings.GEO_INDEX_REFRESH_SECONDS)
@@ -0,0 +1,269 @@
+"""
+Imágenes de tours: subida, variantes redimensionadas y archivos por contenido.
+
+En disco (TOUR_IMAGES_DIR):
+
+    <hash>/original.<ext>     ← lo que subió el admin (para regenerar variantes)
+    <hash>/<ancho>.webp|jpg   ← una por cada VARIANT_WIDTHS, generadas en segundo plano
+    <id>.<ext>                ← imágenes viejas del seeder, sin hash
+
+- <hash> es el blake2b del archivo subido: si la imagen cambia, cambia la URL.
+  Por eso las variantes se sirven con Cache-Control immutable (1 año) y su
+  stat se guarda en memoria para siempre
+- Tour.image_hash guarda el hash, Tour.image_url apunta a la variante por
+  defecto (DEFAULT_WIDTH, WebP) y Tour.image_placeholder es un WebP de ~16px
+  en data URI: el listado puede mostrar el blur-up sin otro request
+- La ruta vieja /images/tours/{id} resuelve con un índice en memoria
+  (id → hash / archivo viejo) en vez de hacer glob en cada request
+- El envío lo hace FileResponse: Range/206 y, con servidores ASGI que
+  soportan `http.response.pathsend` (Granian, Hypercorn), sendfile sin pasar
+  los bytes por Python
+"""
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Tour
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = (
+    Path(settings.TOUR_IMAGES_DIR)
+    if settings.TOUR_IMAGES_DIR
+    else Path(__file__).resolve().parents[1] / "assets" / "images" / "tours"
+)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+DEFAULT_WIDTH = 640
+# extensión → (formato de Pillow, opciones de guardado)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+PLACEHOLDER_SIZE = 16
+# Formatos aceptados en la subida → extensión del original
+UPLOAD_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+CHUNK_SIZE = 1024 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STAT_CACHE_ENTRIES = 8192
+
+_DIGEST = re.compile(r"[0-9a-f]{32}")
+# Solo los nombres que generate_variants produce: otro ancho serviría el original sin cache para siempre
+VARIANT_NAMES = frozenset(f"{width}.{ext}" for width in VARIANT_WIDTHS for ext in VARIANT_FORMATS)
+
+
+class StoredImage(NamedTuple):
+    digest: str
+    placeholder: str  # data URI
+
+
+class ServedFile(NamedTuple):
+    path: Path
+    stat: os.stat_result
+    immutable: bool  # False → variante todavía no generada, se sirve el original
+
+
+def image_url(digest: str) -> str:
+    return f"{settings.API_V1_STR}/tours/images/{digest}/{DEFAULT_WIDTH}.webp"
+
+
+# ============================================================
+# Subida (síncrono: se llama en el threadpool)
+# ============================================================
+def store_upload(source: BinaryIO) -> StoredImage:
+    """
+    Copia el upload a disco en bloques calculando el hash al pasar, valida
+    que sea una imagen y la deja en <hash>/original.<ext>. No decodifica la
+    imagen entera: el placeholder sale de la escala más chica del JPEG.
+    """
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    hasher = hashlib.blake2b(digest_size=16)
+    size = 0
+    fd, name = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".upload-")
+    tmp_path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.TOUR_IMAGE_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="La imagen supera el tamaño máximo")
+                hasher.update(chunk)
+                tmp.write(chunk)
+
+        ext, placeholder = _inspect(tmp_path)
+        digest = hasher.hexdigest()
+        directory = IMAGES_DIR / digest
+        directory.mkdir(exist_ok=True)
+        os.replace(tmp_path, directory / f"original.{ext}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return StoredImage(digest, placeholder)
+
+
+def _inspect(path: Path) -> tuple[str, str]:
+    try:
+        with Image.open(path) as im:
+            ext = UPLOAD_FORMATS.get(im.format)
+            if ext is None:
+                raise HTTPException(status_code=415, detail="Formato de imagen no soportado (JPEG, PNG o WebP)")
+            if im.width * im.height > settings.TOUR_IMAGE_MAX_PIXELS:
+                raise HTTPException(status_code=413, detail="La imagen tiene demasiados píxeles")
+            im.draft("RGB", (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            small = _prepare(im)
+            small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(status_code=400, detail="La imagen está dañada o no es una imagen")
+
+    buffer = io.BytesIO()
+    small.save(buffer, "WEBP", quality=30)
+    return ext, "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def _prepare(im: Image.Image) -> Image.Image:
+    """Aplica la rotación EXIF y deja RGB (o RGBA si tiene transparencia)."""
+    im = ImageOps.exif_transpose(im)
+    return im.convert("RGBA" if im.has_transparency_data else "RGB")
+
+
+# ============================================================
+# Variantes (tarea en segundo plano después de la subida)
+# ============================================================
+def generate_variants(digest: str) -> None:
+    directory = IMAGES_DIR / digest
+    original = _original(directory)
+    if original is None:
+        logger.warning("No existe el original de la imagen %s", digest)
+        return
+
+    largest = max(VARIANT_WIDTHS)
+    with Image.open(original) as im:
+        # JPEG: decodifica directo a 1/2, 1/4 u 1/8 si alcanza para el ancho mayor (mucho más rápido)
+        im.draft("RGB", (largest, largest))
+        current = _prepare(im)
+
+    # Del más grande al más chico, cada uno se reduce del anterior (nunca se agranda)
+    for width in sorted(VARIANT_WIDTHS, reverse=True):
+        if current.width > width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            out = current
+            if fmt == "JPEG" and out.mode == "RGBA":
+                out = Image.new("RGB", current.size, "white")
+                out.paste(current, mask=current.getchannel("A"))
+            _save_atomic(out, directory / f"{width}.{ext}", fmt, options)
+
+
+def _save_atomic(im: Image.Image, path: Path, fmt: str, options: dict) -> None:
+    """Escribe a un temporal y renombra: nunca se sirve un archivo a medio escribir."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    im.save(tmp_path, fmt, **options)
+    os.replace(tmp_path, path)
+
+
+def _original(directory: Path) -> Path | None:
+    for ext in set(UPLOAD_FORMATS.values()):
+        path = directory / f"original.{ext}"
+        if path.exists():
+            return path
+    return None
+
+
+# ============================================================
+# Índice en memoria (por proceso)
+# ============================================================
+class ImageIndex:
+    """
+    - tour_id → hash (Tour.image_hash) o archivo viejo <id>.<ext>: se carga
+      una vez (BD + un scandir) y se actualiza con cada subida de este worker.
+      Un id que no está (subido en otro worker) se busca en la BD por PK
+    - stat de las variantes: el contenido de un <hash>/<ancho>.<ext> no
+      cambia nunca, así que el stat no se vuelve a pedir al disco
+    """
+
+    def __init__(self, stat_entries: int):
+        self.stat_entries = stat_entries
+        self._lock = threading.Lock()
+        self._digests: dict[int, str] = {}
+        self._legacy: dict[int, Path] = {}
+        self._stats: dict[tuple[str, str], os.stat_result] = {}
+        self.loaded = False
+
+    def load(self, session: Session) -> None:
+        legacy = {}
+        if IMAGES_DIR.is_dir():
+            for entry in os.scandir(IMAGES_DIR):
+                stem, _, ext = entry.name.partition(".")
+                if stem.isdigit() and ext and entry.is_file():
+                    legacy[int(stem)] = Path(entry.path)
+        digests = dict(session.exec(select(Tour.id, Tour.image_hash).where(Tour.image_hash != None)).all())
+        with self._lock:
+            self._legacy, self._digests = legacy, digests
+            self.loaded = True
+
+    def set(self, tour_id: int, digest: str) -> None:
+        with self._lock:
+            self._digests[tour_id] = digest
+
+    def tour_file(self, session: Session, tour_id: int) -> ServedFile | None:
+        """Archivo de /images/tours/{id}: la variante por defecto, el original o la imagen vieja."""
+        if not self.loaded:
+            self.load(session)
+        digest = self._digests.get(tour_id)
+        if digest is None:
+            digest = session.exec(select(Tour.image_hash).where(Tour.id == tour_id)).first()
+            if digest is not None:
+                self.set(tour_id, digest)
+        if digest is not None:
+            served = self.variant_file(digest, f"{DEFAULT_WIDTH}.webp")
+            if served is not None:
+                return served
+        path = self._legacy.get(tour_id)
+        if path is None:
+            return None
+        try:
+            return ServedFile(path, path.stat(), immutable=False)
+        except FileNotFoundError:
+            return None
+
+    def cached_variant(self, digest: str, name: str) -> ServedFile | None:
+        stat = self._stats.get((digest, name))
+        return ServedFile(IMAGES_DIR / digest / name, stat, immutable=True) if stat is not None else None
+
+    def variant_file(self, digest: str, name: str) -> ServedFile | None:
+        """
+        <hash>/<ancho>.<ext>; si la variante todavía no se generó, el original
+        (sin immutable: la próxima vez ya va a estar la variante).
+        """
+        if not _DIGEST.fullmatch(digest) or name not in VARIANT_NAMES:
+            return None
+        cached = self.cached_variant(digest, name)
+        if cached is not None:
+            return cached
+        path = IMAGES_DIR / digest / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            original = _original(IMAGES_DIR / digest)
+            return ServedFile(original, original.stat(), immutable=False) if original is not None else None
+        with self._lock:
+            if len(self._stats) >= self.stat_entries:
+                self._stats.clear()
+            self._stats[(digest, name)] = stat
+        return ServedFile(path, stat, immutable=True)
+
+
+image_index = ImageIndex(stat_entries=STAT_CACHE_ENTRIES)
@@ -0,0 +1,164 @@
+"""
+Popularidad de los tours (`sort=popular` de /tours/search): vistas del detalle
+y reservas pagadas, con escritura diferida.
+
+Un UPDATE de la fila del tour por cada vista pelearía por los mismos locks
+justo en los tours más vistos (y reescribiría la fila entera con sus JSONB).
+En cambio:
+
+- Cada worker cuenta en memoria (un Counter por tipo, bajo un lock: las
+  reservas se marcan desde rutas sync, en el threadpool)
+- Cada POPULARITY_FLUSH_SECONDS vuelca los deltas acumulados en un solo
+  upsert a tour_popularity (views = views + delta), ordenado por tour_id para
+  que los workers tomen los locks en el mismo orden
+- Cada lote lleva un id que se inserta en tour_popularity_batch en la misma
+  transacción: si el commit falla sin saber si llegó, el reintento usa el
+  mismo id y no suma dos veces
+- Al apagarse (deploy, reinicio del worker) vuelca lo pendiente. Si el
+  proceso muere de golpe se pierden a lo sumo los últimos segundos de vistas:
+  se cuenta de menos, nunca de más
+"""
+import asyncio
+import datetime as dt
+import logging
+import threading
+import uuid
+from collections import Counter
+from typing import NamedTuple
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import TourPopularityBatch
+
+logger = logging.getLogger(__name__)
+
+# Deltas como tres arrays (tres parámetros aunque el lote tenga miles de tours).
+# El JOIN descarta tours borrados entre la vista y el volcado
+_UPSERT = text(
+    """
+    INSERT INTO tour_popularity (tour_id, views, reservas, updated_date)
+    SELECT d.tour_id, d.views, d.reservas, :now
+    FROM unnest(CAST(:tour_ids AS integer[]), CAST(:views AS bigint[]), CAST(:reservas AS integer[]))
+         AS d (tour_id, views, reservas)
+    JOIN tour ON tour.id = d.tour_id
+    ORDER BY d.tour_id
+    ON CONFLICT (tour_id) DO UPDATE SET
+        views = tour_popularity.views + excluded.views,
+        reservas = tour_popularity.reservas + excluded.reservas,
+        updated_date = excluded.updated_date
+    """
+)
+
+
+class Batch(NamedTuple):
+    id: uuid.UUID
+    tour_ids: list[int]
+    views: list[int]
+    reservas: list[int]
+
+
+class PopularityCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Counter[int] = Counter()
+        self._reservas: Counter[int] = Counter()
+        self._unsent: Batch | None = None  # lote que falló: se reintenta tal cual (mismo id)
+        self.flushed_batches = 0
+
+    def record_view(self, tour_id: int) -> None:
+        with self._lock:
+            self._views[tour_id] += 1
+
+    def record_reserva(self, tour_id: int, delta: int = 1) -> None:
+        """+1 al pagarse una reserva, -1 si una pagada se cancela o cambia de tour."""
+        with self._lock:
+            self._reservas[tour_id] += delta
+
+    def take(self) -> Batch | None:
+        """Lo pendiente de volcar (None si no hay nada); lo nuevo sigue acumulando aparte."""
+        with self._lock:
+            if self._unsent is not None:
+                batch, self._unsent = self._unsent, None
+                return batch
+            views, reservas = self._views, self._reservas
+            self._views, self._reservas = Counter(), Counter()
+        tour_ids = sorted(views.keys() | {tour_id for tour_id, delta in reservas.items() if delta})
+        if not tour_ids:
+            return None
+        return Batch(
+            uuid.uuid4(), tour_ids, [views[tour_id] for tour_id in tour_ids], [reservas[tour_id] for tour_id in tour_ids]
+        )
+
+    def restore(self, batch: Batch) -> None:
+        with self._lock:
+            self._unsent = batch
+
+    def stats(self) -> dict:
+        return {
+            "pending_tours": len(self._views.keys() | self._reservas.keys()),
+            "unsent": self._unsent is not None,
+            "flushed_batches": self.flushed_batches,
+        }
+
+
+popularity_counters = PopularityCounters()
+
+
+# ============================================================
+# Volcado a la BD
+# ============================================================
+def apply_batch(session: Session, batch: Batch, now: dt.datetime | None = None) -> bool:
+    """Suma el lote dentro de la transacción actual (sin commit); False si ya estaba aplicado."""
+    now = now or dt.datetime.now()
+    claimed = session.exec(
+        insert(TourPopularityBatch)
+        .values(id=batch.id, applied_date=now)
+        .on_conflict_do_nothing()
+        .returning(TourPopularityBatch.id)
+    ).first()
+    if claimed is None:
+        return False
+    session.exec(
+        _UPSERT.bindparams(tour_ids=batch.tour_ids, views=batch.views, reservas=batch.reservas, now=now)
+    )
+    # Los ids viejos ya no se van a reintentar
+    retention = dt.timedelta(hours=settings.POPULARITY_BATCH_RETENTION_HOURS)
+    session.exec(delete(TourPopularityBatch).where(TourPopularityBatch.applied_date < now - retention))
+    return True
+
+
+def flush_once() -> int:
+    """Vuelca los contadores de este proceso; devuelve la cantidad de tours del lote."""
+    batch = popularity_counters.take()
+    if batch is None:
+        return 0
+    try:
+        with Session(engine) as session:
+            apply_batch(session, batch)
+            session.commit()
+    except Exception:
+        popularity_counters.restore(batch)
+        raise
+    popularity_counters.flushed_batches += 1
+    return len(batch.tour_ids)
+
+
+async def _flush_logged() -> None:
+    try:
+        await asyncio.to_thread(flush_once)
+    except Exception:
+        logger.exception("No se pudieron volcar los contadores de popularidad")
+
+
+async def run_flusher() -> None:
+    """Tarea de fondo del lifespan; al cancelarla (shutdown) hace un último volcado."""
+    try:
+        while True:
+            await asyncio.sleep(settings.POPULARITY_FLUSH_SECONDS)
+            await _flush_logged()
+    finally:
+        await _flush_logged()
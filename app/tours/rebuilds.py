@@ -0,0 +1,94 @@
+"""
+Reconstrucciones del catálogo después de una escritura del admin, fuera del request.
+
+Reescribir el snapshot mmap (leer y serializar todo el catálogo) o rearmar el
+KD-tree de geo bloquearía el event loop: las rutas del admin son async. Acá
+se piden y una sola tarea del lifespan las hace en un thread:
+
+- Los pedidos se juntan: diez ediciones seguidas mientras corre un rebuild
+  dejan un solo rebuild más, con todos los cambios
+- El cache de JSON se invalida en el request (es barato); hasta que termina
+  el rebuild, /tours puede servir el snapshot anterior unos instantes
+- Sin la tarea corriendo (scripts, `python -m ...`) se hace en el momento
+"""
+import asyncio
+import logging
+import threading
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.tours.geo import geo_index
+from app.tours.snapshot import rebuild_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogRebuilder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = False
+        self._geo = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self.requests = 0
+        self.runs = 0
+
+    def request(self, snapshot: bool = False, geo: bool = False) -> None:
+        """Pide un rebuild (llamar después del commit); vale desde el loop o desde un thread."""
+        with self._lock:
+            self._snapshot |= snapshot
+            self._geo |= geo
+            self.requests += 1
+            loop, wakeup = self._loop, self._wakeup
+        if loop is None:
+            self.run_pending()
+            return
+        loop.call_soon_threadsafe(wakeup.set)
+
+    def run_pending(self) -> None:
+        with self._lock:
+            snapshot, geo = self._snapshot, self._geo
+            self._snapshot = self._geo = False
+        if not (snapshot or geo):
+            return
+        self.runs += 1
+        if snapshot:
+            with Session(engine) as session:
+                rebuild_snapshot(session)
+        if geo:
+            geo_index.compact()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._loop is not None,
+            "pending": {"snapshot": self._snapshot, "geo": self._geo},
+            "requests": self.requests,
+            "runs": self.runs,
+        }
+
+    async def run(self) -> None:
+        """Tarea de fondo del lifespan."""
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._loop, self._wakeup = asyncio.get_running_loop(), wakeup
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                try:
+                    await asyncio.to_thread(self.run_pending)
+                except Exception:
+                    # Los refrescos periódicos del snapshot y de geo lo terminan de cubrir
+                    logger.exception("No se pudo reconstruir el catálogo después de un cambio")
+        finally:
+            with self._lock:
+                self._loop = self._wakeup = None
+            # Lo pedido justo antes del shutdown no se pierde
+            try:
+                await asyncio.to_thread(self.run_pending)
+            except Exception:
+                logger.exception("No se pudo reconstruir el catálogo al apagar")
+
+
+catalog_rebuilder = CatalogRebuilder()
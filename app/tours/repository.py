@@ -1,42 +1,275 @@
 import datetime
+from collections.abc import Sequence
 from sqlmodel import select
 from fastapi import HTTPException
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import selectinload, with_expression
 
-from app.auth.deps import SessionDep
-from app.models import Tour, User, Guia
+from app.auth.deps import SessionDep, AsyncSessionDep
+from app.core.pagination import Keyset
+from app.models import Tour, TourPopularity, TourSimilar, User, Guia, Operadora, Reservas, TourSearch, TourSort
+from app.reservas.service import ESTADO_RESERVA_CANCELADA
 
 
-class ToursRepository:
-    @staticmethod
-    def list(session: SessionDep, offset: int = 0, limit: int = 100, is_active: bool | None = None):
-        stmt = (
-            select(Tour)
-            .options(
-                selectinload(Tour.operadora),
-                selectinload(Tour.guia).selectinload(Guia.usuario),
-            )
+# ============================================================
+# Consultas compartidas (sync / async)
+# ============================================================
+# Orden estable del listado admin (todos los tours)
+TOURS_KEYSET = Keyset("tours", Tour.id)
+# Catálogo público: próximas salidas primero (el snapshot mmap usa el mismo orden)
+UPCOMING_KEYSET = Keyset("tours-proximos", Tour.fecha, Tour.hora_inicio, Tour.id)
+
+
+def _upcoming(now: datetime.datetime | None = None):
+    """Salidas que todavía no partieron; con is_active entra por ix_tour_upcoming."""
+    now = now or datetime.datetime.now()
+    return tuple_(Tour.fecha, Tour.hora_inicio) >= tuple_(now.date(), now.time())
+
+
+def catalog_keyset(upcoming: bool) -> Keyset:
+    return UPCOMING_KEYSET if upcoming else TOURS_KEYSET
+
+
+def _list_stmt(
+    offset: int, limit: int | None, is_active: bool | None, cursor: str | None = None, upcoming: bool = False
+):
+    stmt = (
+        select(Tour)
+        .options(
+            selectinload(Tour.operadora),
+            selectinload(Tour.guia).selectinload(Guia.usuario),
+        )
+    )
+
+    if is_active is not None:
+        stmt = stmt.where(Tour.is_active == is_active)
+    if upcoming:
+        stmt = stmt.where(_upcoming())
+
+    return catalog_keyset(upcoming).paginate(stmt, offset, limit, cursor)
+
+
+def _summary_select():
+    """Columnas de TourSummary en una sola consulta (sin hidratar entidades ni selectinload)."""
+    return (
+        select(
+            Tour.id,
+            Tour.nombre,
+            Tour.destino,
+            Tour.fecha,
+            Tour.hora_inicio,
+            Tour.precio,
+            Tour.image_url,
+            Tour.image_placeholder,
+            Operadora.nombre.label("operadora"),
+            func.nullif(func.concat_ws(" ", User.nombre, User.apellido), "").label("guia"),
+        )
+        .outerjoin(Operadora, Operadora.id == Tour.id_operadora)
+        .outerjoin(Guia, Guia.id == Tour.id_guia)
+        .outerjoin(User, User.id == Guia.id_usuario)
+    )
+
+
+def _summary_stmt(offset: int, limit: int | None, cursor: str | None = None):
+    stmt = _summary_select().where(Tour.is_active == True, _upcoming())
+    return UPCOMING_KEYSET.paginate(stmt, offset, limit, cursor)
+
+
+def _summary_by_ids_stmt(ids: Sequence[int]):
+    return _summary_select().where(Tour.id.in_(ids), Tour.is_active == True)
+
+
+def _similar_stmt(tour_id: int, limit: int):
+    """Vecinos precalculados por PK (tour_id, rank), solo los que siguen en el catálogo."""
+    return (
+        _summary_select()
+        .join(TourSimilar, TourSimilar.similar_id == Tour.id)
+        .where(TourSimilar.tour_id == tour_id, Tour.is_active == True, _upcoming())
+        .order_by(TourSimilar.rank)
+        .limit(limit)
+    )
+
+
+# Vistas + reservas pagadas ponderadas (app/tours/popularity.py). La etiqueta coincide con
+# Tour.popularidad y la de tour_id con Tour.id: el cursor lee los valores de la entidad, y
+# la comparación del keyset queda sobre las columnas de ix_tour_popularity_score
+POPULARIDAD = TourPopularity.score.label("popularidad")
+
+# Cada orden de /tours/search es su propio keyset (id desempata); el nombre distingue
+# la dirección para que un cursor de un orden no se acepte en el inverso
+SEARCH_KEYSETS: dict[TourSort, Keyset] = {
+    TourSort.PRECIO: Keyset("tours-precio", Tour.precio, Tour.id),
+    TourSort.PRECIO_DESC: Keyset("tours-precio-desc", Tour.precio, Tour.id, descending=True),
+    TourSort.FECHA: Keyset("tours-fecha", Tour.fecha, Tour.hora_inicio, Tour.id),
+    TourSort.FECHA_DESC: Keyset("tours-fecha-desc", Tour.fecha, Tour.hora_inicio, Tour.id, descending=True),
+    TourSort.NOMBRE: Keyset("tours-nombre", Tour.nombre, Tour.id),
+    TourSort.NOMBRE_DESC: Keyset("tours-nombre-desc", Tour.nombre, Tour.id, descending=True),
+    TourSort.POPULAR: Keyset("tours-popular", POPULARIDAD, TourPopularity.tour_id.label("id"), descending=True),
+}
+
+# sort=popular con un filtro selectivo (destino, fechas, precio): primero los tours del filtro
+# por su índice y el puntaje de cada uno por PK. Recorrer ix_tour_popularity_score descartando
+# casi todo lo que no pasa el filtro es el plan lento. Mismo nombre y claves que el de arriba:
+# los cursores sirven para los dos
+_POPULARIDAD_POR_TOUR = (
+    select(TourPopularity.score).where(TourPopularity.tour_id == Tour.id).scalar_subquery().label("popularidad")
+)
+POPULAR_FILTERED_KEYSET = Keyset("tours-popular", _POPULARIDAD_POR_TOUR, Tour.id, descending=True)
+
+
+def _selective(filters: TourSearch) -> bool:
+    return any(
+        value is not None
+        for value in (filters.destino, filters.fecha_desde, filters.fecha_hasta, filters.precio_min, filters.precio_max)
+    )
+
+
+def _cupos_ocupados():
+    """Personas en reservas no canceladas del tour (usa ix_reservas_tour_ocupacion)."""
+    return (
+        select(func.coalesce(func.sum(Reservas.numero_personas), 0))
+        .where(Reservas.id_tour == Tour.id, Reservas.id_reserva_estado != ESTADO_RESERVA_CANCELADA)
+        .correlate(Tour)
+        .scalar_subquery()
+    )
+
+
+def _search_stmt(
+    filters: TourSearch, sort: TourSort, offset: int, limit: int | None, cursor: str | None = None
+):
+    # Solo activos y próximos: así la consulta calza con los índices parciales
+    stmt = (
+        select(Tour)
+        .where(Tour.is_active == True, _upcoming())
+        .options(
+            selectinload(Tour.operadora),
+            selectinload(Tour.guia).selectinload(Guia.usuario),
+        )
+    )
+
+    keyset = SEARCH_KEYSETS[sort]
+    if sort == TourSort.POPULAR and _selective(filters):
+        keyset = POPULAR_FILTERED_KEYSET
+        stmt = stmt.options(with_expression(Tour.popularidad, _POPULARIDAD_POR_TOUR))
+    elif sort == TourSort.POPULAR:
+        # Todo tour tiene fila: se recorre el índice del puntaje y se corta en la página
+        stmt = stmt.join(TourPopularity, TourPopularity.tour_id == Tour.id).options(
+            with_expression(Tour.popularidad, POPULARIDAD)
+        )
+
+    if filters.destino is not None:
+        stmt = stmt.where(Tour.destino == filters.destino)
+    if filters.fecha_desde is not None:
+        stmt = stmt.where(Tour.fecha >= filters.fecha_desde)
+    if filters.fecha_hasta is not None:
+        stmt = stmt.where(Tour.fecha <= filters.fecha_hasta)
+    if filters.precio_min is not None:
+        stmt = stmt.where(Tour.precio >= filters.precio_min)
+    if filters.precio_max is not None:
+        stmt = stmt.where(Tour.precio <= filters.precio_max)
+    if filters.id_operadora is not None:
+        stmt = stmt.where(Tour.id_operadora == filters.id_operadora)
+    if filters.id_guia is not None:
+        stmt = stmt.where(Tour.id_guia == filters.id_guia)
+    if filters.cupos_min is not None:
+        stmt = stmt.where(Tour.capacidad_maxima - _cupos_ocupados() >= filters.cupos_min)
+
+    return keyset.paginate(stmt, offset, limit, cursor)
+
+
+# Columna generada (migración 2dd2f7f160c4), fuera del modelo para no viajar en cada SELECT
+_search_vector = literal_column("tour.search_vector", TSVECTOR)
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=10, MaxFragments=2"
+
+
+def _text_search_stmt(q: str, offset: int, limit: int):
+    """
+    Búsqueda de texto completo (español, sin acentos) ordenada por relevancia.
+
+    El fragmento (ts_headline, caro) se arma solo para la página ya recortada.
+    """
+    query = func.websearch_to_tsquery("spanish", func.immutable_unaccent(q))
+    rank = func.ts_rank_cd(_search_vector, query)
+    page = (
+        select(Tour.id, Tour.nombre, Tour.destino, Tour.fecha, Tour.precio, Tour.image_url,
+               Tour.descripcion, rank.label("rank"))
+        .where(Tour.is_active == True, _upcoming(), _search_vector.op("@@")(query))
+        .order_by(rank.desc(), Tour.id)
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+    # El texto original conserva los acentos: se resalta con la consulta tal cual y sin acentos
+    headline_query = func.websearch_to_tsquery("spanish", q).op("||")(query)
+    snippet = func.ts_headline("spanish", page.c.descripcion, headline_query, _HEADLINE_OPTIONS)
+    return (
+        select(page.c.id, page.c.nombre, page.c.destino, page.c.fecha, page.c.precio, page.c.image_url,
+               page.c.rank, snippet.label("snippet"))
+        .order_by(page.c.rank.desc(), page.c.id)
+    )
+
+
+# ============================================================
+# Versión (ETag): la fecha más nueva de las filas que arman la respuesta
+# ============================================================
+def _row_version(model):
+    return func.coalesce(model.updated_date, model.created_date)
+
+
+def _version_stmt(tour_id: int, with_relations: bool):
+    """Una consulta por PK, sin cargar el grafo (greatest ignora los NULL de los outer join)."""
+    if not with_relations:
+        return select(_row_version(Tour)).where(Tour.id == tour_id)
+    return (
+        select(func.greatest(_row_version(Tour), _row_version(Operadora), _row_version(Guia), _row_version(User)))
+        .select_from(Tour)
+        .outerjoin(Operadora, Operadora.id == Tour.id_operadora)
+        .outerjoin(Guia, Guia.id == Tour.id_guia)
+        .outerjoin(User, User.id == Guia.id_usuario)
+        .where(Tour.id == tour_id)
+    )
+
+
+def tour_version(tour: Tour) -> datetime.datetime:
+    """Lo mismo que `_version_stmt(with_relations=True)`, con el tour ya cargado (snapshot)."""
+    rows = [tour, tour.operadora, tour.guia, tour.guia.usuario if tour.guia else None]
+    return max(row.updated_date or row.created_date for row in rows if row is not None)
+
+
+def _by_id_stmt(tour_id: int):
+    return (
+        select(Tour)
+        .where(Tour.id == tour_id)
+        .options(
+            selectinload(Tour.operadora),
+            selectinload(Tour.guia).selectinload(Guia.usuario),
         )
+    )
 
-        if is_active is not None:
-            stmt = stmt.where(Tour.is_active == is_active)
 
-        stmt = stmt.offset(offset).limit(limit)
+class ToursRepository:
+    @staticmethod
+    def list(
+        session: SessionDep,
+        offset: int = 0,
+        limit: int | None = 100,
+        is_active: bool | None = None,
+        cursor: str | None = None,
+        upcoming: bool = False,
+    ):
+        """`upcoming=True` → solo salidas que no partieron, en orden (fecha, hora_inicio)."""
+        return session.exec(_list_stmt(offset, limit, is_active, cursor, upcoming)).all()
 
-        return session.exec(stmt).all()
+    @staticmethod
+    def list_summary(session: SessionDep, offset: int = 0, limit: int | None = 100, cursor: str | None = None):
+        """Filas (Row) con las columnas de TourSummary; solo tours activos y próximos."""
+        return session.exec(_summary_stmt(offset, limit, cursor)).all()
 
 
     @staticmethod
     def get_by_id(session: SessionDep, tour_id: int) -> Tour:
-        stmt = (
-            select(Tour)
-            .where(Tour.id == tour_id)
-            .options(
-                selectinload(Tour.operadora),
-                selectinload(Tour.guia).selectinload(Guia.usuario),
-            )
-        )
-        tour = session.exec(stmt).first()
+        tour = session.exec(_by_id_stmt(tour_id)).first()
 
         if not tour:
             raise HTTPException(status_code=404, detail="Tour no encontrado")
@@ -75,4 +308,69 @@ class ToursRepository:
         session.delete(tour_db)
         session.commit()
 
-    
\ No newline at end of file
+
+class AsyncToursRepository:
+    """Lecturas del catálogo con AsyncSession (no bloquean el event loop)."""
+
+    @staticmethod
+    async def list(
+        session: AsyncSessionDep,
+        offset: int = 0,
+        limit: int | None = 100,
+        is_active: bool | None = None,
+        cursor: str | None = None,
+        upcoming: bool = False,
+    ):
+        result = await session.exec(_list_stmt(offset, limit, is_active, cursor, upcoming))
+        return result.all()
+
+    @staticmethod
+    async def list_summary(
+        session: AsyncSessionDep, offset: int = 0, limit: int | None = 100, cursor: str | None = None
+    ):
+        result = await session.exec(_summary_stmt(offset, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    async def list_summary_by_ids(session: AsyncSessionDep, ids: Sequence[int]):
+        """Filas de TourSummary de esos tours, solo los activos (en cualquier orden)."""
+        result = await session.exec(_summary_by_ids_stmt(ids))
+        return result.all()
+
+    @staticmethod
+    async def list_similar(session: AsyncSessionDep, tour_id: int, limit: int):
+        result = await session.exec(_similar_stmt(tour_id, limit))
+        return result.all()
+
+    @staticmethod
+    async def search(
+        session: AsyncSessionDep,
+        filters: TourSearch,
+        sort: TourSort = TourSort.FECHA,
+        offset: int = 0,
+        limit: int | None = 100,
+        cursor: str | None = None,
+    ):
+        result = await session.exec(_search_stmt(filters, sort, offset, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    async def search_text(session: AsyncSessionDep, q: str, offset: int = 0, limit: int = 20):
+        result = await session.exec(_text_search_stmt(q, offset, limit))
+        return result.mappings().all()
+
+    @staticmethod
+    async def get_version(session: AsyncSessionDep, tour_id: int, with_relations: bool = True):
+        """None si el tour no existe."""
+        result = await session.exec(_version_stmt(tour_id, with_relations))
+        return result.first()
+
+    @staticmethod
+    async def get_by_id(session: AsyncSessionDep, tour_id: int) -> Tour:
+        result = await session.exec(_by_id_stmt(tour_id))
+        tour = result.first()
+
+        if not tour:
+            raise HTTPException(status_code=404, detail="Tour no encontrado")
+
+        return tour
@@ -1,9 +1,14 @@
 from typing import Annotated
 from fastapi import HTTPException
 
-from app.auth.deps import SessionDep
-from app.models import TourCreate, TourUpdate, Tour, User
-from app.tours.repository import ToursRepository
+from app.auth.deps import SessionDep, AsyncSessionDep
+from app.models import TourCreate, TourUpdate, Tour, User, TourSearch, TourSort
+from app.tours.autocomplete import autocomplete_index
+from app.tours.cache import catalog_cache
+from app.tours.geo import ensure_ready as ensure_geo_ready, geo_index
+from app.tours.images import StoredImage, image_index, image_url
+from app.tours.rebuilds import catalog_rebuilder
+from app.tours.repository import ToursRepository, AsyncToursRepository
 import datetime as dt
 
 
@@ -33,8 +38,110 @@ class ToursService:
     def get_tour(session: SessionDep, tour_id: int):
         return ToursRepository.get_by_id(session, tour_id)
 
+    # ============================================================
+    # Lecturas async (rutas del catálogo)
+    # ============================================================
+    @staticmethod
+    async def get_tours_async(
+        session: AsyncSessionDep,
+        offset: int = 0,
+        limit: int = 100,
+        is_active: bool | None = None,
+        cursor: str | None = None,
+    ):
+        return await AsyncToursRepository.list(session, offset, limit, is_active, cursor)
+
+    @staticmethod
+    async def search_tours_async(
+        session: AsyncSessionDep,
+        filters: TourSearch,
+        sort: TourSort = TourSort.FECHA,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+    ):
+        if (
+            filters.fecha_desde and filters.fecha_hasta and filters.fecha_desde > filters.fecha_hasta
+        ) or (
+            filters.precio_min is not None and filters.precio_max is not None
+            and filters.precio_min > filters.precio_max
+        ):
+            raise HTTPException(status_code=400, detail="Rango de búsqueda inválido")
+        return await AsyncToursRepository.search(session, filters, sort, offset, limit, cursor)
+
+    @staticmethod
+    async def search_tours_text_async(session: AsyncSessionDep, q: str, offset: int = 0, limit: int = 20):
+        # search_vector es una columna generada: create_tour/update_tour la mantienen
+        # al día sin código extra (Postgres la recalcula en el mismo INSERT/UPDATE)
+        q = q.strip()
+        if not q:
+            raise HTTPException(status_code=400, detail="La búsqueda está vacía")
+        return await AsyncToursRepository.search_text(session, q, offset, limit)
+
+    @staticmethod
+    async def nearby_tours_async(
+        session: AsyncSessionDep,
+        latitud: float,
+        longitud: float,
+        radio_km: float,
+        fecha_desde: dt.date | None = None,
+        fecha_hasta: dt.date | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ):
+        if fecha_desde and fecha_hasta and fecha_desde > fecha_hasta:
+            raise HTTPException(status_code=400, detail="Rango de búsqueda inválido")
+
+        # Radio y fechas se resuelven en memoria; la BD solo trae las tarjetas de la página
+        await ensure_geo_ready()
+        hits = geo_index.nearby(latitud, longitud, radio_km, fecha_desde, fecha_hasta, offset, limit)
+        if not hits:
+            return []
+        rows = await AsyncToursRepository.list_summary_by_ids(session, [hit.point.tour_id for hit in hits])
+        by_id = {row.id: row for row in rows}
+        return [
+            {
+                **by_id[hit.point.tour_id]._mapping,
+                "latitud": hit.point.latitud,
+                "longitud": hit.point.longitud,
+                "distancia_km": hit.distancia_km,
+            }
+            for hit in hits
+            if hit.point.tour_id in by_id
+        ]
+
+    @staticmethod
+    async def similar_tours_async(session: AsyncSessionDep, tour_id: int, limit: int = 8):
+        # Precalculado por app/tours/similar.py; un tour sin reservas todavía no tiene vecinos
+        return await AsyncToursRepository.list_similar(session, tour_id, limit)
+
+    @staticmethod
+    async def get_tour_version_async(session: AsyncSessionDep, tour_id: int, with_relations: bool = True):
+        return await AsyncToursRepository.get_version(session, tour_id, with_relations)
+
+    @staticmethod
+    async def get_tour_async(session: AsyncSessionDep, tour_id: int):
+        return await AsyncToursRepository.get_by_id(session, tour_id)
+
     SPONDYLUS_OPERADORA_ID = 12  
 
+    # ============================================================
+    # Catálogo público: cache de JSON + snapshot mmap
+    # ============================================================
+    @staticmethod
+    def _catalog_changed(session: SessionDep, tour: Tour):
+        # Lo barato acá; el snapshot y la recompactación del KD-tree en segundo plano
+        catalog_cache.invalidate()
+        autocomplete_index.update_tour(tour)
+        compact_geo = geo_index.update_tour(tour)
+        catalog_rebuilder.request(snapshot=True, geo=compact_geo)
+
+    @staticmethod
+    def catalog_relations_changed():
+        """Operadora, guía o usuario de un guía modificado: van dentro del JSON y del ETag de cada tour."""
+        catalog_cache.invalidate()
+        catalog_rebuilder.request(snapshot=True)
+
     # ============================================================
     # CREAR TOUR
     # ============================================================
@@ -57,7 +164,9 @@ class ToursService:
         )
 
         print("✅ Tour creado:", tour)
-        return ToursRepository.create(session, tour)
+        tour = ToursRepository.create(session, tour)
+        ToursService._catalog_changed(session, tour)
+        return tour
 
 
     # ============================================================
@@ -83,10 +192,30 @@ class ToursService:
         data["id_usuario_updated"] = current_user.id
         data["updated_date"] = dt.datetime.now()
 
-        return ToursRepository.update(session, tour_db, data, current_user)
+        tour = ToursRepository.update(session, tour_db, data, current_user)
+        ToursService._catalog_changed(session, tour)
+        return tour
 
 
 
+    # ============================================================
+    # IMAGEN DEL TOUR (ya guardada en disco por app/tours/images.py)
+    # ============================================================
+    @staticmethod
+    def set_tour_image(session: SessionDep, tour_id: int, image: StoredImage, current_user: User):
+        tour_db = ToursRepository.get_by_id(session, tour_id)
+
+        data = {
+            "image_hash": image.digest,
+            "image_url": image_url(image.digest),
+            "image_placeholder": image.placeholder,
+        }
+
+        tour = ToursRepository.update(session, tour_db, data, current_user)
+        image_index.set(tour.id, image.digest)
+        ToursService._catalog_changed(session, tour)
+        return tour
+
     # ============================================================
     # DESACTIVAR TOUR (Soft Delete)
     # ============================================================
@@ -105,7 +234,9 @@ class ToursService:
             "updated_date": dt.datetime.now()
         }
 
-        return ToursRepository.update(session, tour_db, data)
+        tour = ToursRepository.update(session, tour_db, data)
+        ToursService._catalog_changed(session, tour)
+        return tour
 
     # ============================================================
     # ACTIVAR TOUR
@@ -125,4 +256,6 @@ class ToursService:
             "updated_date": dt.datetime.now()
         }
 
-        return ToursRepository.update(session, tour_db, data)
+        tour = ToursRepository.update(session, tour_db, data)
+        ToursService._catalog_changed(session, tour)
+        return tour
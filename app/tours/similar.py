@@ -0,0 +1,384 @@
+"""
+Tours similares (`/tours/{id}/similar`) precalculados desde las reservas.
+
+"Quienes reservaron este tour también reservaron…": matriz rala usuario × tour
+(1 si tiene una reserva no cancelada), similitud coseno ítem-ítem y los
+SIMILAR_TOURS_K vecinos de cada tour en la tabla tour_similar. El endpoint lee
+esa tabla por PK (tour_id, rank); acá no se calcula nada por request.
+
+- Las reservas de todos los tours (también pasados o inactivos) son señal,
+  pero como vecinos solo entran los tours activos con salida pendiente al
+  momento del cálculo: el endpoint no pierde filas filtrando después. Los que
+  parten o se desactivan entre vueltas los sigue filtrando el endpoint hasta
+  el próximo recálculo completo
+- Todo vectorizado con NumPy/SciPy: co-ocurrencias = Xᵀ·X por bloques de
+  BLOCK_TOURS filas (la memoria no depende de la cantidad de tours) y el top-k
+  de cada fila con un solo lexsort, sin bucles por tour
+- La BD devuelve los pares (usuario, tour) en dos arrays (array_agg) y la
+  tabla se escribe con un solo COPY binario: nada pasa fila por fila por Python
+- Incremental (cada SIMILAR_TOURS_INTERVAL_SECONDS): tours con reservas
+  creadas/modificadas desde la última vuelta → sus filas se recalculan enteras
+  (con los usuarios que los reservaron). En los demás tours solo cambia el par
+  con esos tours y el coseno es simétrico: se corrige ese par en las filas
+  que lo tienen o lo ganan y se vuelve a ordenar lo guardado. Lo único que no
+  ve es un vecino que no estaba entre los k guardados y sube porque otro bajó;
+  eso lo corrige el recálculo completo (SIMILAR_TOURS_FULL_REBUILD_SECONDS, o
+  `--full`)
+- Un solo worker/nodo por vez (pg_try_advisory_lock); cada vuelta reemplaza
+  sus filas en una transacción (los lectores ven las viejas hasta el commit)
+
+Corrida manual:
+
+    python -m app.tours.similar [--full]
+"""
+import argparse
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import delete, func, text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Tour, TourSimilar
+from app.reservas.service import ESTADO_RESERVA_CANCELADA
+from app.tours.repository import _upcoming
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock (arbitraria, única en la app)
+_LOCK_KEY = 0x73696D69  # "simi"
+# Filas de Xᵀ·X por bloque
+BLOCK_TOURS = 2048
+# Incremental solo si cambiaron hasta esta fracción de los tours (si no, recálculo completo)
+INCREMENTAL_MAX_CHANGED = 0.02
+# work_mem de la transacción del job (ordenar los pares sin ir a disco)
+WORK_MEM = "256MB"
+# Reservas que se commitean después de empezar una vuelta pero con created_date anterior
+_OVERLAP = dt.timedelta(minutes=5)
+
+_BOOKED = f"id_reserva_estado <> {ESTADO_RESERVA_CANCELADA} AND id_usuario IS NOT NULL AND id_tour IS NOT NULL"
+
+# (usuario, tour) como dos arrays: una fila en vez de millones. El usuario va como
+# hash de 64 bits del UUID (sin ordenar ni numerar en SQL; una colisión, ~1e-6 con
+# millones de usuarios, solo mezcla dos canastas). Los repetidos se sacan en NumPy
+_PAIRS = "SELECT array_agg(uuid_hash_extended(id_usuario, 0)), array_agg(id_tour) FROM reservas WHERE {where}"
+_ALL_PAIRS = text(_PAIRS.format(where=_BOOKED))
+# Todas las reservas de los usuarios que reservaron alguno de `tours`
+_AFFECTED_PAIRS = text(
+    _PAIRS.format(
+        where=f"{_BOOKED} AND id_usuario IN (SELECT id_usuario FROM reservas WHERE {_BOOKED} AND id_tour = ANY(:tours))"
+    )
+)
+# Tours con reservas creadas o modificadas (p. ej. canceladas) desde `since`: BitmapOr de
+# ix_reservas_created_id e ix_reservas_updated_date, sin recorrer la tabla
+_CHANGED_TOURS = text(
+    """
+    SELECT DISTINCT id_tour FROM reservas
+    WHERE id_tour IS NOT NULL AND (created_date >= :since OR updated_date >= :since)
+    """
+)
+# Usuarios distintos por tour (la norma de su columna en X)
+_DEGREES = text(
+    f"""
+    SELECT id_tour, count(*) FROM (
+        SELECT DISTINCT id_usuario, id_tour FROM reservas WHERE {_BOOKED} AND id_tour = ANY(:tours)
+    ) r
+    GROUP BY id_tour
+    """
+)
+# Filas guardadas de `tours` y de los tours que tienen como vecino a alguno de `changed`
+_STORED = text(
+    """
+    SELECT array_agg(tour_id), array_agg(similar_id), array_agg(score) FROM tour_similar
+    WHERE tour_id = ANY(:tours)
+       OR tour_id IN (SELECT tour_id FROM tour_similar WHERE similar_id = ANY(:changed))
+    """
+)
+_DELETE_TOURS = text("DELETE FROM tour_similar WHERE tour_id = ANY(:tours)")
+
+# Escritura con COPY ... (FORMAT BINARY): las filas son de ancho fijo, así que el
+# buffer entero sale de un array estructurado de NumPy (sin una tupla por fila)
+_COPY = "COPY tour_similar (tour_id, rank, similar_id, score, computed_at) FROM STDIN (FORMAT BINARY)"
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + bytes(8)  # firma + flags + largo de la extensión
+_COPY_TRAILER = b"\xff\xff"
+_COPY_ROW = np.dtype(
+    [
+        ("fields", ">i2"),
+        ("tour_id_len", ">i4"), ("tour_id", ">i4"),
+        ("rank_len", ">i4"), ("rank", ">i2"),
+        ("similar_id_len", ">i4"), ("similar_id", ">i4"),
+        ("score_len", ">i4"), ("score", ">f4"),
+        ("computed_at_len", ">i4"), ("computed_at", ">i8"),  # µs desde 2000-01-01
+    ]
+)
+_PG_EPOCH = dt.datetime(2000, 1, 1)
+
+Pairs = tuple[np.ndarray, np.ndarray, np.ndarray]  # (tour, otro tour, usuarios en común o coseno)
+
+
+class Neighbours(NamedTuple):
+    tour_id: np.ndarray
+    rank: np.ndarray
+    similar_id: np.ndarray
+    score: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.tour_id)
+
+
+class RefreshResult(NamedTuple):
+    full: bool
+    tours: int  # tours recalculados
+    rows: int  # filas escritas en tour_similar
+    seconds: float
+
+
+# ============================================================
+# Cálculo (sin BD)
+# ============================================================
+def user_tour_matrix(users: np.ndarray, tours: np.ndarray) -> tuple[np.ndarray, sp.csr_matrix]:
+    """(ids de tour de cada columna, X usuario × tour en CSR con 1 = reservó)."""
+    _, rows = np.unique(users, return_inverse=True)
+    tour_ids, cols = np.unique(tours, return_inverse=True)
+    shape = (int(rows.max()) + 1 if len(rows) else 0, len(tour_ids))
+    X = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+    X.data[:] = 1  # varias reservas del mismo usuario al mismo tour cuentan una vez
+    return tour_ids, X
+
+
+def cooccurrence(
+    X: sp.csr_matrix, targets: np.ndarray, min_common: int, columns: np.ndarray | None = None
+) -> Iterator[Pairs]:
+    """
+    (columna, otra columna, usuarios en común ≥ min_common) de `targets`, por bloques de Xᵀ·X;
+    `columns` (máscara sobre las columnas de X) limita la "otra columna".
+    """
+    XT = X.T.tocsr()
+    for start in range(0, len(targets), BLOCK_TOURS):
+        block = targets[start:start + BLOCK_TOURS]
+        counts = (XT[block] @ X).tocoo()  # bloque × todas las columnas
+        rows = block[counts.row]
+        keep = (counts.data >= min_common) & (counts.col != rows)
+        if columns is not None:
+            keep &= columns[counts.col]
+        yield rows[keep], counts.col[keep], counts.data[keep]
+
+
+def _top_k(rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, k: int):
+    """(fila, rank, columna, score) de los k mejores de cada fila; a igual score gana la columna menor."""
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < k
+    return rows[keep], rank[keep], cols[keep], scores[keep]
+
+
+def top_k_similar(
+    X: sp.csr_matrix, tour_ids: np.ndarray, k: int, min_common: int, candidates: np.ndarray | None = None
+) -> Neighbours:
+    """Recálculo completo: los k vecinos por coseno de cada columna de X, entre los ids de `candidates`."""
+    inv_norm = 1 / np.sqrt(np.asarray(X.sum(axis=0)).ravel())
+    columns = None if candidates is None else np.isin(tour_ids, candidates)
+    parts = []
+    for rows, cols, counts in cooccurrence(X, np.arange(len(tour_ids)), min_common, columns):
+        rows, rank, cols, scores = _top_k(rows, cols, counts * inv_norm[rows] * inv_norm[cols], k)
+        parts.append((tour_ids[rows], rank, tour_ids[cols], scores))
+    if not parts:
+        return Neighbours(*(np.empty(0, dtype=dtype) for dtype in (np.int64, np.int64, np.int64, np.float32)))
+    return Neighbours(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def changed_pairs(X: sp.csr_matrix, tour_ids: np.ndarray, changed: np.ndarray, min_common: int) -> Pairs:
+    """Incremental: todos los pares (tour cambiado, otro tour, usuarios en común), en ids de tour y sin recortar."""
+    targets = np.flatnonzero(np.isin(tour_ids, changed))
+    parts = [(tour_ids[rows], tour_ids[cols], counts) for rows, cols, counts in cooccurrence(X, targets, min_common)]
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def merge_changed(
+    stored: Pairs, fresh: Pairs, changed: np.ndarray, k: int, candidates: np.ndarray | None = None
+) -> Neighbours:
+    """
+    Incremental, en ids de tour. `fresh` son todos los pares (tour cambiado,
+    otro, coseno) y `stored` lo guardado de los tours que hay que retocar.
+
+    Las filas de los tours cambiados salen enteras de `fresh`. En las demás
+    solo cambia el par con cada tour cambiado, y como el coseno es simétrico
+    ese par también sale de `fresh`; el resto de lo guardado sigue exacto.
+    Como vecino solo queda lo que está en `candidates` (None → todo).
+    """
+    tour_id, similar_id, score = stored
+    fresh_rows, fresh_cols, fresh_scores = fresh
+    keep = ~np.isin(tour_id, changed) & ~np.isin(similar_id, changed)
+    direct = np.ones(len(fresh_rows), dtype=bool)
+    mirror = ~np.isin(fresh_cols, changed)  # los pares entre dos tours cambiados ya están en ambas filas
+    if candidates is not None:
+        keep &= np.isin(similar_id, candidates)
+        direct &= np.isin(fresh_cols, candidates)
+        mirror &= np.isin(fresh_rows, candidates)
+    rows = np.concatenate([fresh_rows[direct], fresh_cols[mirror], tour_id[keep]])
+    cols = np.concatenate([fresh_cols[direct], fresh_rows[mirror], similar_id[keep]])
+    scores = np.concatenate([fresh_scores[direct], fresh_scores[mirror], score[keep]])
+    return Neighbours(*_top_k(rows, cols, scores, k))
+
+
+# ============================================================
+# Lectura / escritura
+# ============================================================
+def _pairs(session: Session, stmt) -> tuple[np.ndarray, np.ndarray]:
+    users, tours = session.exec(stmt).one()
+    return np.array(users or [], dtype=np.int64), np.array(tours or [], dtype=np.int64)
+
+
+def _cosine(session: Session, pairs: Pairs) -> Pairs:
+    """Usuarios en común → coseno, con la cantidad de usuarios de cada tour en todas las reservas."""
+    rows, cols, counts = pairs
+    tour_ids = np.union1d(rows, cols)
+    degrees = np.ones(len(tour_ids), dtype=np.float32)
+    found = session.exec(_DEGREES.bindparams(tours=tour_ids.tolist())).all()
+    if found:
+        ids, values = np.array(found, dtype=np.int64).T
+        degrees[np.searchsorted(tour_ids, ids)] = values
+    inv_norm = 1 / np.sqrt(degrees)
+    return rows, cols, counts * inv_norm[np.searchsorted(tour_ids, rows)] * inv_norm[np.searchsorted(tour_ids, cols)]
+
+
+def _candidates(session: Session) -> np.ndarray:
+    """Tours que pueden aparecer como vecinos: los que hoy muestra el catálogo (ordenados)."""
+    found = session.exec(select(Tour.id).where(Tour.is_active == True, _upcoming())).all()
+    return np.sort(np.array(found, dtype=np.int64))
+
+
+def _stored(session: Session, tour_ids: np.ndarray, changed: np.ndarray) -> Pairs:
+    found = session.exec(_STORED.bindparams(tours=tour_ids.tolist(), changed=changed.tolist())).one()
+    return tuple(np.array(column or [], dtype=dtype) for column, dtype in zip(found, (np.int64, np.int64, np.float32)))
+
+
+def _copy_buffer(neighbours: Neighbours, computed_at: dt.datetime) -> bytes:
+    rows = np.empty(len(neighbours), dtype=_COPY_ROW)
+    rows["fields"] = 5
+    for name in ("tour_id", "rank", "similar_id", "score", "computed_at"):
+        rows[f"{name}_len"] = _COPY_ROW[name].itemsize
+    rows["tour_id"] = neighbours.tour_id
+    rows["rank"] = neighbours.rank
+    rows["similar_id"] = neighbours.similar_id
+    rows["score"] = neighbours.score
+    rows["computed_at"] = (computed_at - _PG_EPOCH) // dt.timedelta(microseconds=1)
+    return _COPY_HEADER + rows.tobytes() + _COPY_TRAILER
+
+
+def _store(session: Session, neighbours: Neighbours, replace: np.ndarray | None, computed_at: dt.datetime) -> None:
+    """Reemplaza los vecinos de `replace` (None → toda la tabla); el commit lo hace quien llama."""
+    if replace is None:
+        session.exec(delete(TourSimilar))
+    else:
+        session.exec(_DELETE_TOURS.bindparams(tours=replace.tolist()))
+    if not len(neighbours):
+        return
+    # Misma conexión (y transacción) que la sesión
+    driver = session.connection().connection.driver_connection
+    with driver.cursor() as cursor, cursor.copy(_COPY) as copy:
+        copy.write(_copy_buffer(neighbours, computed_at))
+
+
+def refresh(session: Session, since: dt.datetime | None = None) -> RefreshResult:
+    """
+    Recalcula todo (since=None) o solo lo que cambió por reservas creadas/modificadas
+    desde `since`; si cambió más de INCREMENTAL_MAX_CHANGED de los tours, también todo.
+    """
+    started, clock = dt.datetime.now(), time.perf_counter()
+    k, min_common = settings.SIMILAR_TOURS_K, settings.SIMILAR_TOURS_MIN_COMMON
+    # Agregados sobre millones de reservas: en memoria y no en disco
+    session.exec(text(f"SET LOCAL work_mem = '{WORK_MEM}'"))
+
+    changed = None
+    if since is not None:
+        changed = np.array(session.exec(_CHANGED_TOURS.bindparams(since=since)).scalars().all(), dtype=np.int64)
+        if not len(changed):
+            return RefreshResult(False, 0, 0, round(time.perf_counter() - clock, 3))
+        # Con muchos tours cambiados casi todas las filas se retocan: el completo sale más barato
+        stored_tours = session.exec(select(func.count(func.distinct(TourSimilar.tour_id)))).one()
+        if len(changed) > stored_tours * INCREMENTAL_MAX_CHANGED:
+            changed = None
+
+    candidates = _candidates(session)
+    if changed is None:
+        tour_ids, X = user_tour_matrix(*_pairs(session, _ALL_PAIRS))
+        neighbours = top_k_similar(X, tour_ids, k, min_common, candidates)
+        replace, tours = None, len(tour_ids)
+    else:
+        # Los usuarios de los tours cambiados con todas sus reservas alcanzan para las filas enteras de esos tours
+        tour_ids, X = user_tour_matrix(*_pairs(session, _AFFECTED_PAIRS.bindparams(tours=changed.tolist())))
+        fresh = _cosine(session, changed_pairs(X, tour_ids, changed, min_common))
+        # A retocar: los que ganan un par con un tour cambiado y los que ya lo tenían guardado
+        stored = _stored(session, np.setdiff1d(fresh[1], changed), changed)
+        neighbours = merge_changed(stored, fresh, changed, k, candidates)
+        replace = np.union1d(changed, np.union1d(fresh[1], stored[0]))
+        tours = len(replace)
+
+    _store(session, neighbours, replace, started)
+    session.commit()
+    return RefreshResult(changed is None, tours, len(neighbours), round(time.perf_counter() - clock, 3))
+
+
+def run_once(full: bool | None = None) -> RefreshResult | None:
+    """
+    full=None: completo si la tabla está vacía o el último completo tiene más de
+    SIMILAR_TOURS_FULL_REBUILD_SECONDS; si no, incremental. None si otro worker/nodo tiene el lock.
+    """
+    # El lock vive en su propia conexión (igual que la baja de tours pasados)
+    with engine.connect() as lock_conn:
+        locked = lock_conn.scalar(select(func.pg_try_advisory_lock(_LOCK_KEY)))
+        lock_conn.commit()
+        if not locked:
+            return None
+        try:
+            with Session(engine) as session:
+                # La fila más vieja es del último completo; la más nueva, de la última vuelta
+                oldest, newest = session.exec(
+                    select(func.min(TourSimilar.computed_at), func.max(TourSimilar.computed_at))
+                ).one()
+                if full is None:
+                    max_age = dt.timedelta(seconds=settings.SIMILAR_TOURS_FULL_REBUILD_SECONDS)
+                    full = oldest is None or dt.datetime.now() - oldest >= max_age
+                return refresh(session, since=None if full or newest is None else newest - _OVERLAP)
+        finally:
+            lock_conn.scalar(select(func.pg_advisory_unlock(_LOCK_KEY)))
+
+
+async def run_refresher() -> None:
+    """Tarea de fondo del lifespan."""
+    while True:
+        try:
+            result = await asyncio.to_thread(run_once)
+            if result is not None and result.tours:
+                logger.info("Tours similares recalculados: %s", result._asdict())
+        except Exception:
+            logger.exception("No se pudieron recalcular los tours similares")
+        await asyncio.sleep(settings.SIMILAR_TOURS_INTERVAL_SECONDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="recalcular todos los tours")
+    args = parser.parse_args()
+
+    result = run_once(full=True if args.full else None)
+    if result is None:
+        print("Otro proceso está recalculando los tours similares")
+    else:
+        mode = "completo" if result.full else "incremental"
+        print(f"Recálculo {mode}: {result.tours} tours, {result.rows} filas en {result.seconds} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Snapshot del catálogo público (tours activos con salida pendiente) en un
+archivo mapeado en memoria (mmap), compartido por todos los workers de uvicorn del nodo.
+
+Archivo `catalog-<version>.bin` en CATALOG_SNAPSHOT_DIR:
+
+    header   MAGIC (8) | version u64 | cantidad u32 | reservado u32
+    índice   cantidad × (tour_id i64 | offset u64 | largo u32 | reservado u32 | versión i64 | salida i64)
+    datos    [ tour1 , tour2 , ... ]   ← JSON de TourPublic, un elemento por tour
+
+- `/tours` y `/tours/{id}` responden con memoryviews del mmap (sin copiar):
+  una página es el rango contiguo entre el primer y el último tour
+- El page cache del SO comparte las páginas entre procesos: la memoria por
+  nodo no crece con la cantidad de workers
+- La versión (µs desde epoch) de cada tour da el ETag del detalle sin ir a la BD
+- Orden de UPCOMING_KEYSET (fecha, hora_inicio, id) con la salida (µs) en el
+  índice: las que ya partieron se saltean con un bisect, sin esperar un rebuild
+- Rebuild atómico: se escribe un archivo nuevo y se reemplaza el puntero
+  `CURRENT` con os.replace; cada worker re-mapea al ver el cambio
+
+Rebuild manual:
+
+    python -m app.tours.snapshot build
+"""
+import argparse
+import asyncio
+import bisect
+import datetime as dt
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlmodel import Session
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import TourPublic
+from app.tours.repository import ToursRepository, tour_version
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TOURSNP3"
+HEADER = struct.Struct("<8sQII")
+INDEX_ENTRY = struct.Struct("<qQIIqq")
+POINTER_FILE = "CURRENT"
+# Snapshots viejos que se conservan (un worker puede seguir sirviendo el anterior)
+KEEP_SNAPSHOTS = 2
+
+_tour_adapter = TypeAdapter(TourPublic)
+
+
+# ============================================================
+# Lectura
+# ============================================================
+class CatalogSnapshot:
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, self.version, count, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es un snapshot del catálogo")
+
+        self._keys: list[tuple[int, int]] = []  # (salida µs, id): orden del catálogo
+        self._offsets: list[int] = []
+        self._lengths: list[int] = []
+        self._versions: list[int] = []
+        self._positions: dict[int, int] = {}
+        for i in range(count):
+            tour_id, offset, length, _, version, departure = INDEX_ENTRY.unpack_from(
+                self._mmap, HEADER.size + i * INDEX_ENTRY.size
+            )
+            self._positions[tour_id] = i
+            self._keys.append((departure, tour_id))
+            self._offsets.append(offset)
+            self._lengths.append(length)
+            self._versions.append(version)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def page(self, offset: int, limit: int) -> list[memoryview | bytes]:
+        """Partes del JSON de la página: `[`, rango contiguo de tours, `]`."""
+        end = min(offset + limit, len(self))
+        if offset >= end:
+            return [b"[]"]
+        start = self._offsets[offset]
+        stop = self._offsets[end - 1] + self._lengths[end - 1]
+        return [b"[", self._view[start:stop], b"]"]
+
+    def first_upcoming(self, now: dt.datetime) -> int:
+        """Posición de la primera salida que todavía no partió."""
+        return bisect.bisect_left(self._keys, (_to_micros(now),))
+
+    def start_after(self, fecha: dt.date, hora_inicio: dt.time, tour_id: int) -> int:
+        """Posición siguiente al cursor de UPCOMING_KEYSET."""
+        return bisect.bisect_right(self._keys, (_to_micros(dt.datetime.combine(fecha, hora_inicio)), tour_id))
+
+    def last_key(self, offset: int, limit: int) -> list | None:
+        """(fecha, hora_inicio, id) del último tour de la página, solo si la página vino completa."""
+        end = offset + limit
+        if end > len(self):
+            return None
+        departure, tour_id = self._keys[end - 1]
+        departure = _from_micros(departure)
+        return [departure.date(), departure.time(), tour_id]
+
+    def tour_version(self, tour_id: int) -> dt.datetime | None:
+        position = self._positions.get(tour_id)
+        if position is None:
+            return None
+        return _from_micros(self._versions[position])
+
+    def tour(self, tour_id: int) -> memoryview | None:
+        position = self._positions.get(tour_id)
+        if position is None:
+            return None
+        offset = self._offsets[position]
+        return self._view[offset:offset + self._lengths[position]]
+
+
+class SnapshotStore:
+    """Snapshot vigente del proceso; revisa el puntero cada `check_seconds`."""
+
+    def __init__(self, directory: str, check_seconds: float):
+        self.directory = Path(directory)
+        self.check_seconds = check_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._pointer_mtime: float | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pointer(self) -> Path:
+        return self.directory / POINTER_FILE
+
+    def current(self) -> CatalogSnapshot | None:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds:
+            self._reload(now)
+        return self._snapshot
+
+    def expire(self) -> None:
+        self._checked_at = 0.0
+
+    def _reload(self, now: float) -> None:
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = self.pointer.stat().st_mtime_ns
+            except FileNotFoundError:
+                self._snapshot = None
+                return
+            if mtime == self._pointer_mtime:
+                return
+            name = self.pointer.read_text().strip()
+            try:
+                # El mmap anterior se libera cuando terminan las respuestas que lo usan
+                self._snapshot = CatalogSnapshot(self.directory / name)
+            except (OSError, ValueError):
+                logger.exception("No se pudo abrir el snapshot %s; se sigue con el anterior", name)
+                return
+            self._pointer_mtime = mtime
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "enabled": settings.CATALOG_SNAPSHOT_ENABLED,
+            "file": snapshot.path.name if snapshot else None,
+            "version": snapshot.version if snapshot else None,
+            "tours": len(snapshot) if snapshot else 0,
+            "bytes": snapshot.path.stat().st_size if snapshot and snapshot.path.exists() else 0,
+        }
+
+
+snapshot_store = SnapshotStore(
+    directory=settings.CATALOG_SNAPSHOT_DIR,
+    check_seconds=settings.CATALOG_SNAPSHOT_CHECK_SECONDS,
+)
+
+
+class BufferResponse(Response):
+    """Respuesta JSON armada con varios buffers (memoryviews del mmap), sin concatenar."""
+
+    media_type = "application/json"
+
+    def __init__(self, parts: list[memoryview | bytes], headers: dict[str, str] | None = None):
+        self.parts = parts
+        self.status_code = 200
+        self.background = None
+        self.body = b""
+        self.init_headers({**(headers or {}), "content-length": str(sum(len(p) for p in parts))})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        last = len(self.parts) - 1
+        for i, part in enumerate(self.parts):
+            await send({"type": "http.response.body", "body": part, "more_body": i < last})
+
+
+# ============================================================
+# Escritura
+# ============================================================
+_EPOCH = dt.datetime(1970, 1, 1)
+
+
+def _to_micros(value: dt.datetime) -> int:
+    return (value - _EPOCH) // dt.timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> dt.datetime:
+    return _EPOCH + dt.timedelta(microseconds=value)
+
+
+def write_snapshot(
+    directory: Path, tours: list[TourPublic], version: int, tour_versions: list[dt.datetime]
+) -> Path:
+    """
+    `tours` en el orden de UPCOMING_KEYSET. `version` se toma antes de leer la
+    BD: a mayor versión, datos más nuevos.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+
+    elements = [_tour_adapter.dump_json(tour) for tour in tours]
+    data_start = HEADER.size + len(elements) * INDEX_ENTRY.size
+
+    index = bytearray()
+    offset = data_start + 1  # después de "["
+    for tour, element, modified in zip(tours, elements, tour_versions):
+        departure = _to_micros(dt.datetime.combine(tour.fecha, tour.hora_inicio))
+        index += INDEX_ENTRY.pack(tour.id, offset, len(element), 0, _to_micros(modified), departure)
+        offset += len(element) + 1  # + ","
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(HEADER.pack(MAGIC, version, len(elements), 0))
+        f.write(index)
+        f.write(b"[" + b",".join(elements) + b"]")
+        f.flush()
+        os.fsync(f.fileno())
+
+    path = directory / f"catalog-{version}.bin"
+    os.replace(tmp_path, path)
+
+    # Otro worker ya publicó una lectura posterior a la nuestra
+    pointer = directory / POINTER_FILE
+    if pointer.exists() and pointer.read_text().strip() > path.name:
+        return path
+
+    # Puntero: también con os.replace para que nunca se lea a medio escribir
+    fd, tmp_pointer = tempfile.mkstemp(dir=directory, prefix=".current-")
+    with os.fdopen(fd, "w") as f:
+        f.write(path.name)
+    os.replace(tmp_pointer, pointer)
+
+    _remove_old_snapshots(directory)
+    return path
+
+
+def _remove_old_snapshots(directory: Path) -> None:
+    snapshots = sorted(directory.glob("catalog-*.bin"), reverse=True)
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        # Linux: los workers que todavía lo tienen mapeado lo siguen leyendo
+        old.unlink(missing_ok=True)
+
+
+def rebuild_snapshot(session: Session) -> Path | None:
+    """Reescribe el snapshot con el catálogo público (llamar después del commit)."""
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return None
+
+    version = time.time_ns()
+    tours = ToursRepository.list(session, 0, None, is_active=True, upcoming=True)
+    public = [TourPublic.model_validate(tour, from_attributes=True) for tour in tours]
+    versions = [tour_version(tour) for tour in tours]
+    path = write_snapshot(Path(settings.CATALOG_SNAPSHOT_DIR), public, version, versions)
+    # Este worker lo ve en el próximo request; los demás en CATALOG_SNAPSHOT_CHECK_SECONDS
+    snapshot_store.expire()
+    return path
+
+
+def _snapshot_age_seconds() -> float | None:
+    try:
+        return time.time() - snapshot_store.pointer.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def refresh_if_stale() -> None:
+    """Reconstruye si no hay snapshot o si es más viejo que CATALOG_SNAPSHOT_REFRESH_SECONDS.
+
+    Cubre los cambios hechos desde otros nodos (o con la app detenida): las
+    escrituras de este nodo ya piden un rebuild desde ToursService (app/tours/rebuilds.py).
+    """
+    age = _snapshot_age_seconds()
+    # Sin snapshot legible (p. ej. formato anterior después de un deploy) → rebuild ya
+    fresh = age is not None and age < settings.CATALOG_SNAPSHOT_REFRESH_SECONDS
+    if fresh and snapshot_store.current() is not None:
+        return
+    with Session(engine) as session:
+        rebuild_snapshot(session)
+
+
+async def run_refresher() -> None:
+    """Tarea de fondo del lifespan."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_if_stale)
+        except Exception:
+            logger.exception("No se pudo reconstruir el snapshot del catálogo")
+        await asyncio.sleep(settings.CATALOG_SNAPSHOT_REFRESH_SECONDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build"])
+    parser.parse_args()
+
+    with Session(engine) as session:
+        path = rebuild_snapshot(session)
+    print(f"Snapshot: {path}" if path else "CATALOG_SNAPSHOT_ENABLED=false")
+
+
+if __name__ == "__main__":
+    main()